@@ -1,13 +1,28 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form
-import pandas as pd
-import io
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import itertools
 import json
+import shutil
+import tempfile
 from datetime import datetime
+from typing import Optional
 
-from app.models.schemas import UserProfile, SimulationRequest
-from app.services.data_processing import parse_bank_statement, get_monthly_aggregates
-from app.ml.transaction_classifier import classifier
+import numpy as np
+
+from app.models.schemas import UserProfile, SimulationRequest, BatchSimulationRequest
+from app.services.analysis import analyze_contents, analyze_file, StatementError
+from app.services.ingestion import statement_format, supported_extensions
 from app.services.tax_engine import tax_engine
+from app.services.ruleset import RulesetError
+from app.services.bulk import BulkInputError, iter_archive_records, iter_ndjson_records, stream_bulk_results
+from app.services.jobs import job_runner
+from app.ml.transaction_classifier import classifier
+from app.core import config
+from app.core.executor import StageTimeoutError
+from app.core.responses import FastJSONResponse, parse_fields, project
+from app.core.assets import asset_versions, register_default_assets
+from app.core.config import STREAM_THRESHOLD_BYTES, SIMULATION_MAX_POINTS
 from .chat import router as chat_router
 
 router = APIRouter()
@@ -17,7 +32,12 @@ router.include_router(chat_router, tags=["chat"])
 @router.post("/simulate")
 async def simulate_tax(request: SimulationRequest):
     try:
-        result = tax_engine.run_simulation(
+        engine = tax_engine.for_year(request.financial_year)
+    except RulesetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = engine.run_simulation(
             salary=request.salary,
             age=request.age,
             inv_80c=request.investments_80c,
@@ -27,65 +47,221 @@ async def simulate_tax(request: SimulationRequest):
         return {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
-            "simulation": result
+            "simulation": result,
+            "asset_versions": asset_versions()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
+
+@router.get("/assets")
+async def asset_status():
+    """Version, load time and last reload error of every hot-reloaded data asset."""
+    return {"assets": register_default_assets().status()}
+
+# Index into REGIME_LABELS used for the "recommended" matrix of /simulate/batch
+REGIME_LABELS = ["Old Regime", "New Regime"]
+GRID_AXES = ("salary", "investments_80c", "investments_80d", "investments_nps")
+
+@router.post("/simulate/batch")
+async def simulate_tax_batch(request: BatchSimulationRequest):
+    """
+    Evaluates many what-if points in one vectorized pass. Either ``scenarios`` (a list of points,
+    result shape [N]) or ``grid`` (axis values, result shape [salary, 80C, 80D, NPS]) is given.
+    """
+    if (request.scenarios is None) == (request.grid is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'scenarios' or 'grid'")
+    try:
+        engine = tax_engine.for_year(request.financial_year)
+    except RulesetError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.grid is not None:
+        axes = {name: getattr(request.grid, name) for name in GRID_AXES}
+        # One array axis per grid dimension; the engine broadcasts them into the full product
+        columns = [np.asarray(values, dtype=np.float64).reshape([-1 if i == d else 1 for i in range(len(GRID_AXES))])
+                   for d, values in enumerate(axes.values())]
+    else:
+        axes = None
+        columns = [np.array([getattr(s, name) for s in request.scenarios], dtype=np.float64) for name in GRID_AXES]
+
+    shape = np.broadcast_shapes(*(c.shape for c in columns))
+    points = int(np.prod(shape))
+    if points == 0:
+        raise HTTPException(status_code=400, detail="Simulation batch is empty")
+    if points > SIMULATION_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Simulation batch has {points} points; the limit is {SIMULATION_MAX_POINTS}")
+
+    try:
+        salary, inv_80c, inv_80d, inv_nps = columns
+        result = engine.run_simulation_batch(salary, request.age, inv_80c, inv_80d, inv_nps)
+        return {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "shape": list(shape),
+            "axes": axes,
+            "regimes": REGIME_LABELS,
+            "old_tax": result["old_tax"].tolist(),
+            "new_tax": result["new_tax"].tolist(),
+            "tax_saved": result["tax_saved"].tolist(),
+            "recommended": np.where(result["old_recommended"], 0, 1).tolist(),
+            "savings_gap": result["savings_gap"].tolist(),
+            "health_score": result["health_score"].tolist(),
+            "asset_versions": asset_versions()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
 
 @router.post("/analyze")
 async def analyze_transactions(
-    file: UploadFile = File(..., description="CSV File of Bank Statement"),
-    user_profile: str = Form(..., description="JSON string of UserProfile")
+    request: Request,
+    file: UploadFile = File(..., description="Bank statement as CSV, Parquet (.parquet) or Arrow IPC (.arrow/.feather)"),
+    user_profile: str = Form(..., description="JSON string of UserProfile"),
+    stream: bool = Form(False, description="Process the statement in chunks with bounded memory"),
+    chunk_size: Optional[int] = Form(None, description="Rows per chunk in streaming mode"),
+    mode: str = Form("sync", description="'sync' answers with the analysis, 'job' queues it and answers 202 with a job id"),
+    fields: Optional[str] = Form(None, description="Comma-separated (dotted) response fields to return, e.g. 'tax_analysis,chart_data'")
 ):
     try:
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
+        fmt = statement_format(file.filename)
+        if fmt is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported statement file; expected one of {', '.join(supported_extensions())}")
+        if mode not in ("sync", "job"):
+            raise HTTPException(status_code=400, detail="mode must be 'sync' or 'job'")
 
         # 1. Parse user profile
         try:
             profile_data = json.loads(user_profile)
             profile = UserProfile(**profile_data)
+            # Resolves (and compiles on first use) the rules of the profile's financial year; years
+            # without a rules file are analyzed under the default rules (see rules_financial_year)
+            tax_engine.for_year(profile.financial_year, fallback=True)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Invalid User Profile JSON: {str(e)}")
 
-        # 2. Read and parse CSV
-        contents = await file.read()
-        try:
-            df = pd.read_csv(io.BytesIO(contents))
-        except Exception as e:
-            raise HTTPException(status_code=400, detail="Failed to parse CSV file")
-
-        # 3. Parse RAW to Pydantic transactions
-        raw_transactions = parse_bank_statement(df)
-        if not raw_transactions:
-            raise HTTPException(status_code=400, detail="No readable expense transactions found in CSV")
+        if mode == "job":
+            return await submit_analysis_job(request, file, profile, fmt, stream, chunk_size)
 
-        # 4. Classify transactions (ML Layer)
-        classified_transactions = classifier.process_transactions(raw_transactions)
-
-        # 5. Calculate Taxes (Deterministic Engine)
-        analysis_result = tax_engine.analyze_profile(profile, classified_transactions)
-        
-        # 5.5 Aggregate monthly data for charts
-        chart_data = get_monthly_aggregates(classified_transactions)
-
-        # Build clean response including matches for transparency
-        tax_saving_txns = [
-            {"date": t.date, "description": t.description, "amount": t.amount, "section": t.tax_section, "category": t.category} 
-            for t in classified_transactions if t.is_tax_saving
-        ]
-
-        # 6. Return response matching architecture structure exactly
-        return {
-            "status": "success",
-            "timestamp": datetime.now().isoformat(),
-            "profile": profile.dict(),
-            "discovered_investments": tax_saving_txns,
-            "tax_analysis": analysis_result,
-            "chart_data": chart_data
-        }
+        # Large uploads (or explicit requests) take the chunked path
+        if stream or (file.size or 0) > STREAM_THRESHOLD_BYTES:
+            # Starlette has already spooled the upload to a temporary file; it is read incrementally
+            await file.seek(0)
+            result = await analyze_file(file.file, profile, chunk_size, fmt)
+        else:
+            # 2. Read, parse, classify and analyze (heavy stages run on the analysis executor)
+            contents = await file.read()
+            result = await analyze_contents(contents, profile, fmt)
+        return projected_response(result, fields)
 
     except HTTPException as he:
         raise he
+    except StatementError as se:
+        raise HTTPException(status_code=400, detail=str(se))
+    except StageTimeoutError as te:
+        raise HTTPException(status_code=504, detail=str(te))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+def projected_response(result: dict, fields: Optional[str]) -> FastJSONResponse:
+    """Serializes an analysis payload directly (no jsonable_encoder pass), keeping only ``fields`` if given."""
+    try:
+        return FastJSONResponse(project(result, parse_fields(fields)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def submit_analysis_job(request: Request, file: UploadFile, profile: UserProfile, fmt: str, stream: bool,
+                              chunk_size: Optional[int]):
+    if not job_runner.running:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    await file.seek(0)
+    options = {"format": fmt, "stream": stream, "chunk_size": chunk_size}
+    job_id = await job_runner.submit(file.file, profile.model_dump(), options)
+    return FastJSONResponse(status_code=202, content={
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": str(request.url_for("job_status", job_id=job_id))
+    })
+
+@router.get("/jobs")
+async def job_queue_stats():
+    """Depth of the analysis job queue and how long jobs have waited in it."""
+    if not job_runner.running:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    return {"concurrency": config.JOB_MAX_CONCURRENCY, "queue": await job_runner.stats()}
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str, wait: float = 0.0, fields: Optional[str] = None):
+    """
+    Status of an analysis job, with its result or error once finished. ``wait`` long-polls:
+    the call returns as soon as the job finishes, or after ``wait`` seconds at most. ``fields``
+    projects the result as for /analyze.
+    """
+    if not job_runner.running:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    job = await job_runner.wait(job_id, min(max(wait, 0.0), config.JOB_MAX_WAIT_SECONDS))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if "result" in job:
+        try:
+            job["result"] = project(job["result"], parse_fields(fields))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse(job)
+
+@router.post("/analyze/bulk")
+async def analyze_bulk(request: Request):
+    """
+    Analyzes a whole payroll in one request. The body is either NDJSON (``application/x-ndjson``,
+    one ``{"id", "profile", "transactions" | "statement_csv"}`` object per line) or a multipart
+    upload of a zip archive (field ``file``) with one CSV statement per employee plus a
+    profiles.ndjson manifest. Results stream back as NDJSON, one line per employee as it finishes.
+    """
+    content_type = request.headers.get("content-type", "")
+    # The payload is spooled to our own file first: the request's body and form are gone by the
+    # time the response streams, and large payrolls should not sit in memory
+    payload = tempfile.SpooledTemporaryFile(max_size=STREAM_THRESHOLD_BYTES)
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or not hasattr(upload, "file"):
+                raise HTTPException(status_code=400, detail="Multipart bulk uploads need a zip archive in field 'file'")
+            await upload.seek(0)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, shutil.copyfileobj, upload.file, payload)
+            payload.seek(0)
+            try:
+                # Opening the archive reads its manifest; validate it before the response starts
+                reader = iter_archive_records(payload)
+                first = await loop.run_in_executor(None, next, reader, None)
+            except (BulkInputError, ValueError, KeyError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid archive: {e}")
+            records = itertools.chain([first] if first else [], reader)
+        elif content_type.startswith(("application/x-ndjson", "application/jsonl", "application/json")):
+            async for chunk in request.stream():
+                payload.write(chunk)
+            payload.seek(0)
+            records = iter_ndjson_records(payload)
+        else:
+            raise HTTPException(status_code=415, detail="Send NDJSON or a multipart zip archive")
+
+        try:
+            # Load the model and KB once here; bulk workers start from this model
+            await asyncio.get_running_loop().run_in_executor(None, classifier.ensure_loaded)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Classifier unavailable: {str(e)}")
+    except Exception:
+        payload.close()
+        raise
+
+    # Workers are synced to the same versions the header reports
+    versions = asset_versions()
+
+    async def results():
+        try:
+            async for line in stream_bulk_results(records, versions):
+                yield line
+        finally:
+            payload.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson",
+                             headers={"X-Asset-Versions": json.dumps(versions)})
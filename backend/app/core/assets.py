@@ -0,0 +1,154 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core import config
+
+class WatchedAsset:
+    """One named data asset: the files it is built from and the callback that rebuilds it."""
+
+    __slots__ = ("name", "paths", "reload", "signature", "version", "loaded_at", "error")
+
+    def __init__(self, name: str, paths: List[str], reload: Callable[[], object]):
+        self.name = name
+        self.paths = paths
+        self.reload = reload
+        self.signature: Tuple = ()
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def files(self) -> List[str]:
+        """Watched files; a directory contributes the files directly inside it."""
+        found = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                found += sorted(os.path.join(path, n) for n in os.listdir(path)
+                                if os.path.isfile(os.path.join(path, n)))
+            elif os.path.exists(path):
+                found.append(path)
+        return found
+
+    def stat_signature(self) -> Tuple:
+        # Cheap change detection; content is only hashed when this moves
+        signature = []
+        for path in self.files():
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def content_version(self) -> str:
+        digest = hashlib.sha1()
+        for path in self.files():
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:12]
+
+class AssetWatcher:
+    """
+    Polls data files (tax rules, chat KB, instrument CSV) and rebuilds their in-memory structures
+    in a background thread when their content changes. Each reload callback builds the new version
+    off to the side and publishes it with one assignment, so requests never wait on a rebuild.
+    A failed rebuild keeps the previous version and records the error.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._assets: Dict[str, WatchedAsset] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, paths: List[str], reload: Callable[[], object]):
+        """Starts tracking ``paths``; the current content is assumed to be loaded already."""
+        asset = WatchedAsset(name, paths, reload)
+        asset.signature = asset.stat_signature()
+        asset.version = asset.content_version()
+        asset.loaded_at = time.time()
+        with self._lock:
+            self._assets[name] = asset
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._assets
+
+    def check(self) -> List[str]:
+        """Polls every asset once and reloads the ones whose content changed; returns their names."""
+        reloaded = []
+        with self._lock:
+            for asset in self._assets.values():
+                try:
+                    signature = asset.stat_signature()
+                    if signature == asset.signature:
+                        continue
+                    version = asset.content_version()
+                    asset.signature = signature
+                    if version == asset.version:
+                        continue  # Touched but not edited
+                    asset.reload()
+                except Exception as e:
+                    asset.error = f"{type(e).__name__}: {e}"
+                    print(f"Asset reload failed for {asset.name}: {asset.error}")
+                    continue
+                asset.version, asset.loaded_at, asset.error = version, time.time(), None
+                print(f"Reloaded asset {asset.name} (version {version})")
+                reloaded.append(asset.name)
+        return reloaded
+
+    def sync(self, versions: Dict[str, str]) -> List[str]:
+        """Reloads local copies that lag behind ``versions`` (e.g. a process worker after the parent reloaded)."""
+        if all(self._assets.get(n) is not None and self._assets[n].version == v for n, v in versions.items()):
+            return []
+        return self.check()
+
+    def versions(self) -> Dict[str, str]:
+        return {name: asset.version for name, asset in self._assets.items()}
+
+    def status(self) -> Dict[str, Dict[str, object]]:
+        return {
+            name: {"version": a.version, "loaded_at": a.loaded_at, "files": len(a.signature), "error": a.error}
+            for name, a in self._assets.items()
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="opax-asset-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+asset_watcher = AssetWatcher(config.ASSET_POLL_SECONDS)
+_register_lock = threading.Lock()
+
+def register_default_assets() -> AssetWatcher:
+    """Registers the tax rules, chat KB and instrument CSV with their reload hooks (idempotent)."""
+    with _register_lock:
+        if not asset_watcher.is_registered("tax_rules"):
+            from app.services.tax_engine import tax_engine
+            from app.services.local_advisor import local_advisor
+            from app.ml.transaction_classifier import classifier
+
+            asset_watcher.register("tax_rules", [config.TAX_RULES_PATH, config.TAX_RULES_DIR], tax_engine.reload)
+            asset_watcher.register("knowledge_base", [local_advisor.knowledge_base_path], local_advisor.reload)
+            asset_watcher.register("tax_instruments", [config.TAX_INSTRUMENTS_PATH], classifier.reload_knowledge_base)
+    return asset_watcher
+
+def asset_versions() -> Dict[str, str]:
+    """Content versions of the data assets currently being served."""
+    return register_default_assets().versions()
+
+def sync_assets_and_call(versions: Dict[str, str], fn: Callable, *args):
+    """Process-executor wrapper: catches the worker's assets up with the parent's before running ``fn``."""
+    register_default_assets().sync(versions)
+    return fn(*args)
@@ -0,0 +1,164 @@
+import functools
+import zlib
+from typing import Callable, Dict, Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import config
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only ever gzip-compressed
+    brotli = None
+
+# Bodies that are already compressed or must reach the client unbuffered are passed through
+EXCLUDED_MEDIA_TYPES = ("text/event-stream", "application/zip", "application/gzip", "application/x-gzip",
+                        "image/", "audio/", "video/", "font/woff")
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """Parses Accept-Encoding into {coding: q}; "gzip;q=0.5, br" gives {"gzip": 0.5, "br": 1.0}."""
+    accepted = {}
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip()] = q
+    return accepted
+
+def negotiate_encoding(header: str) -> str:
+    """Best coding we can produce for the client: "br", "gzip" or "identity" (brotli wins ties)."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class GzipEncoder:
+    content_encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.compress(body)
+        # Streamed NDJSON lines are flushed so clients see each one as it is produced
+        return data + self._compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+class BrotliEncoder:
+    content_encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+class CompressionResponder:
+    """
+    Wraps one response's ``send``: holds back http.response.start until the first body chunk shows
+    whether the response is worth compressing, then rewrites the headers and encodes every chunk.
+    Responses that are small, partial, already encoded or of an excluded media type pass through.
+    ``make_encoder`` is only called once a body is compressed; None only adds the Vary header
+    (the client accepts no coding we produce).
+    """
+
+    def __init__(self, app: ASGIApp, make_encoder: Optional[Callable[[], object]], minimum_size: int,
+                 thread_minimum_size: int = 128 * 1024):
+        self.app = app
+        self.make_encoder = make_encoder
+        self.encoder = None
+        self.minimum_size = minimum_size
+        self.thread_minimum_size = thread_minimum_size
+        self.send: Optional[Send] = None
+        self.start: Optional[Message] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def _encode(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            # Large bodies are compressed off the event loop
+            return await anyio.to_thread.run_sync(self.encoder.compress, body, more_body)
+        return self.encoder.compress(body, more_body)
+
+    async def send_compressed(self, message: Message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").lower()
+            self.passthrough = "content-encoding" in headers or message["status"] == 206 or \
+                media_type.startswith(EXCLUDED_MEDIA_TYPES)
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+        if self.passthrough or kind != "http.response.body":
+            if self.start is not None:
+                # e.g. pathsend: the body never goes through us, so neither does an encoding
+                start, self.start = self.start, None
+                await self.send(start)
+            await self.send(message)
+            return
+
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        if self.start is None:
+            # Later chunks of a streamed response
+            if self.encoder is not None:
+                message["body"] = await self._encode(body, more_body)
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        if len(body) < self.minimum_size and not more_body:
+            await self.send(start)
+            await self.send(message)
+            return
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.make_encoder is not None:
+            self.encoder = self.make_encoder()
+            message["body"] = await self._encode(body, more_body)
+            headers["Content-Encoding"] = self.encoder.content_encoding
+            if more_body or start.get("trailers", False):
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+        await self.send(start)
+        await self.send(message)
+
+class CompressionMiddleware:
+    """
+    Compresses responses of at least COMPRESSION_MIN_BYTES with brotli (when installed) or gzip,
+    whichever the client's Accept-Encoding prefers. Streaming responses are compressed per chunk.
+    Written against the ASGI spec alone, not Starlette's GZip internals, so upgrades cannot break it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        make_encoder = functools.partial(BrotliEncoder, config.BROTLI_QUALITY) if encoding == "br" else \
+            functools.partial(GzipEncoder, config.GZIP_LEVEL) if encoding == "gzip" else None
+        await CompressionResponder(self.app, make_encoder, config.COMPRESSION_MIN_BYTES)(scope, receive, send)
@@ -4,8 +4,89 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fil
 DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data")
 
 TAX_RULES_PATH = os.path.join(DATA_DIR, "tax_rules.json")
+# One <FY>.json per additional financial year (e.g. 2025-2026.json); TAX_RULES_PATH stays the default
+TAX_RULES_DIR = os.path.join(DATA_DIR, "tax_rules")
 TAX_INSTRUMENTS_PATH = os.path.join(DATA_DIR, "tax_knowledge", "tax_instruments.csv")
+# Persisted KB embeddings (memory-mapped .npy); set OPAX_EMBEDDING_CACHE_DIR="" to disable
+EMBEDDING_CACHE_DIR = os.getenv("OPAX_EMBEDDING_CACHE_DIR", os.path.join(DATA_DIR, "processed", "embeddings"))
 
 # ML Model Config
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 SIMILARITY_THRESHOLD = 0.55  # Adjusted threshold for practical bank statement matching
+
+# KB search index: "exact" (brute force), "ivf" (clustered approximate) or "auto" (ivf for large KBs)
+VECTOR_INDEX = "auto"
+VECTOR_INDEX_NPROBE = 8  # Clusters scanned per query; higher means better recall, slower search
+VECTOR_INDEX_IVF_MIN_ROWS = 5000
+
+# Cross-request classification cache (LRU in memory, optionally shared on disk by all workers on a host)
+CLASSIFICATION_CACHE_SIZE = 50000
+CLASSIFICATION_CACHE_PATH = os.getenv("OPAX_CLASSIFICATION_CACHE_PATH", os.path.join(DATA_DIR, "processed", "classification_cache.sqlite3"))
+
+# Lexical fast path in front of the embedding classifier
+LEXICAL_GATE_ENABLED = True
+# Words that make a row possibly tax related; such rows are never settled as non-tax
+TAX_KEYWORDS = [
+    "insurance", "premium", "policy", "mediclaim", "health", "life", "term", "elss", "sip",
+    "mutual fund", "ppf", "provident", "nps", "pension", "tax", "sukanya", "ssy", "nsc", "epf",
+    "ulip", "scss", "tuition", "donation", "home loan", "housing loan", "education loan",
+    "fixed deposit", "saver", "annuity"
+]
+# Everyday spend that can never match a tax instrument
+NON_TAX_PATTERNS = [
+    "swiggy", "zomato", "amazon", "flipkart", "myntra", "ajio", "nykaa", "bigbasket", "blinkit",
+    "zepto", "dmart", "grocery", "groceries", "supermarket", "restaurant", "cafe", "dining",
+    "uber", "ola", "rapido", "irctc", "makemytrip", "travel", "petrol", "fuel", "atm",
+    "cash withdrawal", "rent", "electricity", "water bill", "gas bill", "recharge", "dth",
+    "broadband", "netflix", "spotify", "hotstar", "movie", "entertainment", "shopping",
+    "utilities", "salary", "self transfer", "transfer to", "imps", "neft", "rtgs", "misc"
+]
+
+# Executor for CPU-bound /analyze stages: "thread" or "process"
+ANALYSIS_EXECUTOR = os.getenv("OPAX_ANALYSIS_EXECUTOR", "thread")
+ANALYSIS_MAX_WORKERS = int(os.getenv("OPAX_ANALYSIS_MAX_WORKERS", "4"))
+# Per-stage timeouts in seconds (None waits forever)
+STAGE_TIMEOUTS = {
+    "read": 30.0,
+    "parse": 30.0,
+    "classify": 120.0,
+    "aggregate": 30.0,
+    "analyze": 30.0
+}
+
+# Seconds between checks of tax rules / KB files for hot reload (0 disables the watcher)
+ASSET_POLL_SECONDS = float(os.getenv("OPAX_ASSET_POLL_SECONDS", "5"))
+
+# Largest number of points a single /simulate/batch request may evaluate
+SIMULATION_MAX_POINTS = 250000
+
+# Bulk /analyze/bulk: one pool per request, forked after the classifier is loaded so workers share it
+BULK_EXECUTOR = os.getenv("OPAX_BULK_EXECUTOR", "process")
+BULK_MAX_WORKERS = int(os.getenv("OPAX_BULK_MAX_WORKERS", "0"))  # 0 uses every CPU
+BULK_IN_FLIGHT_PER_WORKER = 4  # Records queued per worker; bounds memory for very large payloads
+
+# /analyze result cache: statement summaries keyed by content hash and KB version (0 entries disables)
+RESULT_CACHE_SIZE = int(os.getenv("OPAX_RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("OPAX_RESULT_CACHE_TTL_SECONDS", "3600"))
+
+# Streaming /analyze: uploads are read and classified in row chunks with bounded memory
+STREAM_CHUNK_ROWS = 20000
+STREAM_MAX_CHUNK_ROWS = 200000
+STREAM_THRESHOLD_BYTES = 20 * 1024 * 1024  # Larger uploads are always streamed
+
+# Asynchronous /analyze jobs (mode=job): a durable SQLite queue drained by in-process workers
+JOB_DIR = os.getenv("OPAX_JOB_DIR", os.path.join(DATA_DIR, "processed", "jobs"))  # Queue database and uploads
+JOB_MAX_CONCURRENCY = int(os.getenv("OPAX_JOB_MAX_CONCURRENCY", "2"))  # Jobs run at once per API process
+JOB_LEASE_SECONDS = 60.0  # A running job whose worker stops renewing (crash, kill) is requeued after this
+JOB_MAX_ATTEMPTS = 3  # Runs a job may start before it is failed instead of requeued
+JOB_RESULT_TTL_SECONDS = 24 * 3600  # Finished jobs and their results are pruned after this
+JOB_MAX_WAIT_SECONDS = 60.0  # Longest long-poll a client may ask for
+JOB_POLL_SECONDS = 1.0  # How often idle workers look for jobs submitted by other processes
+
+# Response compression (brotli when installed, else gzip) for bodies of at least this many bytes
+COMPRESSION_MIN_BYTES = 1024
+GZIP_LEVEL = 6  # zlib levels above 6 cost much more CPU for little gain on JSON
+BROTLI_QUALITY = 5  # Quality 4-6 is the usual sweet spot for dynamic responses
+
+# Load the model, KB and tax rules at startup; /readyz reports 503 until this has finished
+WARMUP_ON_STARTUP = os.getenv("OPAX_WARMUP_ON_STARTUP", "1") not in ("0", "false", "no")
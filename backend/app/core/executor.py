@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core import config
+from app.core.metrics import STAGE_SECONDS, STAGE_TIMEOUTS
+
+class StageTimeoutError(Exception):
+    """Raised when an offloaded pipeline stage does not finish within its configured timeout."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"Stage '{stage}' timed out after {timeout:.0f}s")
+        self.stage = stage
+        self.timeout = timeout
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> Executor:
+    """Returns the shared, bounded pool used for CPU-bound analysis stages (created on first use)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                if config.ANALYSIS_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=config.ANALYSIS_MAX_WORKERS)
+                elif config.ANALYSIS_EXECUTOR == "thread":
+                    _executor = ThreadPoolExecutor(max_workers=config.ANALYSIS_MAX_WORKERS,
+                                                   thread_name_prefix="opax-analysis")
+                else:
+                    raise ValueError(f"Unknown ANALYSIS_EXECUTOR: {config.ANALYSIS_EXECUTOR}")
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+async def run_stage(stage: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs ``fn(*args)`` on the analysis executor so the event loop keeps serving other requests.
+    ``fn`` must be a module-level function when the process executor is configured.
+    """
+    timeout = config.STAGE_TIMEOUTS.get(stage)
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    call = functools.partial(fn, *args)
+    if isinstance(executor, ProcessPoolExecutor):
+        # Worker processes hold their own copies of rules and KB; bring them to the parent's versions
+        from app.core.assets import asset_versions, sync_assets_and_call
+        call = functools.partial(sync_assets_and_call, asset_versions(), fn, *args)
+    future = loop.run_in_executor(executor, call)
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(future, timeout=timeout)
+    except asyncio.TimeoutError:
+        # The worker is not interrupted; its result is simply dropped when it finishes
+        STAGE_TIMEOUTS.inc(1, stage)
+        raise StageTimeoutError(stage, timeout)
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage)
@@ -0,0 +1,209 @@
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Sample of a scrape-time collector: (name, type, help, [(labels, value), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense; ``observe_many`` bins a whole array at once."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._edges = np.asarray(self.buckets, dtype=np.float64)
+        # Per label set: [bucket counts (non-cumulative, last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, labels: Tuple[str, ...]) -> list:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        return series
+
+    def observe(self, value: float, *labels: str):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._get(labels)
+            series[0][slot] += 1
+            series[1] += value
+
+    def observe_many(self, values: Iterable[float], *labels: str):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        counts = np.bincount(np.searchsorted(self._edges, values, side="left"), minlength=len(self.buckets) + 1)
+        total = float(values.sum())
+        with self._lock:
+            series = self._get(labels)
+            for slot, count in enumerate(counts.tolist()):
+                series[0][slot] += count
+            series[1] += total
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = 'le="' + _number(bound) + '"'
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    Metrics of this process in the Prometheus text format. Counters and histograms are updated
+    on the hot path; collectors are called at scrape time for values other modules already keep
+    (cache counters, queue depth, asset versions). Observations made inside process-executor
+    workers stay in those workers; stage latencies are measured in the parent and are complete.
+    """
+
+    def __init__(self):
+        self._metrics: List[object] = []
+        self._collectors: List[Callable[[], List[Family]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[Family]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"Metrics collector failed: {type(e).__name__}: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+# Pipeline instrumentation shared by the executor, the analysis services and the classifier
+STAGE_SECONDS = registry.register(Histogram(
+    "opax_stage_seconds", "Wall time of /analyze pipeline stages, including executor queueing.", labelnames=("stage",)))
+STAGE_TIMEOUTS = registry.register(Counter(
+    "opax_stage_timeouts_total", "Pipeline stages abandoned after their configured timeout.", ("stage",)))
+STATEMENT_ROWS = registry.register(Histogram(
+    "opax_statement_rows", "Expense rows per analyzed statement.", SIZE_BUCKETS))
+CLASSIFIED_ROWS = registry.register(Counter(
+    "opax_classified_rows_total", "Classified rows by the path that settled them.", ("path",)))
+EMBEDDING_SECONDS = registry.register(Histogram(
+    "opax_embedding_seconds", "Time spent in one embedding model encode call."))
+EMBEDDING_BATCH_SIZE = registry.register(Histogram(
+    "opax_embedding_batch_size", "Unique descriptions sent to the embedding model per encode call.", SIZE_BUCKETS))
+SIMILARITY_SCORE = registry.register(Histogram(
+    "opax_similarity_score", "Best cosine similarity of each embedded description against the KB.",
+    (0.1, 0.2, 0.3, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.8, 0.9, 1.0)))
+
+def service_families() -> List[Family]:
+    """Scrape-time values kept elsewhere: cache counters and hit ratios, job queue depth, asset versions."""
+    from app.core.assets import asset_versions
+    from app.ml.transaction_classifier import classifier
+    from app.services.jobs import job_runner
+    from app.services.result_cache import result_cache
+
+    families: List[Family] = []
+    cache = classifier.cache_stats()
+    if cache:
+        families += [
+            ("opax_classification_cache_lookups_total", "counter", "Classification cache lookups by outcome.",
+             [({"outcome": "hit"}, cache["hits"] - cache["disk_hits"]), ({"outcome": "disk_hit"}, cache["disk_hits"]),
+              ({"outcome": "miss"}, cache["misses"])]),
+            ("opax_classification_cache_hit_ratio", "gauge", "Share of classification cache lookups that hit.",
+             [({}, cache["hit_ratio"])]),
+            ("opax_classification_cache_entries", "gauge", "Entries in the in-memory classification cache.",
+             [({}, cache["size"])])
+        ]
+
+    results = result_cache.stats()
+    lookups = results["hits"] + results["coalesced"] + results["misses"]
+    families += [
+        ("opax_result_cache_lookups_total", "counter", "/analyze statement summary lookups by outcome.",
+         [({"outcome": "hit"}, results["hits"]), ({"outcome": "coalesced"}, results["coalesced"]),
+          ({"outcome": "miss"}, results["misses"])]),
+        ("opax_result_cache_hit_ratio", "gauge", "Share of statement summary lookups answered without computing.",
+         [({}, (results["hits"] + results["coalesced"]) / lookups if lookups else 0.0)]),
+        ("opax_result_cache_entries", "gauge", "Statement summaries held in the result cache.",
+         [({}, results["entries"])])
+    ]
+
+    if job_runner.running:
+        queue = job_runner.store.stats()
+        families.append(("opax_jobs", "gauge", "Analysis jobs in the durable queue by status.",
+                         [({"status": status}, queue[key]) for status, key in
+                          (("queued", "depth"), ("running", "running"), ("done", "done"), ("failed", "failed"))]))
+        families.append(("opax_job_oldest_queued_seconds", "gauge", "Age of the oldest queued analysis job.",
+                         [({}, queue["oldest_queued_seconds"] or 0.0)]))
+
+    families.append(("opax_asset_info", "gauge", "Content version of each hot-reloaded data asset.",
+                     [({"asset": name, "version": version or ""}, 1.0) for name, version in asset_versions().items()]))
+    return families
+
+registry.add_collector(service_families)
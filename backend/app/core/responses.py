@@ -0,0 +1,64 @@
+import datetime
+import json
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Types the standard library encoder does not know (orjson handles these natively)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed, else the standard library with the same output types."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with ``dumps``. Endpoints that return one directly also skip FastAPI's
+    jsonable_encoder pass, which dominates the cost of large analysis payloads.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def parse_fields(fields: Optional[str]) -> Optional[list]:
+    """Splits a ``fields=`` value ("tax_analysis.old_regime,chart_data") into dotted paths."""
+    if not fields:
+        return None
+    return [path.strip() for path in fields.split(",") if path.strip()] or None
+
+def project(content: Dict[str, Any], paths: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """
+    Keeps only the requested dotted ``paths`` of ``content`` (nested dicts keep their shape).
+    Raises ValueError naming the first path that does not exist.
+    """
+    if paths is None:
+        return content
+    projected: Dict[str, Any] = {}
+    for path in paths:
+        source, target = content, projected
+        keys = path.split(".")
+        for depth, key in enumerate(keys):
+            if not isinstance(source, dict) or key not in source:
+                raise ValueError(f"Unknown field: {path}")
+            source = source[key]
+            if depth == len(keys) - 1:
+                target[key] = source
+            else:
+                target = target.setdefault(key, {})
+    return projected
@@ -0,0 +1,56 @@
+import time
+from typing import Dict, Optional
+
+class WarmupState:
+    """Readiness of this process and where its startup time went (seconds per step)."""
+
+    __slots__ = ("ready", "running", "error", "timings")
+
+    def __init__(self):
+        self.ready = False
+        self.running = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    def status(self) -> Dict[str, object]:
+        state = "ready" if self.ready else "failed" if self.error else "warming" if self.running else "cold"
+        return {"status": state, "error": self.error, "timings": {k: round(v, 4) for k, v in self.timings.items()}}
+
+warmup_state = WarmupState()
+
+def warmup(import_seconds: Optional[float] = None) -> WarmupState:
+    """
+    Loads everything the first /analyze would otherwise load on the request path: the embedding
+    model and KB (single-flight, shared with lazy callers), one inference to initialize the
+    backend, and the compiled rules of every financial year. Blocking; run it off the event loop.
+    """
+    from app.ml.transaction_classifier import classifier
+    from app.services.tax_engine import tax_engine
+
+    state = warmup_state
+    state.running, state.error = True, None
+    if import_seconds is not None:
+        state.timings["app_import"] = import_seconds
+    start = time.time()
+    try:
+        classifier._init_model(state.timings)
+
+        step = time.time()
+        classifier.classify_batch(["warmup"])
+        state.timings["first_inference"] = time.time() - step
+
+        step = time.time()
+        for financial_year in tax_engine.available_years():
+            tax_engine.for_year(financial_year)
+        state.timings["tax_rules"] = time.time() - step
+    except Exception as e:
+        state.error = f"{type(e).__name__}: {e}"
+        print(f"Warmup failed: {state.error}")
+    else:
+        state.ready = True
+    finally:
+        state.running = False
+        state.timings["warmup_total"] = time.time() - start
+
+    print("Startup breakdown: " + ", ".join(f"{k}={v:.2f}s" for k, v in state.timings.items()))
+    return state
@@ -1,7 +1,46 @@
+import time
+
+_import_started = time.time()
+
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="OpenTax-AI API", version="1.0.0")
+from app.core import config
+from app.core.compression import CompressionMiddleware
+from app.core.executor import shutdown_executor
+from app.core.metrics import registry
+from app.core.responses import FastJSONResponse
+from app.core.assets import register_default_assets
+from app.core.warmup import warmup, warmup_state
+from app.services.bulk import shutdown_bulk_executor
+from app.services.jobs import job_runner
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Watch rules and KB files so edits are picked up without restarting workers
+    watcher = register_default_assets()
+    watcher.start()
+    # Load the model, KB and rules in the background; /readyz turns 200 once they are in memory
+    if config.WARMUP_ON_STARTUP and not warmup_state.ready:
+        warmup_state.running = True
+        asyncio.get_running_loop().run_in_executor(None, warmup, IMPORT_SECONDS)
+    # Drain queued /analyze jobs, including ones left over from a previous run
+    job_runner.start()
+    yield
+    await job_runner.stop()
+    watcher.stop()
+    # Release the analysis and bulk worker pools on shutdown
+    shutdown_executor()
+    shutdown_bulk_executor()
+
+app = FastAPI(title="OpenTax-AI API", version="1.0.0", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Brotli or gzip, as negotiated with the client
+app.add_middleware(CompressionMiddleware)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -16,8 +55,29 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to OpenTax-AI Backend API"}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving its event loop."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the startup warmup has loaded the model, KB and rules, 503 before."""
+    status = warmup_state.status()
+    if config.WARMUP_ON_STARTUP and not warmup_state.ready:
+        return FastJSONResponse(status, status_code=503)
+    return status
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of per-stage latency, classifier, cache and queue metrics."""
+    # Plain def: Starlette runs it in its threadpool, so the job queue's SQLite query stays off the loop
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 from app.api import endpoints
 
 # Include routers
 app.include_router(endpoints.router, prefix="/api/v1")
 
+# Seconds spent importing the app and its dependencies, reported in the startup breakdown
+IMPORT_SECONDS = time.time() - _import_started
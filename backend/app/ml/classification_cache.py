@@ -0,0 +1,137 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+class ClassificationCache:
+    """
+    Bounded LRU cache of classifier results keyed by the normalized description.
+
+    Every entry belongs to a version string (model name, KB content hash and similarity
+    threshold) that callers pass with each lookup and write, taken from the KB snapshot the
+    results were computed on. Entries of other versions are never served and age out of the
+    LRU, so batches still running on an old KB during a reload cannot evict or overwrite the
+    new version's entries. An optional SQLite file backs the memory tier so all workers on a
+    host share hits.
+    """
+
+    PRUNE_EVERY = 500  # Disk inserts between LRU prunes of the SQLite table
+
+    def __init__(self, max_entries: int, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = self._open_store(db_path) if db_path else None
+        self._pending_inserts = 0
+
+    @staticmethod
+    def _open_store(db_path: str) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "version TEXT NOT NULL, description TEXT NOT NULL, result TEXT NOT NULL, "
+            "last_used REAL NOT NULL, PRIMARY KEY (version, description))"
+        )
+        return conn
+
+    def get_many(self, version: str, descriptions: Iterable[str]) -> Dict[str, dict]:
+        """Returns cached ``version`` results for the descriptions that have one; counts hits and misses."""
+        found: Dict[str, dict] = {}
+        disk_lookup = []
+        with self._lock:
+            for desc in descriptions:
+                result = self._entries.get((version, desc))
+                if result is None:
+                    disk_lookup.append(desc)
+                else:
+                    self._entries.move_to_end((version, desc))
+                    found[desc] = result
+
+            if disk_lookup and self._conn is not None:
+                for desc, result in self._read_store(version, disk_lookup).items():
+                    found[desc] = result
+                    self._remember((version, desc), result)
+                    self.disk_hits += 1
+
+            self.hits += len(found)
+            self.misses += sum(1 for desc in disk_lookup if desc not in found)
+        return found
+
+    def put_many(self, version: str, results: Dict[str, dict]):
+        """Stores results computed under ``version``."""
+        if not results:
+            return
+        with self._lock:
+            for desc, result in results.items():
+                self._remember((version, desc), result)
+            if self._conn is not None:
+                self._write_store(version, results)
+
+    def _remember(self, key: Tuple[str, str], result: dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_store(self, version: str, descriptions: list) -> Dict[str, dict]:
+        found = {}
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(descriptions), 500):
+            chunk = descriptions[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT description, result FROM classifications WHERE version = ? AND description IN ({placeholders})",
+                [version, *chunk]
+            ).fetchall()
+            for desc, payload in rows:
+                found[desc] = json.loads(payload)
+            if rows:
+                self._conn.execute(
+                    f"UPDATE classifications SET last_used = ? WHERE version = ? AND description IN ({placeholders})",
+                    [time.time(), version, *[desc for desc, _ in rows]]
+                )
+        return found
+
+    def _write_store(self, version: str, results: Dict[str, dict]):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO classifications (version, description, result, last_used) VALUES (?, ?, ?, ?)",
+            [(version, desc, json.dumps(result), now) for desc, result in results.items()]
+        )
+        self._pending_inserts += len(results)
+        if self._pending_inserts >= self.PRUNE_EVERY:
+            self._pending_inserts = 0
+            # Drops least recently used rows, including rows left behind by older versions
+            self._conn.execute(
+                "DELETE FROM classifications WHERE rowid IN ("
+                "SELECT rowid FROM classifications ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM classifications")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
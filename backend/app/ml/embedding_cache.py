@@ -0,0 +1,123 @@
+import glob
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    On-disk store for knowledge base embeddings.
+
+    Each cache entry is a ``.npy`` matrix (opened memory-mapped) plus a ``.json`` sidecar listing
+    the hash of the text behind every row. Entries are keyed by the CSV content hash and the model
+    name, so a restart with an unchanged CSV is a plain file map. When the CSV changes, rows whose
+    text is already present in an older entry for the same model are copied over and only new or
+    edited rows are sent to the model.
+    """
+
+    KEEP_ENTRIES = 2  # Older entries of the same model kept around for incremental rebuilds
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.model_slug = re.sub(r'[^A-Za-z0-9]+', '-', model_name).strip('-').lower()
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _entry_paths(self, csv_hash: str) -> Tuple[str, str]:
+        stem = os.path.join(self.cache_dir, f"kb_{self.model_slug}_{csv_hash[:16]}")
+        return stem + ".npy", stem + ".json"
+
+    def load_or_build(self, csv_hash: str, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Returns a read-only embedding matrix for ``texts``, encoding only rows missing from the cache."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        npy_path, keys_path = self._entry_paths(csv_hash)
+        cached = self._load_entry(npy_path, keys_path)
+        if cached is not None and cached.shape[0] == len(texts):
+            return cached
+
+        text_hashes = [self._text_hash(t) for t in texts]
+        known = self._known_rows(exclude=npy_path)
+
+        missing = [i for i, h in enumerate(text_hashes) if h not in known]
+        fresh = np.asarray(encode([texts[i] for i in missing])) if missing else None
+
+        dim = fresh.shape[1] if fresh is not None else next(iter(known.values()))[0].shape[1]
+        dtype = fresh.dtype if fresh is not None else next(iter(known.values()))[0].dtype
+        embeddings = np.empty((len(texts), dim), dtype=dtype)
+        for i, h in enumerate(text_hashes):
+            if h in known:
+                matrix, row = known[h]
+                embeddings[i] = matrix[row]
+        if missing:
+            embeddings[missing] = fresh
+
+        print(f"Embedding cache: reused {len(texts) - len(missing)} rows, encoded {len(missing)}")
+        self._write_entry(npy_path, keys_path, embeddings, text_hashes)
+        self._prune()
+        return self._load_entry(npy_path, keys_path)
+
+    def _load_entry(self, npy_path: str, keys_path: str):
+        if not (os.path.exists(npy_path) and os.path.exists(keys_path)):
+            return None
+        try:
+            with open(keys_path, 'r') as f:
+                meta = json.load(f)
+            if meta.get("model") != self.model_name:
+                return None
+            return np.load(npy_path, mmap_mode='r')
+        except (OSError, ValueError):
+            # A truncated or foreign file is treated as a miss and rebuilt
+            return None
+
+    def _entries(self) -> List[str]:
+        """Sidecar paths for this model, newest first."""
+        pattern = os.path.join(self.cache_dir, f"kb_{self.model_slug}_*.json")
+        return sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)
+
+    def _known_rows(self, exclude: str) -> Dict[str, Tuple[np.ndarray, int]]:
+        known: Dict[str, Tuple[np.ndarray, int]] = {}
+        for keys_path in self._entries():
+            npy_path = keys_path[:-len(".json")] + ".npy"
+            if npy_path == exclude:
+                continue
+            matrix = self._load_entry(npy_path, keys_path)
+            if matrix is None:
+                continue
+            with open(keys_path, 'r') as f:
+                row_hashes = json.load(f)["rows"]
+            if len(row_hashes) != matrix.shape[0]:
+                continue
+            for row, h in enumerate(row_hashes):
+                known.setdefault(h, (matrix, row))
+        return known
+
+    def _write_entry(self, npy_path: str, keys_path: str, embeddings: np.ndarray, text_hashes: List[str]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to temp names and rename so concurrent workers never map a half-written file
+        suffix = f".{os.getpid()}.tmp"
+        with open(npy_path + suffix, 'wb') as f:
+            np.save(f, embeddings)
+        with open(keys_path + suffix, 'w') as f:
+            json.dump({"model": self.model_name, "rows": text_hashes}, f)
+        os.replace(npy_path + suffix, npy_path)
+        os.replace(keys_path + suffix, keys_path)
+
+    def _prune(self):
+        for keys_path in self._entries()[self.KEEP_ENTRIES:]:
+            for path in (keys_path, keys_path[:-len(".json")] + ".npy"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,26 @@
+import zlib
+
+import numpy as np
+
+
+class HashingEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer: hashes character trigrams into a fixed-size
+    vector. Used by the tests and the pipeline benchmark so neither needs the model download;
+    ``calls``/``encoded`` count encode() calls and texts encoded.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.calls = 0
+        self.encoded = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        self.encoded += len(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()}  "
+            for i in range(len(padded) - 2):
+                out[row, zlib.crc32(padded[i:i + 3].encode()) % self.dim] += 1.0
+        return out
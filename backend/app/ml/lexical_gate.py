@@ -0,0 +1,68 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from app.services.data_processing import clean_description
+
+# Routes returned by LexicalGate.route
+LEXICAL_MATCH = "lexical_match"
+LEXICAL_SKIP = "lexical_skip"
+EMBEDDING = "embedding"
+
+class LexicalGate:
+    """
+    Single compiled matcher that settles obvious rows before they reach the embedding model.
+
+    One regex alternation is built at KB load time from three pattern groups:
+      * ``inst``  - cleaned ``instrument_name`` phrases; a hit is an exact instrument match.
+      * ``guard`` - cleaned ``provider`` names plus generic tax keywords; they mark a row as
+        possibly tax related, so it is never skipped.
+      * ``skip``  - known non-tax spend (groceries, UPI transfers, rent, ...).
+    A row with an instrument phrase is matched, a row with only ``skip`` hits is settled as
+    non-tax, and everything else is ambiguous and goes to the embedding classifier.
+    """
+
+    def __init__(self, knowledge_base: pd.DataFrame, tax_keywords: Iterable[str], non_tax_patterns: Iterable[str]):
+        names = knowledge_base['instrument_name'].fillna('').map(clean_description)
+        providers = knowledge_base['provider'].fillna('').map(clean_description)
+
+        # First KB row wins when two instruments share a cleaned name (same tie-break as argmax)
+        self._phrase_rows: Dict[str, int] = {}
+        for row, phrase in enumerate(names):
+            if phrase:
+                self._phrase_rows.setdefault(phrase, row)
+
+        guards = {p for p in providers if p} | {clean_description(k) for k in tax_keywords}
+        skips = {clean_description(p) for p in non_tax_patterns}
+
+        self._matcher = re.compile(
+            r'\b(?:(?P<inst>' + self._alternation(self._phrase_rows) + r')'
+            r'|(?P<guard>' + self._alternation(guards) + r')'
+            r'|(?P<skip>' + self._alternation(skips) + r'))\b'
+        )
+
+    @staticmethod
+    def _alternation(phrases: Iterable[str]) -> str:
+        # Longest first so the leftmost hit is also the most specific one
+        ordered = sorted((p for p in phrases if p), key=len, reverse=True)
+        return '|'.join(re.escape(p) for p in ordered) or r'(?!x)x'
+
+    def route(self, description: str) -> Tuple[str, Optional[int]]:
+        """Returns the route for a cleaned description and, for lexical matches, the KB row."""
+        guarded = skipped = False
+        for hit in self._matcher.finditer(description):
+            kind = hit.lastgroup
+            if kind == 'inst':
+                return LEXICAL_MATCH, self._phrase_rows[hit.group()]
+            if kind == 'guard':
+                guarded = True
+            else:
+                skipped = True
+
+        if skipped and not guarded:
+            return LEXICAL_SKIP, None
+        return EMBEDDING, None
+
+    def route_many(self, descriptions: List[str]) -> List[Tuple[str, Optional[int]]]:
+        return [self.route(desc) for desc in descriptions]
@@ -1,10 +1,56 @@
 import pandas as pd
 import numpy as np
+import io
 import os
+import threading
 import time
 
 # We use lazy imports for heavy ML libraries so the FastAPI app starts instantly for other tests
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+def strip_bank_noise(description: str) -> str:
+    """Removes common bank channel tokens before the description is embedded."""
+    return description.replace("upi", "").replace("netbanking", "").replace("ecs", "")
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalizes each row, leaving all-zero rows untouched (same as sklearn's normalize)."""
+    norms = np.sqrt(np.einsum('ij,ij->i', matrix, matrix))
+    norms[norms == 0.0] = 1.0
+    return matrix / norms[:, np.newaxis]
+
+class KnowledgeBaseView:
+    """
+    Everything loaded from one knowledge base version. It is built off to the side and published
+    with a single attribute assignment, so a reload never mixes two versions in one batch.
+    """
+
+    __slots__ = ("frame", "embeddings", "index", "lexical_gate", "sections", "categories", "names", "version")
+
+    def __init__(self, frame: pd.DataFrame, embeddings: np.ndarray, index, lexical_gate, sections: np.ndarray,
+                 categories: np.ndarray, names: np.ndarray, version: Optional[str]):
+        self.frame = frame
+        self.embeddings = embeddings
+        self.index = index
+        self.lexical_gate = lexical_gate
+        self.sections = sections
+        self.categories = categories
+        self.names = names
+        self.version = version
+
+    def result(self, best_idx: int, best_score: float, threshold: float) -> dict:
+        if best_score >= threshold:
+            return {
+                "is_match": True,
+                "score": float(best_score),
+                "section": self.sections[best_idx],
+                "category": self.categories[best_idx],
+                "instrument": self.names[best_idx]
+            }
+        return {"is_match": False, "score": float(best_score)}
+
+def _kb_view_property(name: str) -> property:
+    """Read-only classifier attribute backed by the published KB view (None before the first load)."""
+    return property(lambda self: getattr(self.kb_view, name) if self.kb_view is not None else None)
 
 class TransactionClassifier:
     _instance = None
@@ -14,77 +60,222 @@ class TransactionClassifier:
         if cls._instance is None:
             cls._instance = super(TransactionClassifier, cls).__new__(cls)
             cls._instance.model = None
-            cls._instance.knowledge_base = None
-            cls._instance.kb_embeddings = None
+            cls._instance.result_cache = None
+            # The only KB state: every KB attribute below reads this one snapshot
+            cls._instance.kb_view = None
+            cls._instance._init_lock = threading.Lock()
         return cls._instance
 
-    def _init_model(self):
-        """Lazy load the sentence transformer model to prevent long boot times."""
-        from sentence_transformers import SentenceTransformer
-        from app.core.config import EMBEDDING_MODEL_NAME, TAX_INSTRUMENTS_PATH
-        
-        if self.model is None:
-            print(f"Loading SentenceTransformer: {EMBEDDING_MODEL_NAME}...")
-            start = time.time()
-            self.model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-            print(f"Model loaded in {time.time() - start:.2f}s")
-            
-        if self.knowledge_base is None:
-            self.knowledge_base = pd.read_csv(TAX_INSTRUMENTS_PATH)
-            # Create a rich text description combining name and category for better matching
-            texts_to_embed = (self.knowledge_base['instrument_name'] + " " +
-                              self.knowledge_base['provider'].fillna('') + " " +
-                              self.knowledge_base['category'].fillna('')).tolist()
-                              
+    knowledge_base = _kb_view_property("frame")
+    kb_embeddings = _kb_view_property("embeddings")
+    kb_index = _kb_view_property("index")
+    kb_sections = _kb_view_property("sections")
+    kb_categories = _kb_view_property("categories")
+    kb_names = _kb_view_property("names")
+    lexical_gate = _kb_view_property("lexical_gate")
+    kb_version = _kb_view_property("version")
+
+    def is_loaded(self) -> bool:
+        return self.model is not None and self.kb_view is not None and self.result_cache is not None
+
+    def ensure_loaded(self):
+        """Loads the model, KB and result cache if they are not in memory yet (blocking)."""
+        self._init_model()
+
+    def _init_model(self, timings: Optional[Dict[str, float]] = None):
+        """
+        Loads the sentence transformer, KB and result cache (normally at startup, see app.core.warmup).
+        Single-flight: concurrent first callers wait for one load instead of each loading the model.
+        If ``timings`` is given, the seconds spent in each step are recorded in it.
+        """
+        from app.core.config import EMBEDDING_MODEL_NAME, CLASSIFICATION_CACHE_SIZE, CLASSIFICATION_CACHE_PATH
+        from app.ml.classification_cache import ClassificationCache
+
+        if self.is_loaded():
+            return
+        with self._init_lock:
+            if self.model is None:
+                start = time.time()
+                from sentence_transformers import SentenceTransformer
+                imported = time.time()
+                print(f"Loading SentenceTransformer: {EMBEDDING_MODEL_NAME}...")
+                self.model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                print(f"Model loaded in {time.time() - start:.2f}s")
+                if timings is not None:
+                    timings["sentence_transformers_import"] = imported - start
+                    timings["model_load"] = time.time() - imported
+
+            if self.kb_view is None:
+                start = time.time()
+                self._set_knowledge_base(*self._load_knowledge_base())
+                if timings is not None:
+                    timings["knowledge_base"] = time.time() - start
+
+            if self.result_cache is None:
+                self.result_cache = ClassificationCache(CLASSIFICATION_CACHE_SIZE, CLASSIFICATION_CACHE_PATH or None)
+
+    def _load_knowledge_base(self):
+        """Reads tax_instruments.csv and embeds it (reusing persisted embeddings); returns (kb, embeddings, version)."""
+        from app.core.config import EMBEDDING_MODEL_NAME, TAX_INSTRUMENTS_PATH, EMBEDDING_CACHE_DIR
+        from app.ml.embedding_cache import EmbeddingCache
+
+        with open(TAX_INSTRUMENTS_PATH, 'rb') as f:
+            raw_csv = f.read()
+        knowledge_base = pd.read_csv(io.BytesIO(raw_csv))
+        # Create a rich text description combining name and category for better matching
+        texts_to_embed = (knowledge_base['instrument_name'] + " " +
+                          knowledge_base['provider'].fillna('') + " " +
+                          knowledge_base['category'].fillna('')).tolist()
+
+        csv_hash = EmbeddingCache.content_hash(raw_csv)
+        if EMBEDDING_CACHE_DIR:
+            # Map persisted embeddings keyed by CSV content + model; only new/edited rows are encoded
+            cache = EmbeddingCache(EMBEDDING_CACHE_DIR, EMBEDDING_MODEL_NAME)
+            kb_embeddings = cache.load_or_build(csv_hash, texts_to_embed, self.model.encode)
+        else:
             print("Embedding knowledge base...")
-            self.kb_embeddings = self.model.encode(texts_to_embed)
+            kb_embeddings = self.model.encode(texts_to_embed)
+        return knowledge_base, kb_embeddings, csv_hash[:16]
+
+    def _set_knowledge_base(self, knowledge_base: pd.DataFrame, kb_embeddings: np.ndarray, version: Optional[str] = None):
+        """
+        Builds the KB search index, per-row lookup arrays and lexical gate into a new view and publishes
+        it. Callers hold _init_lock, so a first load and a reload never publish over each other.
+        """
+        from app.core.config import (
+            TAX_KEYWORDS, NON_TAX_PATTERNS, VECTOR_INDEX, VECTOR_INDEX_NPROBE, VECTOR_INDEX_IVF_MIN_ROWS
+        )
+        from app.ml.lexical_gate import LexicalGate
+        from app.ml.vector_index import build_index
+
+        kb_normed = normalize_rows(np.asarray(kb_embeddings))
+        view = KnowledgeBaseView(
+            knowledge_base,
+            kb_embeddings,
+            build_index(kb_normed, VECTOR_INDEX, VECTOR_INDEX_NPROBE, VECTOR_INDEX_IVF_MIN_ROWS),
+            LexicalGate(knowledge_base, TAX_KEYWORDS, NON_TAX_PATTERNS),
+            knowledge_base['section'].to_numpy(dtype=object),
+            knowledge_base['category'].to_numpy(dtype=object),
+            knowledge_base['instrument_name'].to_numpy(dtype=object),
+            version
+        )
+        self.kb_view = view
+
+    def reload_knowledge_base(self) -> bool:
+        """
+        Rebuilds the KB from tax_instruments.csv and swaps it in while requests keep using the old one.
+        Returns False when nothing is loaded yet (the next first use reads the new file anyway).
+        """
+        with self._init_lock:
+            if self.model is None or self.kb_view is None:
+                return False
+            self._set_knowledge_base(*self._load_knowledge_base())
+        return True
 
     def classify_transaction(self, description: str) -> dict:
         """
         Takes a transaction description, computes cosine similarity against
         all known tax instruments, and returns the best match if threshold is met.
         """
-        from sklearn.metrics.pairwise import cosine_similarity
-        from app.core.config import SIMILARITY_THRESHOLD
-        
+        return self.classify_batch([description])[0]
+
+    def classify_batch(self, descriptions: List[str], stats: Optional[Dict[str, int]] = None) -> List[dict]:
+        """
+        Classifies many descriptions at once. Duplicate descriptions are embedded a single time,
+        all unique queries go through one encode call and are scored with one matrix product.
+        If ``stats`` is given, it is filled with the number of rows settled by each path.
+        """
+        from app.core.config import EMBEDDING_MODEL_NAME, SIMILARITY_THRESHOLD, LEXICAL_GATE_ENABLED
+        from app.core.metrics import CLASSIFIED_ROWS, EMBEDDING_BATCH_SIZE, EMBEDDING_SECONDS, SIMILARITY_SCORE
+        from app.ml.lexical_gate import LEXICAL_MATCH, LEXICAL_SKIP, EMBEDDING
+
+        if not descriptions:
+            return []
+
         self._init_model()  # Ensure ML is loaded
+        kb = self.kb_view  # One KB version for the whole batch, even if a reload lands meanwhile
 
-        # Remove common bank noise
-        clean_desc = description.replace("upi", "").replace("netbanking", "").replace("ecs", "")
-        
-        # Embed the query
-        query_embedding = self.model.encode([clean_desc])
-        
-        # Calculate similarity [1, N] array
-        similarities = cosine_similarity(query_embedding, self.kb_embeddings)[0]
-        
-        best_idx = np.argmax(similarities)
-        best_score = similarities[best_idx]
-        
-        if best_score >= SIMILARITY_THRESHOLD:
-            match = self.knowledge_base.iloc[best_idx]
-            return {
-                "is_match": True,
-                "score": float(best_score),
-                "section": match['section'],
-                "category": match['category'],
-                "instrument": match['instrument_name']
+        # De-duplicate while keeping first-seen order; codes map every input back to its unique query
+        unique_index: Dict[str, int] = {}
+        codes = [unique_index.setdefault(strip_bank_noise(desc), len(unique_index)) for desc in descriptions]
+        queries = list(unique_index)
+
+        known: Dict[str, dict] = {}
+        paths: Dict[str, str] = {}
+        if LEXICAL_GATE_ENABLED:
+            # Exact instrument names and obvious everyday spend never reach the model
+            for query, (path, kb_idx) in zip(queries, kb.lexical_gate.route_many(queries)):
+                if path == LEXICAL_MATCH:
+                    known[query] = kb.result(kb_idx, 1.0, SIMILARITY_THRESHOLD)
+                elif path == LEXICAL_SKIP:
+                    known[query] = {"is_match": False, "score": 0.0}
+                else:
+                    continue
+                paths[query] = path
+
+        # Results computed under another model, KB or threshold are never reused; the version comes
+        # from the same KB snapshot as the scores, so a reload mid-batch cannot mislabel them
+        cache_version = f"{EMBEDDING_MODEL_NAME}|{kb.version}|{SIMILARITY_THRESHOLD}"
+        for query, result in self.result_cache.get_many(cache_version, [q for q in queries if q not in known]).items():
+            known[query] = result
+            paths[query] = "cache"
+        pending = [q for q in queries if q not in known]
+
+        if pending:
+            with EMBEDDING_SECONDS.time():
+                query_embeddings = np.asarray(self.model.encode(pending))
+            EMBEDDING_BATCH_SIZE.observe(len(pending))
+
+            # Best cosine match per query from the KB index (exact search is one matrix product)
+            best_idx, best_scores = kb.index.search(normalize_rows(query_embeddings), k=1)
+            SIMILARITY_SCORE.observe_many(best_scores[:, 0])
+
+            computed = {
+                query: kb.result(idx, score, SIMILARITY_THRESHOLD)
+                for query, idx, score in zip(pending, best_idx[:, 0], best_scores[:, 0])
             }
-            
-        return {"is_match": False, "score": float(best_score)}
+            self.result_cache.put_many(cache_version, computed)
+            known.update(computed)
+
+        # Rows per settling path: each unique description weighted by how often it repeats
+        repeats = np.bincount(codes, minlength=len(queries))
+        path_rows: Dict[str, int] = {}
+        for query, count in zip(queries, repeats.tolist()):
+            path = paths.get(query, EMBEDDING)
+            path_rows[path] = path_rows.get(path, 0) + count
+        for path, count in path_rows.items():
+            CLASSIFIED_ROWS.inc(count, path)
+            if stats is not None:
+                stats[path] = stats.get(path, 0) + count
+
+        unique_results = [known[q] for q in queries]
+        return [dict(unique_results[code]) for code in codes]
+
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters of the cross-request classification cache."""
+        return self.result_cache.stats() if self.result_cache is not None else {}
 
-    def process_transactions(self, transactions: list) -> list:
+    def process_batch(self, batch, stats: Optional[Dict[str, int]] = None):
+        """Fills the section/category/flag columns of a TransactionBatch in place and returns it."""
+        results = self.classify_batch(batch.description.tolist(), stats)
+
+        for row, result in enumerate(results):
+            if result['is_match']:
+                batch.set_classification(row, result['section'], result['category'])
+
+        return batch
+
+    def process_transactions(self, transactions: list, stats: Optional[Dict[str, int]] = None) -> list:
         """Enriches a list of Transaction models with tax classifications."""
-        from app.models.schemas import Transaction
-        
-        for txn in transactions:
-            # We already ran clean_description during parsing
-            result = self.classify_transaction(txn.description)
+        # We already ran clean_description during parsing
+        results = self.classify_batch([txn.description for txn in transactions], stats)
+
+        for txn, result in zip(transactions, results):
             if result['is_match']:
                 txn.tax_section = result['section']
                 txn.category = result['category']
                 txn.is_tax_saving = True
-            
+
         return transactions
 
 # Global instance
@@ -0,0 +1,122 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+class ExactIndex:
+    """Brute-force cosine search; the reference implementation every other index is measured against."""
+
+    def __init__(self, vectors: np.ndarray):
+        # Vectors are expected to be row-normalized, so a dot product is the cosine similarity
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns ``(indices, scores)`` of shape [Q, k], best match first."""
+        scores = queries @ self.vectors.T
+        return _top_k(scores, k)
+
+class ClusteredIndex:
+    """
+    Inverted-file (IVF) approximate search written in NumPy.
+
+    Vectors are partitioned with spherical k-means. A query is scored against the centroids
+    first and only the members of its ``n_probe`` closest clusters are scanned. ``n_probe`` is the
+    recall knob: 1 is fastest, ``n_clusters`` scans everything and returns the exact result.
+    """
+
+    TRAIN_SAMPLE = 20000  # Points used to fit centroids; the rest are only assigned
+    CHUNK = 8192          # Rows scored per block when assigning, to bound temporary memory
+
+    def __init__(self, vectors: np.ndarray, n_clusters: Optional[int] = None, n_probe: int = 8,
+                 iterations: int = 10, seed: int = 0):
+        self.vectors = vectors
+        n = vectors.shape[0]
+        self.n_clusters = max(1, min(n, n_clusters or int(round(math.sqrt(n)))))
+        self.n_probe = n_probe
+        rng = np.random.default_rng(seed)
+
+        sample = vectors
+        if n > self.TRAIN_SAMPLE:
+            sample = vectors[rng.choice(n, self.TRAIN_SAMPLE, replace=False)]
+        self.centroids = self._fit_centroids(np.asarray(sample), iterations, rng)
+
+        # Inverted lists as one permutation sorted by cluster plus offsets into it
+        assignments = self._assign(vectors)
+        self.order = np.argsort(assignments, kind='stable')
+        self.offsets = np.searchsorted(assignments[self.order], np.arange(self.n_clusters + 1))
+        self.sorted_vectors = np.ascontiguousarray(vectors[self.order])
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def _fit_centroids(self, sample: np.ndarray, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        centroids = sample[rng.choice(sample.shape[0], self.n_clusters, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=self.n_clusters)
+
+            # Empty clusters are re-seeded from random points instead of collapsing
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample.shape[0], int(empty.sum()), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            centroids = (sums / norms).astype(sample.dtype, copy=False)
+        return centroids
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assignments = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], self.CHUNK):
+            block = np.asarray(vectors[start:start + self.CHUNK])
+            assignments[start:start + self.CHUNK] = (block @ self.centroids.T).argmax(axis=1)
+        return assignments
+
+    def search(self, queries: np.ndarray, k: int = 1, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns ``(indices, scores)`` of shape [Q, k] over the probed clusters, best match first."""
+        n_probe = max(1, min(self.n_clusters, n_probe or self.n_probe))
+        n_queries = queries.shape[0]
+        probes, _ = _top_k(queries @ self.centroids.T, n_probe)
+
+        # Slot j of a query holds the top-k candidates found in its j-th probed cluster
+        cand_scores = np.full((n_queries, n_probe * k), -np.inf, dtype=np.float64)
+        cand_idx = np.zeros((n_queries, n_probe * k), dtype=np.int64)
+
+        # Work cluster by cluster so each inverted list is scored against all its queries at once
+        for cluster in np.unique(probes):
+            start, end = self.offsets[cluster], self.offsets[cluster + 1]
+            if start == end:
+                continue
+            rows, slots = np.nonzero(probes == cluster)
+            local_idx, local_scores = _top_k(queries[rows] @ self.sorted_vectors[start:end].T, k)
+            width = local_idx.shape[1]
+            cols = slots[:, np.newaxis] * k + np.arange(width)
+            cand_scores[rows[:, np.newaxis], cols] = local_scores
+            cand_idx[rows[:, np.newaxis], cols] = self.order[start + local_idx]
+
+        best, scores = _top_k(cand_scores, k)
+        return np.take_along_axis(cand_idx, best, axis=1), scores
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-wise top-k of a score matrix, sorted best first (ties keep the lowest column)."""
+    k = min(k, scores.shape[1])
+    if k == 1:
+        idx = scores.argmax(axis=1)[:, np.newaxis]
+    else:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        idx = np.take_along_axis(part, np.argsort(-part_scores, axis=1, kind='stable'), axis=1)
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+def build_index(vectors: np.ndarray, kind: str = "auto", n_probe: int = 8, ivf_min_rows: int = 5000):
+    """Builds the configured index; ``auto`` keeps exact search until the KB is large enough to benefit."""
+    if kind == "exact" or (kind == "auto" and vectors.shape[0] < ivf_min_rows):
+        return ExactIndex(vectors)
+    if kind in ("ivf", "auto"):
+        return ClusteredIndex(vectors, n_probe=n_probe)
+    raise ValueError(f"Unknown vector index type: {kind}")
@@ -33,6 +33,26 @@ class SimulationRequest(BaseModel):
     investments_80d: float
     investments_nps: float
     expected_growth: float = 0.0
+    financial_year: Optional[str] = None  # Default rules when omitted
+
+class SimulationScenario(BaseModel):
+    salary: float
+    investments_80c: float = 0.0
+    investments_80d: float = 0.0
+    investments_nps: float = 0.0
+
+class SimulationGrid(BaseModel):
+    # Values along each axis; the grid is their cartesian product (salary x 80C x 80D x NPS)
+    salary: List[float]
+    investments_80c: List[float] = [0.0]
+    investments_80d: List[float] = [0.0]
+    investments_nps: List[float] = [0.0]
+
+class BatchSimulationRequest(BaseModel):
+    age: int
+    financial_year: Optional[str] = None
+    scenarios: Optional[List[SimulationScenario]] = None
+    grid: Optional[SimulationGrid] = None
 
 class SimulationResponse(BaseModel):
     old_tax: float
@@ -0,0 +1,115 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import Transaction
+
+NO_SECTION = -1
+
+def extract_month_numbers(dates: np.ndarray) -> np.ndarray:
+    """
+    Calendar month number per date string (-1 when none is found), using the DD/MM/YYYY or
+    YYYY-MM-DD pattern the monthly charts have always relied on. Each distinct date is parsed once.
+    """
+    codes, uniques = pd.factorize(pd.Series(dates, dtype=object), use_na_sentinel=False)
+    months = pd.Series(uniques, dtype=object).str.extract(r'[\-/]([0-9]{2})[\-/]', expand=False)
+    lookup = pd.to_numeric(months, errors='coerce').fillna(-1).to_numpy(dtype=np.int16)
+    return lookup[codes]
+
+def fy_month_buckets(month_num: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """Sums amounts into 12 FY-ordered buckets (Apr=0 .. Mar=11); rows without a month are skipped."""
+    found = month_num >= 0
+    # Map calendar month to FY relative index (Apr=0, Mar=11)
+    idx = (month_num[found].astype(np.int64) - 4) % 12
+    weights = np.asarray(amounts, dtype=np.float64)[found]
+    return np.bincount(idx, weights=weights, minlength=12).astype(np.float64, copy=False)
+
+class TransactionBatch:
+    """
+    Struct-of-arrays view of a statement: one NumPy column per field instead of one Pydantic
+    model per row. The classifier fills the section/category/flag columns in place and the tax
+    engine reduces over them; Transaction models are only built at the API boundary.
+
+    ``section_code`` indexes into ``sections`` (``NO_SECTION`` when unclassified), which keeps
+    per-section reductions down to a single ``np.bincount``.
+    """
+
+    __slots__ = ("date", "description", "amount", "month", "section_code", "sections", "category", "is_tax_saving")
+
+    def __init__(self, date: np.ndarray, description: np.ndarray, amount: np.ndarray):
+        self.date = np.asarray(date, dtype=object)
+        self.description = np.asarray(description, dtype=object)
+        self.amount = np.asarray(amount, dtype=np.float64)
+        self.month = extract_month_numbers(self.date)
+        self.section_code = np.full(len(self.amount), NO_SECTION, dtype=np.int16)
+        self.sections: List[str] = []
+        self.category = np.full(len(self.amount), None, dtype=object)
+        self.is_tax_saving = np.zeros(len(self.amount), dtype=bool)
+
+    @classmethod
+    def from_statement(cls, statement: pd.DataFrame) -> "TransactionBatch":
+        """Builds a batch from the date/description/amount frame produced by normalize_statement."""
+        return cls(statement['date'].to_numpy(dtype=object),
+                   statement['description'].to_numpy(dtype=object),
+                   statement['amount'].to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Transaction]) -> "TransactionBatch":
+        batch = cls([t.date for t in transactions], [t.description for t in transactions],
+                    [t.amount for t in transactions])
+        for row, txn in enumerate(transactions):
+            if txn.tax_section is not None or txn.is_tax_saving:
+                batch.set_classification(row, txn.tax_section, txn.category)
+                batch.is_tax_saving[row] = txn.is_tax_saving
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def section_index(self, section: Optional[str]) -> int:
+        if section is None:
+            return NO_SECTION
+        try:
+            return self.sections.index(section)
+        except ValueError:
+            self.sections.append(section)
+            return len(self.sections) - 1
+
+    def set_classification(self, row: int, section: Optional[str], category: Optional[str]):
+        self.section_code[row] = self.section_index(section)
+        self.category[row] = category
+        self.is_tax_saving[row] = True
+
+    def tax_section(self) -> np.ndarray:
+        """Section label per row (None when unclassified)."""
+        labels = np.array(self.sections + [None], dtype=object)
+        return labels[self.section_code]  # NO_SECTION (-1) picks the trailing None
+
+    def section_totals(self, sections: Iterable[str]) -> Dict[str, float]:
+        """Sums tax-saving amounts per requested section with one bincount."""
+        mask = self.is_tax_saving & (self.section_code != NO_SECTION)
+        sums = np.bincount(self.section_code[mask], weights=self.amount[mask], minlength=len(self.sections))
+        return {s: float(sums[self.sections.index(s)]) if s in self.sections else 0.0 for s in sections}
+
+    def monthly_expenses(self) -> np.ndarray:
+        """Amounts summed into 12 FY-ordered buckets (Apr=0 .. Mar=11)."""
+        return fy_month_buckets(self.month, self.amount)
+
+    def tax_saving_records(self) -> List[Dict[str, Any]]:
+        """Plain dicts for the tax-saving rows, as returned under discovered_investments."""
+        rows = np.flatnonzero(self.is_tax_saving)
+        sections = self.tax_section()
+        return [
+            {"date": self.date[i], "description": self.description[i], "amount": float(self.amount[i]),
+             "section": sections[i], "category": self.category[i]}
+            for i in rows
+        ]
+
+    def to_transactions(self) -> List[Transaction]:
+        sections = self.tax_section()
+        return [
+            Transaction(date=self.date[i], description=self.description[i], amount=float(self.amount[i]),
+                        category=self.category[i], tax_section=sections[i], is_tax_saving=bool(self.is_tax_saving[i]))
+            for i in range(len(self))
+        ]
@@ -0,0 +1,148 @@
+import asyncio
+import io
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.core.assets import asset_versions
+from app.core.config import EMBEDDING_MODEL_NAME, SIMILARITY_THRESHOLD, STREAM_CHUNK_ROWS, STREAM_MAX_CHUNK_ROWS
+from app.core.executor import run_stage, StageTimeoutError
+from app.core.metrics import STATEMENT_ROWS
+from app.models.schemas import UserProfile
+from app.models.transaction_batch import TransactionBatch
+from app.services import ingestion
+from app.services.data_processing import get_monthly_aggregates, parse_statement_batch
+from app.services.result_cache import result_cache, statement_digest
+from app.services.tax_engine import tax_engine
+from app.ml.transaction_classifier import classifier
+
+# Stage functions for the /analyze pipeline. They are module-level so they can be shipped
+# to either a thread or a process executor (see app.core.executor.run_stage).
+
+def read_statement(contents: bytes, fmt: str = "csv") -> pd.DataFrame:
+    """Reads the raw uploaded statement bytes (CSV, Parquet or Arrow IPC) into a DataFrame."""
+    return ingestion.read_statement(contents, fmt)
+
+def classify_transactions(batch: TransactionBatch) -> Tuple[TransactionBatch, Dict[str, int]]:
+    """Runs the ML classifier over the batch and returns it plus per-path row counts."""
+    stats: Dict[str, int] = {}
+    classified = classifier.process_batch(batch, stats)
+    return classified, stats
+
+def summarize(profile: UserProfile, batch: TransactionBatch) -> Tuple[Dict[str, Any], Dict[str, List[float]]]:
+    """Runs the deterministic tax engine and the monthly chart aggregation."""
+    analysis_result = tax_engine.analyze_profile(profile, batch)
+    chart_data = get_monthly_aggregates(batch)
+    return analysis_result, chart_data
+
+class StatementError(ValueError):
+    """The statement cannot be read or holds no expense rows (a client error, reported as HTTP 400)."""
+
+def statement_summary(batch: TransactionBatch, classification_stats: Dict[str, int]) -> Dict[str, Any]:
+    """Everything /analyze needs from a classified statement that does not depend on the profile."""
+    return {
+        "discovered": batch.tax_saving_records(),
+        "section_totals": tax_engine.section_totals(batch),
+        "chart_data": get_monthly_aggregates(batch),
+        "classification_stats": classification_stats
+    }
+
+def summary_key(digest: str, path: str) -> str:
+    """Result cache key: statement content plus everything that changes how its rows classify."""
+    instruments = asset_versions().get("tax_instruments")
+    return f"{digest}|{path}|{EMBEDDING_MODEL_NAME}|{SIMILARITY_THRESHOLD}|{instruments}"
+
+async def analysis_response(profile: UserProfile, summary: Dict[str, Any], cache: str) -> Dict[str, Any]:
+    """
+    The /analyze response body, shared by the in-memory, streaming and job paths. Only the tax
+    step runs per profile, so a cached statement answers any salary, age or financial year.
+    """
+    analysis_result = await run_stage("analyze", tax_engine.analyze_totals, profile, summary["section_totals"])
+    return {
+        "status": "success",
+        "timestamp": datetime.now().isoformat(),
+        "profile": profile.model_dump(),
+        # Matches are returned for transparency
+        "discovered_investments": summary["discovered"],
+        "tax_analysis": analysis_result,
+        "chart_data": summary["chart_data"],
+        "classification_stats": summary["classification_stats"],
+        "asset_versions": asset_versions(),
+        "cache": cache
+    }
+
+async def summarize_contents(contents: bytes, fmt: str = "csv") -> Dict[str, Any]:
+    """Full in-memory pipeline; heavy stages run on the analysis executor, off the event loop."""
+    label = ingestion.FORMAT_LABELS[fmt]
+    # 1. Read the statement (Parquet/Arrow columns arrive already typed)
+    try:
+        df = await run_stage("read", read_statement, contents, fmt)
+    except StageTimeoutError:
+        raise
+    except Exception:
+        raise StatementError(f"Failed to parse {label} file")
+
+    # 2. Parse RAW into a columnar transaction batch
+    raw_batch = await run_stage("parse", parse_statement_batch, df)
+    if not len(raw_batch):
+        raise StatementError(f"No readable expense transactions found in {label}")
+
+    # 3. Classify transactions (ML Layer); stats count rows settled by each path
+    classified_batch, classification_stats = await run_stage("classify", classify_transactions, raw_batch)
+
+    # 4. Reduce to deduction totals, matches and monthly chart data
+    STATEMENT_ROWS.observe(len(classified_batch))
+    return await run_stage("aggregate", statement_summary, classified_batch, classification_stats)
+
+async def summarize_file(fileobj: BinaryIO, chunk_size: Optional[int] = None, fmt: str = "csv") -> Dict[str, Any]:
+    """Reads a statement file in row chunks and folds each one into running totals, so memory stays bounded."""
+    from app.services.streaming import process_chunk, StatementAccumulator
+
+    rows = min(chunk_size or STREAM_CHUNK_ROWS, STREAM_MAX_CHUNK_ROWS)
+    label = ingestion.FORMAT_LABELS[fmt]
+    loop = asyncio.get_running_loop()
+    accumulator = StatementAccumulator()
+
+    try:
+        reader = ingestion.statement_chunks(fileobj, fmt, rows)
+    except Exception:
+        raise StatementError(f"Failed to parse {label} file")
+
+    with reader as chunks:
+        while True:
+            try:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+            except Exception:
+                raise StatementError(f"Failed to parse {label} file")
+            if chunk is None:
+                break
+            accumulator.add(await run_stage("classify", process_chunk, chunk))
+
+    if accumulator.rows == 0:
+        raise StatementError(f"No readable expense transactions found in {label}")
+
+    STATEMENT_ROWS.observe(accumulator.rows)
+    return {
+        "discovered": accumulator.discovered,
+        "section_totals": accumulator.section_totals,
+        "chart_data": accumulator.chart_data(),
+        "classification_stats": accumulator.classification_stats
+    }
+
+async def analyze_contents(contents: bytes, profile: UserProfile, fmt: str = "csv") -> Dict[str, Any]:
+    """/analyze for an in-memory upload; repeated and concurrent identical statements share one summary."""
+    digest = await asyncio.get_running_loop().run_in_executor(None, statement_digest, io.BytesIO(contents),
+                                                              1 << 20, fmt == "csv")
+    summary, cache = await result_cache.get_or_compute(summary_key(digest, f"memory:{fmt}"),
+                                                       lambda: summarize_contents(contents, fmt))
+    return await analysis_response(profile, summary, cache)
+
+async def analyze_file(fileobj: BinaryIO, profile: UserProfile, chunk_size: Optional[int] = None,
+                       fmt: str = "csv") -> Dict[str, Any]:
+    """/analyze for a (large) seekable statement file, processed in row chunks."""
+    digest = await asyncio.get_running_loop().run_in_executor(None, statement_digest, fileobj, 1 << 20, fmt == "csv")
+    fileobj.seek(0)
+    summary, cache = await result_cache.get_or_compute(summary_key(digest, f"stream:{fmt}"),
+                                                       lambda: summarize_file(fileobj, chunk_size, fmt))
+    return await analysis_response(profile, summary, cache)
@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import zipfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from app.core import config
+from app.core.assets import asset_versions, register_default_assets, sync_assets_and_call
+from app.core.responses import dumps
+from app.models.schemas import UserProfile
+from app.services.analysis import read_statement, classify_transactions, summarize
+from app.services.data_processing import parse_statement_batch
+
+# Archive member holding one {"id": <statement file stem>, "profile": {...}} object per line
+ARCHIVE_MANIFEST = "profiles.ndjson"
+
+class BulkInputError(ValueError):
+    """Raised when a bulk payload (NDJSON line or archive) cannot be read at all."""
+
+def analyze_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs the full /analyze pipeline for one employee. ``record`` holds a ``profile`` and either
+    ``transactions`` (list of date/description/amount objects) or ``statement_csv`` (CSV text or
+    bytes). Failures are reported in the result instead of raised, so one bad record never
+    aborts the rest of the payroll.
+    """
+    result: Dict[str, Any] = {"index": record.get("index"), "id": record.get("id")}
+    try:
+        profile = UserProfile(**record["profile"])
+        if "transactions" in record:
+            df = pd.DataFrame.from_records(record["transactions"])
+        else:
+            statement = record["statement_csv"]
+            df = read_statement(statement.encode() if isinstance(statement, str) else statement)
+
+        batch = parse_statement_batch(df)
+        if not len(batch):
+            raise ValueError("No readable expense transactions found")
+        batch, classification_stats = classify_transactions(batch)
+        analysis_result, chart_data = summarize(profile, batch)
+    except KeyError as e:
+        result.update(status="error", detail=f"Missing field {e}")
+        return result
+    except Exception as e:
+        result.update(status="error", detail=str(e))
+        return result
+
+    result.update(
+        status="success",
+        profile=profile.model_dump(),
+        discovered_investments=batch.tax_saving_records(),
+        tax_analysis=analysis_result,
+        chart_data=chart_data,
+        classification_stats=classification_stats
+    )
+    return result
+
+def iter_ndjson_records(lines: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """One record per non-blank NDJSON line; unreadable lines become records that fail cleanly."""
+    index = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record must be a JSON object")
+        except ValueError as e:
+            record = {"error": f"Invalid NDJSON line: {e}"}
+        record["index"] = index
+        index += 1
+        yield record
+
+def iter_archive_records(archive: io.IOBase) -> Iterator[Dict[str, Any]]:
+    """
+    Yields one record per CSV statement in a zip archive. Profiles come from the archive's
+    profiles.ndjson manifest, matched on the statement's file name without extension.
+    """
+    try:
+        bundle = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        raise BulkInputError("Archive is not a valid zip file")
+
+    with bundle:
+        names = {os.path.basename(n): n for n in bundle.namelist() if not n.endswith('/')}
+        if ARCHIVE_MANIFEST not in names:
+            raise BulkInputError(f"Archive has no {ARCHIVE_MANIFEST} manifest")
+        profiles = {}
+        for line in bundle.read(names[ARCHIVE_MANIFEST]).splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                profiles[str(entry["id"])] = entry["profile"]
+
+        index = 0
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != ".csv":
+                continue
+            record = {"index": index, "id": stem, "statement_csv": bundle.read(names[name])}
+            if stem in profiles:
+                record["profile"] = profiles[stem]
+            else:
+                record["error"] = f"No profile for '{stem}' in {ARCHIVE_MANIFEST}"
+            index += 1
+            yield record
+
+def run_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Executor entry point: records rejected while reading the input are answered without work."""
+    if "error" in record:
+        return {"index": record.get("index"), "id": record.get("id"), "status": "error", "detail": record["error"]}
+    return analyze_record(record)
+
+def _init_bulk_worker(model, settings: Dict[str, Any]):
+    """
+    Per-process setup for bulk workers. They start from a fresh interpreter (forkserver/spawn),
+    so they get the parent's settings and embedding model and load the KB and caches themselves.
+    With EMBEDDING_CACHE_DIR set the KB embeddings are mapped from the entry the parent already
+    wrote, so workers only rebuild the index; without it every worker encodes the KB again.
+    """
+    from app.ml.transaction_classifier import classifier
+
+    for name, value in settings.items():
+        setattr(config, name, value)
+    # Parallelism comes from the processes; stop each one from spawning a full BLAS/torch pool
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(1)
+    classifier.model = model
+    classifier.ensure_loaded()
+    # Tracks the rules and KB files this worker loaded, so records can catch it up after a reload
+    register_default_assets()
+
+def bulk_worker_count() -> int:
+    return config.BULK_MAX_WORKERS or os.cpu_count() or 1
+
+_bulk_executor = None
+_bulk_executor_key = None
+_bulk_executor_lock = threading.Lock()
+
+def _create_bulk_executor() -> Executor:
+    from app.ml.transaction_classifier import classifier
+
+    workers = bulk_worker_count()
+    if config.BULK_EXECUTOR == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="opax-bulk")
+    if config.BULK_EXECUTOR != "process":
+        raise ValueError(f"Unknown BULK_EXECUTOR: {config.BULK_EXECUTOR}")
+    # Never fork: this process already runs threads (server, asset watcher, stage and torch pools)
+    # and holds SQLite connections, neither of which survives a fork safely
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    settings = {name: value for name, value in vars(config).items() if name.isupper()}
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_bulk_worker,
+                               initargs=(classifier.model, settings))
+
+def get_bulk_executor() -> Executor:
+    """
+    The pool shared by bulk requests, created on first use. It is replaced when the executor
+    settings, the embedding model or the KB version change, so workers never score with a stale KB;
+    requests still running on a replaced pool finish on it.
+    """
+    global _bulk_executor, _bulk_executor_key
+    from app.ml.transaction_classifier import classifier
+
+    key = (config.BULK_EXECUTOR, bulk_worker_count(), id(classifier.model), classifier.kb_version)
+    with _bulk_executor_lock:
+        if _bulk_executor is None or key != _bulk_executor_key:
+            previous = _bulk_executor
+            _bulk_executor, _bulk_executor_key = _create_bulk_executor(), key
+            if previous is not None:
+                previous.shutdown(wait=False)
+        return _bulk_executor
+
+def discard_bulk_executor(executor: Executor):
+    """Drops a broken pool (a worker died) so the next request starts a fresh one."""
+    global _bulk_executor
+    with _bulk_executor_lock:
+        if _bulk_executor is executor:
+            _bulk_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_bulk_executor():
+    global _bulk_executor
+    with _bulk_executor_lock:
+        executor, _bulk_executor = _bulk_executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def stream_bulk_results(records: Iterator[Dict[str, Any]],
+                              versions: Optional[Dict[str, str]] = None) -> AsyncIterator[bytes]:
+    """
+    Fans records out over a bulk pool and yields one NDJSON line per record as soon as it
+    finishes (completion order; ``index`` gives the input position), then a summary line.
+    At most BULK_IN_FLIGHT_PER_WORKER records per worker are queued at a time. Process workers
+    are brought to the asset ``versions`` (default: the ones served now) before each record.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_bulk_executor()
+    run = run_record
+    if isinstance(executor, ProcessPoolExecutor):
+        # Workers outlive hot reloads of the rules and KB files; sync them as run_stage does
+        run = functools.partial(sync_assets_and_call, versions or asset_versions(), run_record)
+    limit = max(1, bulk_worker_count() * config.BULK_IN_FLIGHT_PER_WORKER)
+    pending: Dict[asyncio.Future, Dict[str, Any]] = {}
+    counts = {"records": 0, "success": 0, "error": 0}
+
+    def finished(future: asyncio.Future) -> bytes:
+        record = pending.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            # A crashed worker only fails the records it held
+            if isinstance(e, BrokenProcessPool):
+                discard_bulk_executor(executor)
+            result = {"index": record.get("index"), "id": record.get("id"), "status": "error",
+                      "detail": f"Worker failed: {type(e).__name__}: {e}"}
+        counts["records"] += 1
+        counts[result["status"]] += 1
+        return dumps(result) + b"\n"
+
+    try:
+        while True:
+            # Reading the next record decompresses or parses input; keep that off the event loop
+            record = await loop.run_in_executor(None, next, records, None)
+            if record is None:
+                break
+            pending[loop.run_in_executor(executor, run, record)] = record
+            if len(pending) >= limit:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield finished(future)
+        while pending:
+            done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield finished(future)
+        yield dumps({"summary": counts}) + b"\n"
+    finally:
+        # The pool is shared: only this request's unfinished records are dropped
+        for future in pending:
+            future.cancel()
@@ -1,7 +1,15 @@
 import pandas as pd
+import numpy as np
 import re
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
 from app.models.schemas import Transaction
+from app.models.transaction_batch import TransactionBatch, extract_month_numbers, fy_month_buckets
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
 
 def clean_description(desc: str) -> str:
     """Cleans the transaction description for better ML matching."""
@@ -12,78 +20,135 @@ def clean_description(desc: str) -> str:
     cleaned = re.sub(r'\s+', ' ', cleaned).strip().lower()
     return cleaned
 
+# Common mappings for Indian bank statements (HDFC, SBI, ICICI)
+COLUMN_MAPPING = {
+    'txn date': 'date', 'value date': 'date', 'transaction date': 'date',
+    'narration': 'description', 'remarks': 'description', 'particulars': 'description',
+    'withdrawal amount (inr)': 'debit_amount', 'deposit amount (inr)': 'credit_amount',
+    'debit': 'debit_amount', 'credit': 'credit_amount', 'withdrawal': 'debit_amount', 'deposit': 'credit_amount'
+}
+
+# Trailing Dr/Cr markers, currency prefixes and Indian digit grouping ("1,50,000.00 Dr")
+_DR_CR_SUFFIX = r'(?i)\s*(dr|cr)\.?\s*$'
+_AMOUNT_NOISE = r'(?i)(?:inr|rs\.?|₹|,|\s)'
+
+def _as_text(series: pd.Series) -> np.ndarray:
+    """str() of every cell (missing cells become 'nan' as before), converting each distinct value once."""
+    if isinstance(series.dtype, pd.StringDtype):
+        # Typed string columns (Parquet/Arrow uploads, pandas' default for CSV) need no str() pass
+        return series.to_numpy(dtype=object, na_value=str(series.dtype.na_value))
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return np.array([str(u) for u in uniques], dtype=object)[codes]
+
+def clean_descriptions(descriptions: np.ndarray) -> np.ndarray:
+    """Vectorized clean_description over an array of strings; repeated narrations are cleaned once."""
+    codes, uniques = pd.factorize(descriptions)
+    if pa is not None:
+        # Same result as the regexes below (anything RE2's narrower \s misses becomes a space
+        # either way), computed by Arrow's string kernels instead of one re.sub per value
+        cleaned = pc.replace_substring_regex(pa.array(uniques, type=pa.string()), r'[^a-zA-Z0-9\s]', ' ')
+        cleaned = pc.utf8_lower(pc.utf8_trim_whitespace(pc.replace_substring_regex(cleaned, r'\s+', ' ')))
+        return cleaned.to_numpy(zero_copy_only=False)[codes]
+    cleaned = (pd.Series(uniques, dtype=object)
+               .str.replace(r'[^a-zA-Z0-9\s]', ' ', regex=True)
+               .str.replace(r'\s+', ' ', regex=True)
+               .str.strip()
+               .str.lower())
+    return cleaned.to_numpy(dtype=object)[codes]
+
+def coerce_amounts(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converts an amount column to float64 (NaN where missing or unreadable).
+    Text cells may use Indian grouping ("1,50,000.00"), a currency prefix and a Dr/Cr suffix;
+    the second array flags cells explicitly marked as Cr (credits).
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan), np.zeros(len(series), dtype=bool)
+
+    text = series.astype(object).where(series.notna(), None).astype('string')
+    suffix = text.str.extract(_DR_CR_SUFFIX, expand=False).str.lower()
+    numbers = text.str.replace(_DR_CR_SUFFIX, '', regex=True).str.replace(_AMOUNT_NOISE, '', regex=True)
+    amounts = pd.to_numeric(numbers, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return amounts, (suffix == 'cr').to_numpy(dtype=bool, na_value=False)
+
+def normalize_statement(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column-oriented core of parse_bank_statement. Returns a frame with one row per expense
+    transaction and the columns date, description (cleaned) and amount. The input is not modified.
+    """
+    empty = pd.DataFrame({'date': pd.Series(dtype=object), 'description': pd.Series(dtype=object),
+                          'amount': pd.Series(dtype=np.float64)})
+
+    # Standardize column names once; when several source columns map to the same field, the first wins
+    names = [COLUMN_MAPPING.get(c, c) for c in df.columns.astype(str).str.lower().str.strip()]
+    columns: Dict[str, pd.Series] = {}
+    for position, name in enumerate(names):
+        columns.setdefault(name, df.iloc[:, position])
+
+    if 'date' not in columns or 'description' not in columns:
+        return empty
+
+    descriptions = _as_text(columns['description'])
+    has_text = pd.Series(descriptions, dtype=object).str.strip().to_numpy(dtype=object) != ''
+
+    # Determine amount (we mainly care about debit/expenses for tax deductions)
+    use_debit = np.zeros(len(df), dtype=bool)
+    amounts = np.zeros(len(df), dtype=np.float64)
+    if 'debit_amount' in columns:
+        debit, _ = coerce_amounts(columns['debit_amount'])
+        use_debit = ~np.isnan(debit) & (debit > 0)
+        amounts = np.where(use_debit, debit, amounts)
+
+    use_amount = np.zeros(len(df), dtype=bool)
+    if 'amount' in columns:
+        # Some statements have single amount column and use negative (or a Dr suffix) for debit;
+        # rows explicitly marked Cr are income, not expenses
+        single, is_credit = coerce_amounts(columns['amount'])
+        use_amount = ~use_debit & ~np.isnan(single) & ~is_credit
+        amounts = np.where(use_amount, np.abs(single), amounts)
+
+    keep = has_text & (use_debit | use_amount)
+    if not keep.any():
+        return empty
+
+    return pd.DataFrame({
+        'date': _as_text(columns['date'])[keep],
+        'description': clean_descriptions(descriptions[keep]),
+        'amount': amounts[keep]
+    })
+
+def parse_statement_batch(df: pd.DataFrame) -> TransactionBatch:
+    """Parses a raw dataframe straight into a columnar TransactionBatch (no per-row models)."""
+    return TransactionBatch.from_statement(normalize_statement(df))
+
 def parse_bank_statement(df: pd.DataFrame) -> List[Transaction]:
     """
     Parses a raw dataframe of bank transactions into standardized Pydantic models.
     Expects basic columns like Date, Description, Amount/Debit/Credit.
     """
-    # Standardize column names
-    df.columns = df.columns.astype(str).str.lower().str.strip()
-    
-    # Common mappings for Indian bank statements (HDFC, SBI, ICICI)
-    col_mapping = {
-        'txn date': 'date', 'value date': 'date', 'transaction date': 'date',
-        'narration': 'description', 'remarks': 'description', 'particulars': 'description',
-        'withdrawal amount (inr)': 'debit_amount', 'deposit amount (inr)': 'credit_amount',
-        'debit': 'debit_amount', 'credit': 'credit_amount', 'withdrawal': 'debit_amount', 'deposit': 'credit_amount'
-    }
-    
-    df = df.rename(columns=col_mapping)
-    transactions = []
-    
-    for index, row in df.iterrows():
-        if 'date' not in row or 'description' not in row:
-            continue
-            
-        desc = str(row['description'])
-        if pd.isna(desc) or desc.strip() == '':
-            continue
-            
-        amount = 0.0
-        # Determine amount (we mainly care about debit/expenses for tax deductions)
-        if 'debit_amount' in row and not pd.isna(row['debit_amount']) and float(row['debit_amount']) > 0:
-            amount = float(row['debit_amount'])
-        elif 'amount' in row and not pd.isna(row['amount']):
-            # Some statements have single amount column and use negative for debit
-            amount = abs(float(row['amount']))
-        else:
-            # Skip if no clear expense amount
-            continue
-            
-        # Clean description for matching later
-        clean_desc = clean_description(desc)
-        
-        txn = Transaction(
-            date=str(row['date']),
-            description=clean_desc,
-            amount=amount
-        )
-        transactions.append(txn)
-        
-    return transactions
-
-def get_monthly_aggregates(transactions: List[Transaction]) -> Dict[str, List[float]]:
+    statement = normalize_statement(df)
+    return [
+        Transaction(date=date, description=description, amount=amount)
+        for date, description, amount in zip(statement['date'].tolist(),
+                                             statement['description'].tolist(),
+                                             statement['amount'].tolist())
+    ]
+
+FY_MONTHS = ['Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar']
+
+def monthly_expense_buckets(dates: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """Sums amounts into 12 FY-ordered buckets (Apr=0 .. Mar=11); dates without a month are skipped."""
+    return fy_month_buckets(extract_month_numbers(dates), amounts)
+
+def get_monthly_aggregates(transactions: Union[TransactionBatch, List[Transaction]]) -> Dict[str, List[float]]:
     """Groups transaction amounts by month for charting."""
-    # Initialize with 12 months (standard FY view)
-    income_data = [0.0] * 12
-    expense_data = [0.0] * 12
-    months = ['Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar']
-    
-    # Simple mapping for demo: distribute random-ish or based on date if parsed
-    # In a real app, we would parse the 'date' string to datetime
-    for txn in transactions:
-        try:
-            # Try to extract a month index from likely formats (DD/MM/YYYY or YYYY-MM-DD)
-            match = re.search(r'[\-/]([0-9]{2})[\-/]', txn.date)
-            if match:
-                month_num = int(match.group(1))
-                # Map calendar month to FY relative index (Apr=0, Mar=11)
-                idx = (month_num - 4) % 12
-                expense_data[idx] += txn.amount
-        except:
-            continue
-            
+    if isinstance(transactions, TransactionBatch):
+        expenses = transactions.monthly_expenses()
+    else:
+        dates = np.array([txn.date for txn in transactions], dtype=object)
+        amounts = np.array([txn.amount for txn in transactions], dtype=np.float64)
+        expenses = monthly_expense_buckets(dates, amounts)
     return {
-        "months": months,
-        "expenses": expense_data
+        "months": list(FY_MONTHS),
+        "expenses": expenses.tolist()
     }
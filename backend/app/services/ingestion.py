@@ -0,0 +1,142 @@
+import io
+import os
+from contextlib import closing
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from app.services.data_processing import COLUMN_MAPPING
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Upload extension -> statement format
+STATEMENT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+                     ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+FORMAT_LABELS = {"csv": "CSV", "parquet": "Parquet", "arrow": "Arrow IPC"}
+
+# Fields the statement parser reads; every other column is dropped before conversion to pandas
+_TEXT_FIELDS = ("date", "description")
+_AMOUNT_FIELDS = ("debit_amount", "credit_amount", "amount")
+
+def supported_extensions() -> List[str]:
+    """Upload extensions this process can read (Parquet and Arrow IPC need pyarrow)."""
+    return [ext for ext, fmt in STATEMENT_FORMATS.items() if fmt == "csv" or pa is not None]
+
+def statement_format(filename: Optional[str]) -> Optional[str]:
+    """The statement format implied by an upload's file name, or None if it is not supported here."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    return STATEMENT_FORMATS[ext] if ext in supported_extensions() else None
+
+def _require_pyarrow(fmt: str):
+    if pa is None:
+        raise RuntimeError(f"{FORMAT_LABELS[fmt]} statements need pyarrow (pip install pyarrow)")
+
+def statement_schema(schema) -> Dict[str, object]:
+    """
+    Target Arrow type of every column the parser maps, keyed by source column name: dates and
+    descriptions become strings, numeric amounts float64. Amounts stored as text ("1,500.00 Dr")
+    stay strings for coerce_amounts.
+    """
+    targets = {}
+    for field in schema:
+        name = COLUMN_MAPPING.get(field.name.lower().strip(), field.name.lower().strip())
+        if name in _TEXT_FIELDS:
+            targets[field.name] = pa.string()
+        elif name in _AMOUNT_FIELDS:
+            numeric = pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or \
+                pa.types.is_decimal(field.type)
+            targets[field.name] = pa.float64() if numeric else pa.string()
+    return targets
+
+def _typed_column(column, target):
+    if pa.types.is_date(column.type):
+        column = column.cast(pa.timestamp("s"))
+    if pa.types.is_timestamp(column.type):
+        # Chart months are read from YYYY-MM-DD text, as CSV exports write them
+        return pc.strftime(column, format="%Y-%m-%d")
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    return column if column.type == target else column.cast(target)
+
+def arrow_to_frame(table: Union["pa.Table", "pa.RecordBatch"], targets: Dict[str, object]) -> pd.DataFrame:
+    """
+    Casts the mapped columns to their statement types and hands them to pandas column-wise:
+    float64 columns become numpy arrays (without a copy when they hold no nulls) and strings stay
+    Arrow-backed, so no cell is converted one at a time.
+    """
+    names = [name for name in table.schema.names if name in targets]
+    columns = [_typed_column(table.column(name), targets[name]) for name in names]
+    return pa.table(columns, names=names).to_pandas()
+
+def _open_arrow(source: BinaryIO):
+    """Arrow IPC in either the random-access file layout (.arrow/.feather v2) or the stream layout."""
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+def read_statement(contents: bytes, fmt: str = "csv") -> pd.DataFrame:
+    """Reads raw uploaded statement bytes (CSV, Parquet or Arrow IPC) into a DataFrame."""
+    if fmt == "csv":
+        return pd.read_csv(io.BytesIO(contents))
+    _require_pyarrow(fmt)
+    source = pa.BufferReader(contents)  # Arrow reads the upload buffer in place
+    if fmt == "parquet":
+        parquet = pq.ParquetFile(source)
+        targets = statement_schema(parquet.schema_arrow)
+        # Parquet is read column-wise, so unmapped columns (balances, references) are never decoded
+        table = parquet.read(columns=list(targets))
+    else:
+        table = _open_arrow(source).read_all()
+        targets = statement_schema(table.schema)
+    return arrow_to_frame(table, targets)
+
+def _rechunk(batches: Iterator["pa.RecordBatch"], schema, rows: int) -> Iterator["pa.Table"]:
+    """Regroups record batches of any size into tables of exactly ``rows`` rows (the last one may be shorter)."""
+    pending, pending_rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows < rows:
+            continue
+        # Slicing is zero-copy: batches are only regrouped, not rewritten
+        table = pa.Table.from_batches(pending, schema)
+        offset = 0
+        while pending_rows - offset >= rows:
+            yield table.slice(offset, rows)
+            offset += rows
+        pending = table.slice(offset).to_batches()
+        pending_rows -= offset
+    if pending_rows:
+        yield pa.Table.from_batches(pending, schema)
+
+def _arrow_chunks(fileobj: BinaryIO, fmt: str, rows: int) -> Iterator[pd.DataFrame]:
+    if fmt == "parquet":
+        parquet = pq.ParquetFile(fileobj)
+        targets = statement_schema(parquet.schema_arrow)
+        batches = parquet.iter_batches(batch_size=rows, columns=list(targets))
+    else:
+        reader = _open_arrow(fileobj)
+        targets = statement_schema(reader.schema)
+        # Record batches come in the writer's sizes, so they are regrouped to ``rows``
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches)) \
+            if isinstance(reader, pa.ipc.RecordBatchFileReader) else reader
+        batches = _rechunk(batches, reader.schema, rows)
+    for batch in batches:
+        yield arrow_to_frame(batch, targets)
+
+def statement_chunks(fileobj: BinaryIO, fmt: str, rows: int):
+    """
+    Context manager iterating a statement file (CSV, Parquet or Arrow IPC) as DataFrames of at
+    most ``rows`` rows.
+    """
+    if fmt == "csv":
+        return pd.read_csv(fileobj, chunksize=rows)
+    _require_pyarrow(fmt)
+    return closing(_arrow_chunks(fileobj, fmt, rows))
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from app.core import config
+from app.core.executor import StageTimeoutError
+from app.core.responses import dumps
+from app.models.schemas import UserProfile
+from app.services.analysis import analyze_contents, analyze_file, StatementError
+
+FINISHED = ("done", "failed")
+
+class JobStore:
+    """
+    Durable queue of /analyze jobs in SQLite (WAL), shared by every API process on a host.
+
+    Uploads are kept as files next to the database until their job finishes. A worker claims a
+    job by taking a lease on it and renews the lease while it runs; a job whose lease runs out
+    (its process crashed or was killed) goes back to the queue, up to JOB_MAX_ATTEMPTS runs.
+    Calls block on disk and on other processes' write locks, so async callers run them in a
+    thread (see JobRunner._call); the connection is shared under a lock.
+    """
+
+    def __init__(self, job_dir: str):
+        self.job_dir = job_dir
+        self.payload_dir = os.path.join(job_dir, "payloads")
+        os.makedirs(self.payload_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(job_dir, "jobs.sqlite3"), timeout=5.0,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, profile TEXT NOT NULL, options TEXT NOT NULL, "
+            "payload TEXT, result TEXT, error TEXT, error_status INTEGER, attempts INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, lease_until REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, source: BinaryIO, profile: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """Copies the upload next to the queue and enqueues a job for it; returns the job id."""
+        job_id = uuid.uuid4().hex
+        payload = os.path.join(self.payload_dir, f"{job_id}.{options.get('format', 'csv')}")
+        with open(payload, "wb") as f:
+            shutil.copyfileobj(source, f)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, profile, options, payload, created_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(profile), json.dumps(options), payload, time.time()))
+        return job_id
+
+    def claim(self, lease_seconds: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """Leases the oldest queued (or abandoned) job to the caller; None when there is nothing to run."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                abandoned = self._conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                    (now, max_attempts)).fetchall()
+                for row in abandoned:
+                    self._finish(row["id"], row["payload"], "failed", None,
+                                 f"Job abandoned after {max_attempts} attempts", 500, now)
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1", (now,)).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, lease_until = ? "
+                        "WHERE id = ?", (now, now + lease_seconds, row["id"]))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return None if row is None else dict(row, status="running", attempts=row["attempts"] + 1)
+
+    def renew(self, job_id: str, lease_seconds: float):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'",
+                               (time.time() + lease_seconds, job_id))
+
+    def requeue(self, job_id: str):
+        """Hands a job back without counting the run (graceful shutdown mid-job)."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', attempts = attempts - 1, lease_until = NULL "
+                               "WHERE id = ? AND status = 'running'", (job_id,))
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            self._finish(job_id, row and row["payload"], "done", dumps(result).decode(), None, None, time.time())
+
+    def fail(self, job_id: str, detail: str, status_code: int):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            self._finish(job_id, row and row["payload"], "failed", None, detail, status_code, time.time())
+
+    def _finish(self, job_id: str, payload: Optional[str], status: str, result: Optional[str],
+                error: Optional[str], error_status: Optional[int], now: float):
+        # Callers hold the lock; the upload is no longer needed once the job has an outcome
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, error_status = ?, finished_at = ?, "
+            "lease_until = NULL, payload = NULL WHERE id = ?", (status, result, error, error_status, now, job_id))
+        if payload and os.path.exists(payload):
+            os.remove(payload)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a job: status, timings and, once finished, its result or error."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+        if row["status"] == "done":
+            job["result"] = json.loads(row["result"])
+        elif row["status"] == "failed":
+            job["error"] = {"status_code": row["error_status"], "detail": row["error"]}
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per status and how long started jobs waited in the queue (seconds)."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            waits = self._conn.execute(
+                "SELECT AVG(started_at - created_at), MAX(started_at - created_at) FROM jobs "
+                "WHERE started_at IS NOT NULL").fetchone()
+        return {
+            "depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued_seconds": None if oldest is None else now - oldest,
+            "avg_wait_seconds": waits[0],
+            "max_wait_seconds": waits[1]
+        }
+
+    def prune(self, ttl_seconds: float) -> int:
+        """Deletes finished jobs older than ``ttl_seconds``; returns how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                                        (*FINISHED, time.time() - ttl_seconds))
+        return cursor.rowcount
+
+async def run_analysis_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs the /analyze pipeline for a claimed job; large or stream-mode uploads take the chunked path."""
+    profile = UserProfile(**json.loads(job["profile"]))
+    options = json.loads(job["options"])
+    loop = asyncio.get_running_loop()
+    fmt = options.get("format", "csv")
+    with open(job["payload"], "rb") as f:
+        if options.get("stream") or os.path.getsize(job["payload"]) > config.STREAM_THRESHOLD_BYTES:
+            return await analyze_file(f, profile, options.get("chunk_size"), fmt)
+        contents = await loop.run_in_executor(None, f.read)
+    return await analyze_contents(contents, profile, fmt)
+
+class JobRunner:
+    """
+    Drains the job store with at most JOB_MAX_CONCURRENCY jobs in flight per process. The
+    pipeline stages themselves run on the shared analysis executor, as for synchronous calls.
+    """
+
+    def __init__(self):
+        self.store: Optional[JobStore] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._finished: Optional[asyncio.Condition] = None
+        self._last_prune = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Opens the store and starts the workers (call from the event loop, e.g. the app lifespan)."""
+        if self._tasks:
+            return
+        if self.store is None:
+            self.store = JobStore(config.JOB_DIR)
+        self._wakeup = asyncio.Event()
+        self._finished = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"opax-job-{n}")
+                       for n in range(max(1, config.JOB_MAX_CONCURRENCY))]
+
+    async def stop(self):
+        """Cancels the workers; jobs they were running go back to the queue for the next start."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    async def _call(self, fn, *args):
+        """Runs a blocking JobStore call on the default thread pool, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def submit(self, source: BinaryIO, profile: Dict[str, Any], options: Dict[str, Any]) -> str:
+        """Spools the upload and enqueues it in a thread, then wakes an idle worker (on the loop)."""
+        job_id = await self._call(self.store.submit, source, profile, options)
+        self._wakeup.set()
+        return job_id
+
+    async def stats(self) -> Dict[str, Any]:
+        return await self._call(self.store.stats)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: returns the job once it has finished or ``timeout`` seconds have passed. Jobs
+        finished by this process wake the waiter at once; others are seen on the next poll.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self._call(self.store.get, job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                return job
+            async with self._finished:
+                try:
+                    await asyncio.wait_for(self._finished.wait(), min(remaining, config.JOB_POLL_SECONDS))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _worker(self):
+        while True:
+            try:
+                job = await self._call(self.store.claim, config.JOB_LEASE_SECONDS, config.JOB_MAX_ATTEMPTS)
+                if job is not None:
+                    await self._execute(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A store error (disk full, database locked past its timeout) must not end this worker;
+                # an unrecorded job is retried once its lease runs out
+                print(f"Job worker error: {type(e).__name__}: {e}")
+                job = None
+            if job is None:
+                await self._maybe_prune()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), config.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            async with self._finished:
+                self._finished.notify_all()
+
+    async def _execute(self, job: Dict[str, Any]):
+        lease = asyncio.create_task(self._keep_lease(job["id"]))
+        try:
+            result = await run_analysis_job(job)
+        except asyncio.CancelledError:
+            # Shutdown: a short synchronous write, since awaiting here could be cancelled again
+            self.store.requeue(job["id"])
+            raise
+        except (StatementError, ValueError) as e:
+            # Bad statements and profiles fail the same way the synchronous call would (400)
+            await self._call(self.store.fail, job["id"], str(e), 400)
+        except StageTimeoutError as e:
+            await self._call(self.store.fail, job["id"], str(e), 504)
+        except Exception as e:
+            await self._call(self.store.fail, job["id"], f"Internal Server Error: {str(e)}", 500)
+        else:
+            await self._call(self.store.complete, job["id"], result)
+        finally:
+            lease.cancel()
+
+    async def _keep_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(config.JOB_LEASE_SECONDS / 3)
+            try:
+                await self._call(self.store.renew, job_id, config.JOB_LEASE_SECONDS)
+            except Exception as e:
+                print(f"Job lease renewal failed for {job_id}: {type(e).__name__}: {e}")
+
+    async def _maybe_prune(self):
+        now = time.monotonic()
+        if now - self._last_prune > 60:
+            self._last_prune = now
+            await self._call(self.store.prune, config.JOB_RESULT_TTL_SECONDS)
+
+# Global instance, started and stopped by the app lifespan
+job_runner = JobRunner()
@@ -4,6 +4,7 @@ from typing import List, Dict, Any, Optional
 
 class LocalKnowledgeAdvisor:
     def __init__(self, knowledge_base_path: str):
+        self.knowledge_base_path = knowledge_base_path
         with open(knowledge_base_path, 'r') as f:
             self.kb = json.load(f)
         
@@ -23,6 +24,11 @@ class LocalKnowledgeAdvisor:
             "price": ["price", "premium", "cost", "how much", "amount"]
         }
 
+    def reload(self):
+        """Re-reads the knowledge base; the dict is replaced in one assignment, so readers see old or new."""
+        with open(self.knowledge_base_path, 'r') as f:
+            self.kb = json.load(f)
+
     def extract_keywords(self, query: str) -> List[str]:
         query_upper = query.upper()
         found = []
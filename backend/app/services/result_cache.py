@@ -0,0 +1,118 @@
+import asyncio
+import codecs
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Optional, Tuple
+
+from app.core import config
+
+def statement_digest(source: BinaryIO, block_size: int = 1 << 20, normalize: bool = True) -> str:
+    """
+    SHA-256 of a CSV statement after normalization: no UTF-8 BOM, LF line endings and no
+    trailing whitespace at the end of the file, so re-exports of the same statement hash alike.
+    Binary statements (Parquet, Arrow) are hashed as-is with ``normalize=False``.
+    """
+    digest = hashlib.sha256()
+    if not normalize:
+        for block in iter(lambda: source.read(block_size), b""):
+            digest.update(block)
+        return digest.hexdigest()
+    pending = b""  # Held-back whitespace (or a CR whose LF may start the next block)
+    first = True
+    while True:
+        block = source.read(block_size)
+        if not block:
+            break
+        if first:
+            block = block.removeprefix(codecs.BOM_UTF8)
+            first = False
+        data = pending + block
+        kept = data.rstrip()
+        pending = data[len(kept):]
+        digest.update(kept.replace(b"\r\n", b"\n").replace(b"\r", b"\n"))
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    TTL-bounded LRU cache of /analyze statement summaries with request coalescing: while one
+    request computes a key, identical requests await its result instead of recomputing it.
+    Failures are handed to every waiter and never cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """Returns ``(value, source)`` where source is "hit", "coalesced" or "miss"."""
+        if not self.enabled:
+            return await compute(), "miss"
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, "hit"
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shielded: a waiter that disconnects must not cancel the work the others wait on
+            return await asyncio.shield(future), "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._in_flight.pop(key, None)
+            else:
+                # This caller was cancelled; leave the entry to the task so waiters still share it
+                task.add_done_callback(lambda t: self._settle(key, t))
+        self.put(key, value)
+        return value, "miss"
+
+    def _settle(self, key: str, task: asyncio.Future):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "coalesced": self.coalesced, "misses": self.misses}
+
+# Global instance shared by the synchronous, streaming and job /analyze paths
+result_cache = ResultCache(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL_SECONDS)
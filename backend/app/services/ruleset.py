@@ -0,0 +1,258 @@
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+class RulesetError(ValueError):
+    """Raised when a tax_rules.json file is missing fields or has inconsistent values."""
+
+class Slab:
+    __slots__ = ("min", "max", "rate")
+
+    def __init__(self, min_val: float, max_val: Optional[float], rate: float):
+        self.min = min_val
+        self.max = max_val
+        self.rate = rate
+
+class RegimeRules:
+    """
+    One regime's slabs, standard deduction and 87A rebate, compiled for lookups.
+
+    ``base_tax[i]`` is the tax accumulated over every full bracket below slab ``i``, summed in
+    slab order, so a tax lookup is a binary search plus one multiply-add and gives the same float
+    result as walking the slab list.
+    """
+
+    __slots__ = ("name", "slabs", "mins", "maxs", "rates", "base_tax",
+                 "_mins_list", "_maxs_list", "_rates_list", "_base_list",
+                 "standard_deduction", "rebate_max_income", "rebate_max")
+
+    def __init__(self, name: str, slabs: List[Slab], standard_deduction: float,
+                 rebate_max_income: float, rebate_max: float):
+        self.name = name
+        self.slabs = slabs
+        self.standard_deduction = standard_deduction
+        self.rebate_max_income = rebate_max_income
+        self.rebate_max = rebate_max
+
+        base = [0.0]
+        tax = 0.0
+        for slab in slabs[:-1]:
+            tax += (slab.max - slab.min) * slab.rate
+            base.append(tax)
+
+        self._mins_list = [s.min for s in slabs]
+        self._maxs_list = [s.max if s.max else float('inf') for s in slabs]
+        self._rates_list = [s.rate for s in slabs]
+        self._base_list = base
+        self.mins = np.array(self._mins_list, dtype=np.float64)
+        self.maxs = np.array(self._maxs_list, dtype=np.float64)
+        self.rates = np.array(self._rates_list, dtype=np.float64)
+        self.base_tax = np.array(base, dtype=np.float64)
+
+    def tax(self, taxable_income: float) -> float:
+        """Slab tax for one income in O(log n)."""
+        # Highest slab whose minimum the income exceeds
+        i = bisect_left(self._mins_list, taxable_income) - 1
+        if i < 0:
+            return 0.0
+        taxable_amount = min(taxable_income, self._maxs_list[i]) - self._mins_list[i]
+        return self._base_list[i] + taxable_amount * self._rates_list[i]
+
+    def tax_batch(self, taxable_incomes: np.ndarray) -> np.ndarray:
+        """Vectorized tax(): locates each income's slab with searchsorted over the slab minimums."""
+        incomes = np.asarray(taxable_incomes, dtype=np.float64)
+        idx = np.searchsorted(self.mins, incomes, side='left') - 1
+        in_slab = idx >= 0
+        i = np.where(in_slab, idx, 0)
+        taxable_amount = np.minimum(incomes, self.maxs[i]) - self.mins[i]
+        return np.where(in_slab, self.base_tax[i] + taxable_amount * self.rates[i], 0.0)
+
+    def income_for_tax_batch(self, taxes: np.ndarray) -> np.ndarray:
+        """Inverse of tax_batch: the largest taxable income whose slab tax does not exceed each value."""
+        taxes = np.asarray(taxes, dtype=np.float64)
+        # base_tax is non-decreasing; 'right' skips zero-rate slabs that end at the same base
+        i = np.clip(np.searchsorted(self.base_tax, taxes, side='right') - 1, 0, len(self.slabs) - 1)
+        rate = self.rates[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            income = self.mins[i] + (taxes - self.base_tax[i]) / rate
+        income = np.where(rate > 0, np.minimum(income, self.maxs[i]), self.maxs[i])
+        return np.where(taxes < 0, 0.0, income)
+
+    def rebate(self, taxable_income: float) -> float:
+        return self.rebate_max if taxable_income <= self.rebate_max_income else 0.0
+
+    def rebate_batch(self, taxable_incomes: np.ndarray) -> np.ndarray:
+        """Vectorized rebate()."""
+        return np.where(np.asarray(taxable_incomes) <= self.rebate_max_income,
+                        float(self.rebate_max), 0.0)
+
+class DeductionLimits:
+    """Statutory caps for the deduction sections the engine aggregates."""
+
+    __slots__ = ("sec_80c", "sec_80d_self_below_60", "sec_80d_self_above_60",
+                 "sec_80d_parents_below_60", "sec_80d_parents_above_60", "sec_80ccd_1b", "sec_24b_interest")
+
+    def __init__(self, limits: Dict[str, Any]):
+        d80 = limits["80D"]
+        self.sec_80c = limits["80C"]
+        self.sec_80d_self_below_60 = d80["self_family_below_60"]
+        self.sec_80d_self_above_60 = d80["self_family_above_60"]
+        self.sec_80d_parents_below_60 = d80.get("parents_below_60", d80["self_family_below_60"])
+        self.sec_80d_parents_above_60 = d80.get("parents_above_60", d80["self_family_above_60"])
+        self.sec_80ccd_1b = limits["80CCD_1B"]
+        self.sec_24b_interest = limits.get("24B_interest_housing", 0)
+
+    def sec_80d(self, age: int) -> float:
+        """80D self/family cap for the given age (senior citizen limit from 60)."""
+        return self.sec_80d_self_above_60 if age >= 60 else self.sec_80d_self_below_60
+
+class TaxRuleset:
+    """Validated, compiled form of one tax_rules.json: the single source of truth for slabs and limits."""
+
+    __slots__ = ("financial_year", "regimes", "limits", "cess_percent", "cess_rate", "raw")
+
+    def __init__(self, financial_year: str, regimes: Dict[str, RegimeRules], limits: DeductionLimits,
+                 cess_percent: float, raw: Dict[str, Any]):
+        self.financial_year = financial_year
+        self.regimes = regimes
+        self.limits = limits
+        self.cess_percent = cess_percent
+        self.cess_rate = cess_percent / 100.0
+        self.raw = raw
+
+    def regime(self, name: str) -> RegimeRules:
+        try:
+            return self.regimes[name]
+        except KeyError:
+            raise RulesetError(f"Unknown regime '{name}' for FY {self.financial_year}")
+
+_FY_PATTERN = re.compile(r'^\s*(?:FY\s*)?(\d{4})\s*[-/_]\s*(\d{2}|\d{4})\s*$', re.IGNORECASE)
+
+def normalize_financial_year(financial_year: str) -> str:
+    """Canonical ``YYYY-YYYY`` key for "2024-25", "2024-2025", "FY 2024/25" and similar spellings."""
+    match = _FY_PATTERN.match(str(financial_year))
+    if not match:
+        raise RulesetError(f"Unrecognized financial year '{financial_year}'")
+    start, end = int(match.group(1)), match.group(2)
+    # Two-digit endings compare modulo 100 so "1999-00" still reads as 1999-2000
+    if (int(end) if len(end) == 4 else int(end) + (start + 1) // 100 * 100) != start + 1:
+        raise RulesetError(f"Financial year '{financial_year}' must span two consecutive years")
+    return f"{start}-{start + 1}"
+
+def _number(value: Any, field: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise RulesetError(f"'{field}' must be a non-negative number, got {value!r}")
+    return value
+
+def _compile_slabs(regime: str, raw_slabs: Any) -> List[Slab]:
+    if not isinstance(raw_slabs, list) or not raw_slabs:
+        raise RulesetError(f"slabs.{regime} must be a non-empty list")
+
+    slabs = []
+    for i, raw in enumerate(raw_slabs):
+        field = f"slabs.{regime}[{i}]"
+        min_val = _number(raw.get("min"), f"{field}.min")
+        max_val = raw.get("max")
+        rate = _number(raw.get("rate"), f"{field}.rate")
+        if rate > 1:
+            raise RulesetError(f"{field}.rate must be a fraction, got {rate}")
+        is_last = i == len(raw_slabs) - 1
+        if max_val is None:
+            if not is_last:
+                raise RulesetError(f"{field}: only the highest slab may be open-ended")
+        elif _number(max_val, f"{field}.max") <= min_val:
+            raise RulesetError(f"{field}: max must be greater than min")
+        elif is_last:
+            raise RulesetError(f"{field}: the highest slab must be open-ended (max null)")
+        if slabs and min_val <= slabs[-1].max:
+            raise RulesetError(f"{field}: slabs must be sorted and must not overlap")
+        slabs.append(Slab(min_val, max_val, rate))
+    return slabs
+
+def compile_ruleset(raw: Dict[str, Any]) -> TaxRuleset:
+    """Validates a parsed tax_rules.json and compiles it into a TaxRuleset."""
+    try:
+        regimes = {}
+        for name, raw_slabs in raw["slabs"].items():
+            rebate = raw["rebate_87A"][name]
+            regimes[name] = RegimeRules(
+                name,
+                _compile_slabs(name, raw_slabs),
+                _number(raw["standard_deduction"][name], f"standard_deduction.{name}"),
+                _number(rebate["max_income"], f"rebate_87A.{name}.max_income"),
+                _number(rebate["max_rebate"], f"rebate_87A.{name}.max_rebate")
+            )
+        for required in ("old_regime", "new_regime"):
+            if required not in regimes:
+                raise RulesetError(f"slabs.{required} is required")
+
+        limits = DeductionLimits(raw["limits"])
+        for field in DeductionLimits.__slots__:
+            _number(getattr(limits, field), f"limits.{field}")
+
+        financial_year = normalize_financial_year(raw["financial_year"]) if raw.get("financial_year") else ""
+        return TaxRuleset(financial_year, regimes, limits,
+                          _number(raw["cess_percent"], "cess_percent"), raw)
+    except KeyError as e:
+        raise RulesetError(f"Missing required field {e}")
+
+def load_ruleset(path: str) -> TaxRuleset:
+    with open(path, 'r') as f:
+        return compile_ruleset(json.load(f))
+
+class RulesetRegistry:
+    """
+    Tax rules for every supported financial year, one JSON file per FY in ``rules_dir`` named
+    ``<FY>.json`` (e.g. ``2025-2026.json``), plus the default ruleset from ``TAX_RULES_PATH``.
+    Files are compiled on first use and cached, so several years can be served side by side.
+    """
+
+    def __init__(self, rules_dir: str, default: TaxRuleset):
+        self.rules_dir = rules_dir
+        self.default = default
+        self._rulesets: Dict[str, TaxRuleset] = {}
+        if default.financial_year:
+            self._rulesets[default.financial_year] = default
+        self._lock = threading.Lock()
+
+    def _paths(self) -> Dict[str, str]:
+        paths = {}
+        if os.path.isdir(self.rules_dir):
+            for name in sorted(os.listdir(self.rules_dir)):
+                stem, ext = os.path.splitext(name)
+                if ext == ".json":
+                    try:
+                        paths[normalize_financial_year(stem)] = os.path.join(self.rules_dir, name)
+                    except RulesetError:
+                        continue
+        return paths
+
+    def available(self) -> List[str]:
+        """Financial years that can be served, oldest first."""
+        return sorted(set(self._paths()) | set(self._rulesets))
+
+    def get(self, financial_year: Optional[str] = None) -> TaxRuleset:
+        """Ruleset for ``financial_year`` (any accepted spelling); the default ruleset when it is empty."""
+        if not financial_year:
+            return self.default
+        key = normalize_financial_year(financial_year)
+        ruleset = self._rulesets.get(key)
+        if ruleset is not None:
+            return ruleset
+
+        with self._lock:
+            # Another thread may have compiled it while we waited
+            if key not in self._rulesets:
+                path = self._paths().get(key)
+                if path is None:
+                    raise RulesetError(f"No tax rules for financial year {key}")
+                ruleset = load_ruleset(path)
+                if ruleset.financial_year != key:
+                    raise RulesetError(f"{path} declares financial year '{ruleset.financial_year}'")
+                self._rulesets[key] = ruleset
+            return self._rulesets[key]
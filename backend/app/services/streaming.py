@@ -0,0 +1,51 @@
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_processing import parse_statement_batch, FY_MONTHS
+from app.services.tax_engine import tax_engine
+from app.ml.transaction_classifier import classifier
+
+def process_chunk(chunk: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Parses and classifies one chunk of a statement and reduces it to partial totals.
+    Module-level so it can run on either analysis executor; nothing row-sized is returned
+    except the (few) tax-saving matches.
+    """
+    batch = parse_statement_batch(chunk)
+    stats: Dict[str, int] = {}
+    classifier.process_batch(batch, stats)
+
+    return {
+        "rows": len(batch),
+        "section_totals": batch.section_totals(tax_engine.DEDUCTION_SECTIONS),
+        "monthly_expenses": batch.monthly_expenses(),
+        "discovered": batch.tax_saving_records(),
+        "classification_stats": stats
+    }
+
+class StatementAccumulator:
+    """Running per-section totals and monthly buckets folded from process_chunk results."""
+
+    def __init__(self):
+        self.rows = 0
+        self.section_totals = dict.fromkeys(tax_engine.DEDUCTION_SECTIONS, 0.0)
+        self.monthly_expenses = np.zeros(12, dtype=np.float64)
+        self.discovered: List[Dict[str, Any]] = []
+        self.classification_stats: Dict[str, int] = {}
+
+    def add(self, partial: Dict[str, Any]):
+        self.rows += partial["rows"]
+        for section, amount in partial["section_totals"].items():
+            self.section_totals[section] += amount
+        self.monthly_expenses += partial["monthly_expenses"]
+        self.discovered.extend(partial["discovered"])
+        for path, count in partial["classification_stats"].items():
+            self.classification_stats[path] = self.classification_stats.get(path, 0) + count
+
+    def chart_data(self) -> Dict[str, List[float]]:
+        return {
+            "months": list(FY_MONTHS),
+            "expenses": self.monthly_expenses.tolist()
+        }
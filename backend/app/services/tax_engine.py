@@ -1,52 +1,131 @@
 import json
 import os
-from typing import Dict, List, Any
+import numpy as np
+from typing import Dict, List, Any, Optional, Union
 from app.models.schemas import UserProfile, Transaction
-from app.core.config import TAX_RULES_PATH
+from app.models.transaction_batch import TransactionBatch
+from app.core.config import TAX_RULES_PATH, TAX_RULES_DIR
+from app.services.ruleset import TaxRuleset, RulesetError, RulesetRegistry, compile_ruleset
+
+class RulesState:
+    """The rules one engine computes with: its ruleset plus the per-year registry and engines."""
+
+    __slots__ = ("ruleset", "registry", "engines")
+
+    def __init__(self, ruleset: TaxRuleset, registry: RulesetRegistry, engines: Dict[str, "TaxEngine"]):
+        self.ruleset = ruleset
+        self.registry = registry
+        self.engines = engines
 
 class TaxEngine:
-    def __init__(self):
-        self.rules = self._load_rules()
+    def __init__(self, ruleset: Optional[TaxRuleset] = None, registry: Optional[RulesetRegistry] = None,
+                 engines: Optional[Dict[str, "TaxEngine"]] = None):
+        if ruleset is None:
+            ruleset = compile_ruleset(self._load_rules())
+        # Compiled and validated once; every calculation below reads from this object. Per-year
+        # engines are compiled on first use. Ruleset, registry and engines sit in one state object
+        # so reload() publishes all of them with a single assignment.
+        self._state = RulesState(ruleset, registry or RulesetRegistry(TAX_RULES_DIR, ruleset),
+                                 {} if engines is None else engines)
 
     def _load_rules(self) -> Dict[str, Any]:
         """Loads deterministic tax configurations from the JSON knowledge base."""
         with open(TAX_RULES_PATH, 'r') as f:
             return json.load(f)
 
-    def aggregate_deductions(self, transactions: List[Transaction], profile: UserProfile) -> Dict[str, Dict[str, float]]:
+    @property
+    def ruleset(self) -> TaxRuleset:
+        return self._state.ruleset
+
+    @property
+    def rules(self) -> Dict[str, Any]:
+        return self._state.ruleset.raw
+
+    @property
+    def registry(self) -> RulesetRegistry:
+        return self._state.registry
+
+    def for_year(self, financial_year: Optional[str], fallback: bool = False) -> "TaxEngine":
         """
-        Aggregates raw transaction amounts by tax section and applies legal caps.
-        Only considers transactions marked as tax-saving by the ML classifier.
+        Engine bound to the rules of ``financial_year`` (the default rules when it is empty). The
+        returned engine never changes, so a call that resolved it is unaffected by a later reload().
+        With ``fallback``, a year without a rules file (or in no recognized format) also gets the
+        default rules instead of raising RulesetError.
         """
-        raw_totals = {"80C": 0.0, "80D": 0.0, "80CCD_1B": 0.0, "24B": 0.0}
-        
+        state = self._state
+        try:
+            ruleset = state.registry.get(financial_year)
+        except RulesetError:
+            if not fallback:
+                raise
+            ruleset = state.registry.default
+        engine = state.engines.get(ruleset.financial_year)
+        if engine is None:
+            engine = state.engines.setdefault(ruleset.financial_year, TaxEngine(ruleset, state.registry, state.engines))
+        return engine
+
+    def available_years(self) -> List[str]:
+        return self.registry.available()
+
+    def reload(self):
+        """
+        Recompiles tax_rules.json and every per-year file, then swaps them in. Invalid rules raise
+        RulesetError and leave the current rules in place.
+        """
+        ruleset = compile_ruleset(self._load_rules())
+        registry = RulesetRegistry(TAX_RULES_DIR, ruleset)
+        for financial_year in registry.available():
+            registry.get(financial_year)
+        self._state = RulesState(ruleset, registry, {})
+
+    # Sections whose claimed amounts are aggregated from classified transactions
+    DEDUCTION_SECTIONS = ("80C", "80D", "80CCD_1B", "24B")
+    # Combined 80C + 80D investment target used for the simulator's savings gap
+    SAVINGS_GAP_TARGET = 200000
+
+    def section_totals(self, transactions: Union[TransactionBatch, List[Transaction]]) -> Dict[str, float]:
+        """Sums the amounts of tax-saving transactions per deduction section."""
+        if isinstance(transactions, TransactionBatch):
+            # Columnar input reduces with one bincount instead of a Python loop
+            return transactions.section_totals(self.DEDUCTION_SECTIONS)
+
+        raw_totals = dict.fromkeys(self.DEDUCTION_SECTIONS, 0.0)
+
         # Aggregate claimed amounts
         for txn in transactions:
             if txn.is_tax_saving and txn.tax_section in raw_totals:
                 raw_totals[txn.tax_section] += txn.amount
 
-        # Determine 80D age limit key dynamically
-        age_key = "self_family_above_60" if profile.age >= 60 else "self_family_below_60"
+        return raw_totals
 
-        # Apply deterministic limits based on tax_rules.json
-        limits = self.rules["limits"]
+    def aggregate_deductions(self, transactions: Union[TransactionBatch, List[Transaction]], profile: UserProfile) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregates raw transaction amounts by tax section and applies legal caps.
+        Only considers transactions marked as tax-saving by the ML classifier.
+        """
+        return self.apply_limits(self.section_totals(transactions), profile.age)
+
+    def apply_limits(self, raw_totals: Dict[str, float], age: int) -> Dict[str, Dict[str, float]]:
+        """Applies the legal caps from tax_rules.json to per-section claimed totals."""
+        # Apply deterministic limits based on tax_rules.json (80D cap depends on age)
+        limits = self.ruleset.limits
         aggregate = {
             "80C": {
                 "claimed": raw_totals["80C"],
-                "allowed": min(raw_totals["80C"], limits["80C"])
+                "allowed": min(raw_totals["80C"], limits.sec_80c)
             },
             "80D": {
                 "claimed": raw_totals["80D"],
-                "allowed": min(raw_totals["80D"], limits["80D"][age_key])
+                "allowed": min(raw_totals["80D"], limits.sec_80d(age))
             },
             "80CCD_1B": {
                 "claimed": raw_totals["80CCD_1B"],
-                "allowed": min(raw_totals["80CCD_1B"], limits["80CCD_1B"])
+                "allowed": min(raw_totals["80CCD_1B"], limits.sec_80ccd_1b)
             }
         }
         
         # Standard Deduction (allowed fully if eligible; cap usually exact amount anyway)
-        st_deduction = self.rules["standard_deduction"]["old_regime"]
+        st_deduction = self.ruleset.regime("old_regime").standard_deduction
         aggregate["Standard_Deduction"] = {
             "claimed": st_deduction,
             "allowed": st_deduction
@@ -56,44 +135,63 @@ class TaxEngine:
 
     def compute_tax(self, taxable_income: float, regime: str) -> float:
         """Calculates exact tax liability using purely mathematical slab brackets."""
-        slabs = self.rules["slabs"][regime]
-        tax = 0.0
-        
-        for slab in slabs:
-            min_val = slab["min"]
-            max_val = slab["max"]
-            rate = slab["rate"]
-            
-            if taxable_income > min_val:
-                # If current bracket has a cap and income exceeds it, tax the full bracket.
-                # If no cap (i.e. highest slab) or income falls inside bracket, tax the difference.
-                if max_val and taxable_income > max_val:
-                    taxable_amount = max_val - min_val
-                else:
-                    taxable_amount = taxable_income - min_val
-                    
-                tax += taxable_amount * rate
-                
-        return tax
+        # Binary search over compiled slab boundaries plus the precomputed tax below each slab
+        return self.ruleset.regime(regime).tax(taxable_income)
+
+    def compute_tax_batch(self, taxable_incomes: np.ndarray, regime: str) -> np.ndarray:
+        """Vectorized compute_tax: locates each income's slab with searchsorted over the slab minimums."""
+        return self.ruleset.regime(regime).tax_batch(taxable_incomes)
+
+    def calculate_regime_batch(self, incomes: np.ndarray, deductions_allowed: np.ndarray, regime: str) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_regime over arrays of incomes and allowed deductions (broadcast together).
+        Returns arrays of taxable income, gross tax, 87A rebate and final tax.
+        """
+        incomes, deductions_allowed = np.broadcast_arrays(np.asarray(incomes, dtype=np.float64),
+                                                          np.asarray(deductions_allowed, dtype=np.float64))
+        rules = self.ruleset.regime(regime)
+        # Note: New regime only allows standard deduction, no 80C/80D.
+        if regime == "new_regime":
+            applicable_deductions = rules.standard_deduction
+        else:
+            applicable_deductions = deductions_allowed
+
+        taxable_income = np.maximum(0.0, incomes - applicable_deductions)
+        gross_tax = rules.tax_batch(taxable_income)
+
+        # Apply 87A Rebate if eligible
+        rebate = rules.rebate_batch(taxable_income)
+        tax_after_rebate = np.maximum(0.0, gross_tax - rebate)
+
+        # Apply 4% Health & Education Cess
+        cess = tax_after_rebate * self.ruleset.cess_rate
+        final_tax = tax_after_rebate + cess
+
+        return {
+            "taxable_income": taxable_income,
+            "gross_tax": gross_tax,
+            "rebate": rebate,
+            "final_tax": final_tax
+        }
 
     def calculate_regime(self, income: float, deductions_allowed: float, regime: str) -> Dict[str, float]:
         """Calculates final tax layout for a specific regime, applying deductions and rebate."""
+        rules = self.ruleset.regime(regime)
         # Note: New regime only allows standard deduction (₹75k), no 80C/80D.
         if regime == "new_regime":
-            applicable_deductions = self.rules["standard_deduction"]["new_regime"]
+            applicable_deductions = rules.standard_deduction
         else:
             applicable_deductions = deductions_allowed
 
         taxable_income = max(0, income - applicable_deductions)
-        gross_tax = self.compute_tax(taxable_income, regime)
+        gross_tax = rules.tax(taxable_income)
         
         # Apply 87A Rebate if eligible
-        rebate_rules = self.rules["rebate_87A"][regime]
-        rebate = rebate_rules["max_rebate"] if taxable_income <= rebate_rules["max_income"] else 0.0
+        rebate = rules.rebate(taxable_income)
         tax_after_rebate = max(0, gross_tax - rebate)
         
         # Apply 4% Health & Education Cess
-        cess = tax_after_rebate * (self.rules["cess_percent"] / 100.0)
+        cess = tax_after_rebate * self.ruleset.cess_rate
         final_tax = tax_after_rebate + cess
         
         return {
@@ -105,16 +203,15 @@ class TaxEngine:
 
     def run_simulation(self, salary: float, age: int, inv_80c: float, inv_80d: float, inv_nps: float) -> Dict[str, Any]:
         """Runs a tax simulation with manual investment overrides instead of transaction parsing."""
-        # Determine 80D age limit key
-        age_key = "self_family_above_60" if age >= 60 else "self_family_below_60"
-        limits = self.rules["limits"]
+        limits = self.ruleset.limits
+        limit_80d = limits.sec_80d(age)
         
         # Construct simulation deductions
-        st_deduction_old = self.rules["standard_deduction"]["old_regime"]
+        st_deduction_old = self.ruleset.regime("old_regime").standard_deduction
         deductions_breakdown = {
-            "80C": {"claimed": inv_80c, "allowed": min(inv_80c, limits["80C"])},
-            "80D": {"claimed": inv_80d, "allowed": min(inv_80d, limits["80D"][age_key])},
-            "80CCD_1B": {"claimed": inv_nps, "allowed": min(inv_nps, limits["80CCD_1B"])},
+            "80C": {"claimed": inv_80c, "allowed": min(inv_80c, limits.sec_80c)},
+            "80D": {"claimed": inv_80d, "allowed": min(inv_80d, limit_80d)},
+            "80CCD_1B": {"claimed": inv_nps, "allowed": min(inv_nps, limits.sec_80ccd_1b)},
             "Standard_Deduction": {"claimed": st_deduction_old, "allowed": st_deduction_old}
         }
         
@@ -130,8 +227,7 @@ class TaxEngine:
         savings = abs(old_tax - new_tax)
         
         # Calculate Health Metrics
-        u80c = (deductions_breakdown["80C"]["allowed"] / 150000) * 100
-        limit_80d = limits["80D"][age_key]
+        u80c = (deductions_breakdown["80C"]["allowed"] / limits.sec_80c) * 100
         u80d = (deductions_breakdown["80D"]["allowed"] / limit_80d) * 100
         health_score = int((u80c * 0.7) + (u80d * 0.3))
         
@@ -140,18 +236,160 @@ class TaxEngine:
             "new_tax": new_tax,
             "tax_saved": savings,
             "recommended": recommended,
-            "savings_gap": max(0, 200000 - (deductions_breakdown["80C"]["allowed"] + deductions_breakdown["80D"]["allowed"])),
+            "savings_gap": max(0, self.SAVINGS_GAP_TARGET - (deductions_breakdown["80C"]["allowed"] + deductions_breakdown["80D"]["allowed"])),
             "health_score": health_score
         }
 
+    def run_simulation_batch(self, salary: np.ndarray, age: np.ndarray, inv_80c: np.ndarray,
+                             inv_80d: np.ndarray, inv_nps: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized run_simulation over arrays that broadcast together (e.g. one axis per grid dimension).
+        Returns arrays of old/new tax, tax saved, savings gap, health score and ``old_recommended``
+        (True where the old regime wins); every element equals the scalar run_simulation result.
+        """
+        salary, age, inv_80c, inv_80d, inv_nps = (np.asarray(a, dtype=np.float64)
+                                                  for a in (salary, age, inv_80c, inv_80d, inv_nps))
+        limits = self.ruleset.limits
+        limit_80d = np.where(age >= 60, float(limits.sec_80d_self_above_60), float(limits.sec_80d_self_below_60))
+
+        allowed_80c = np.minimum(inv_80c, limits.sec_80c)
+        allowed_80d = np.minimum(inv_80d, limit_80d)
+        allowed_nps = np.minimum(inv_nps, limits.sec_80ccd_1b)
+        st_deduction_old = self.ruleset.regime("old_regime").standard_deduction
+        total_allowed = allowed_80c + allowed_80d + allowed_nps + st_deduction_old
+
+        old_tax = self.calculate_regime_batch(salary, total_allowed, "old_regime")["final_tax"]
+        # The new regime ignores investments, so it only varies with salary
+        new_tax = self.calculate_regime_batch(salary, 0.0, "new_regime")["final_tax"]
+        old_tax, new_tax = np.broadcast_arrays(old_tax, new_tax)
+
+        u80c = (allowed_80c / limits.sec_80c) * 100
+        u80d = (allowed_80d / limit_80d) * 100
+        health_score = np.trunc((u80c * 0.7) + (u80d * 0.3)).astype(np.int64)
+        savings_gap = np.maximum(0.0, self.SAVINGS_GAP_TARGET - (allowed_80c + allowed_80d))
+
+        return {
+            "old_tax": old_tax,
+            "new_tax": new_tax,
+            "tax_saved": np.abs(old_tax - new_tax),
+            "old_recommended": old_tax < new_tax,
+            "savings_gap": np.broadcast_to(savings_gap, old_tax.shape),
+            "health_score": np.broadcast_to(health_score, old_tax.shape)
+        }
+
+    # Investment sections the solver allocates a budget across, in fill order. Every rupee in any of
+    # them lowers taxable income by one rupee, so the order only breaks ties (80C/80D weigh most in
+    # the health score).
+    SOLVER_SECTIONS = ("80C", "80D", "80CCD_1B")
+
+    def max_taxable_income_for(self, final_tax: np.ndarray, regime: str) -> np.ndarray:
+        """Largest taxable income whose final tax (after 87A rebate and cess) does not exceed ``final_tax``."""
+        rules = self.ruleset.regime(regime)
+        tax_after_rebate = np.asarray(final_tax, dtype=np.float64) / (1 + self.ruleset.cess_rate)
+        above_rebate = rules.income_for_tax_batch(tax_after_rebate)
+        # At or below the rebate limit the rebate absorbs up to rebate_max of slab tax
+        within_rebate = np.minimum(rules.rebate_max_income, rules.income_for_tax_batch(tax_after_rebate + rules.rebate_max))
+        return np.where(above_rebate > rules.rebate_max_income, above_rebate, within_rebate)
+
+    def solve_batch(self, salary: np.ndarray, age: np.ndarray, budget: np.ndarray = np.inf, inv_80c: np.ndarray = 0.0,
+                    inv_80d: np.ndarray = 0.0, inv_nps: np.ndarray = 0.0) -> Dict[str, np.ndarray]:
+        """
+        Closed-form regime solver over arrays that broadcast together. Inverts the piecewise-linear
+        old-regime tax instead of searching with run_simulation:
+          * ``breakeven_deduction`` - 80C + 80D + 80CCD(1B) deductions at which the old regime's tax equals
+            the new regime's; any amount above it makes the old regime win (``breakeven_achievable``
+            says whether the section caps allow that).
+          * ``alloc_*`` - tax-minimizing split of ``budget`` across the sections on top of the current
+            investments, never investing past the point where old-regime tax reaches zero.
+          * ``marginal_*`` - old-regime tax saved per extra rupee in each section at the current investments.
+        """
+        salary, age, budget, inv_80c, inv_80d, inv_nps = (np.asarray(a, dtype=np.float64)
+                                                          for a in (salary, age, budget, inv_80c, inv_80d, inv_nps))
+        limits = self.ruleset.limits
+        old = self.ruleset.regime("old_regime")
+        caps = {
+            "80C": np.asarray(float(limits.sec_80c)),
+            "80D": np.where(age >= 60, float(limits.sec_80d_self_above_60), float(limits.sec_80d_self_below_60)),
+            "80CCD_1B": np.asarray(float(limits.sec_80ccd_1b))
+        }
+        current = {"80C": inv_80c, "80D": inv_80d, "80CCD_1B": inv_nps}
+        allowed = {s: np.minimum(current[s], caps[s]) for s in self.SOLVER_SECTIONS}
+        allowed_total = allowed["80C"] + allowed["80D"] + allowed["80CCD_1B"]
+        cap_total = caps["80C"] + caps["80D"] + caps["80CCD_1B"]
+
+        new_tax = self.calculate_regime_batch(salary, 0.0, "new_regime")["final_tax"]
+        old_tax = self.calculate_regime_batch(salary, allowed_total + old.standard_deduction, "old_regime")["final_tax"]
+
+        # Deduction where old tax equals new tax, from the largest taxable income still taxed <= new_tax
+        income_after_std = np.maximum(0.0, salary - old.standard_deduction)
+        breakeven = np.maximum(0.0, income_after_std - self.max_taxable_income_for(new_tax, "old_regime"))
+
+        # Investing beyond the point where old-regime tax hits zero saves nothing more
+        taxable = np.maximum(0.0, income_after_std - allowed_total)
+        zero_tax_income = self.max_taxable_income_for(0.0, "old_regime")
+        useful = np.maximum(0.0, taxable - zero_tax_income)
+        remaining = np.minimum(np.maximum(budget, 0.0), np.minimum(useful, cap_total - allowed_total))
+        result = {}
+        for section in self.SOLVER_SECTIONS:
+            alloc = np.minimum(remaining, caps[section] - allowed[section])
+            remaining = remaining - alloc
+            result[f"alloc_{section}"] = alloc
+        invested = result["alloc_80C"] + result["alloc_80D"] + result["alloc_80CCD_1B"]
+        # An allocation sized to reach the zero-tax point lands exactly on it: re-adding the deductions
+        # to the salary could come out a few ulps above the 87A limit and lose the rebate
+        reached = (useful > 0) & (invested >= useful)
+        optimized_taxable = np.where(reached, zero_tax_income,
+                                     np.maximum(0.0, salary - (allowed_total + invested + old.standard_deduction)))
+        optimized_tax = self.calculate_regime_batch(optimized_taxable, 0.0, "old_regime")["final_tax"]
+
+        # Left derivative of old-regime tax: the slab rate (plus cess) the next deducted rupee comes out of.
+        # Crossing down to the 87A limit saves more than this at once; breakeven_deduction accounts for it.
+        slab = np.searchsorted(old.mins, taxable, side='left') - 1
+        rate = np.where(slab >= 0, old.rates[np.maximum(slab, 0)], 0.0) * (1 + self.ruleset.cess_rate)
+        rate = np.where(old_tax > 0, rate, 0.0)
+        for section in self.SOLVER_SECTIONS:
+            result[f"marginal_{section}"] = np.where(allowed[section] < caps[section], rate, 0.0)
+
+        shape = np.broadcast_shapes(salary.shape, age.shape, budget.shape, inv_80c.shape, inv_80d.shape, inv_nps.shape)
+        result.update({
+            "old_tax": old_tax,
+            "new_tax": new_tax,
+            "breakeven_deduction": breakeven,
+            # A zero new-regime tax can only be tied, never beaten
+            "breakeven_achievable": (breakeven < cap_total) & (new_tax > 0),
+            "additional_to_breakeven": np.maximum(0.0, breakeven - allowed_total),
+            "optimized_old_tax": optimized_tax,
+            "tax_saving": old_tax - optimized_tax
+        })
+        return {key: np.broadcast_to(value, shape) for key, value in result.items()}
+
+    def solve(self, salary: float, age: int, budget: float = float('inf'), inv_80c: float = 0.0,
+              inv_80d: float = 0.0, inv_nps: float = 0.0) -> Dict[str, Any]:
+        """Single-profile solve_batch, shaped like the other engine results."""
+        r = {key: value.item() for key, value in self.solve_batch(salary, age, budget, inv_80c, inv_80d, inv_nps).items()}
+        return {
+            "old_tax": r["old_tax"],
+            "new_tax": r["new_tax"],
+            "breakeven": {
+                "deduction": r["breakeven_deduction"],
+                "achievable": r["breakeven_achievable"],
+                "additional_investment": r["additional_to_breakeven"]
+            },
+            "allocation": {s: r[f"alloc_{s}"] for s in self.SOLVER_SECTIONS},
+            "optimized_old_tax": r["optimized_old_tax"],
+            "tax_saving": r["tax_saving"],
+            "marginal_benefit": {s: r[f"marginal_{s}"] for s in self.SOLVER_SECTIONS}
+        }
+
     def get_recommendations(self, analysis: Dict[str, Any]) -> List[Dict[str, str]]:
         """Generates dynamic recommendations based on tax gaps and expert knowledge base."""
         recs = []
         deductions = analysis["deductions"]
         salary = analysis["income"]
+        limits = self.ruleset.limits
         
         # 80C Check
-        gap_80c = 150000 - deductions["80C"]["allowed"]
+        gap_80c = limits.sec_80c - deductions["80C"]["allowed"]
         if gap_80c > 5000:
             # High income + high risk -> ELSS
             if salary > 1200000:
@@ -188,7 +426,7 @@ class TaxEngine:
         # 80D Check
         u80d = analysis["health_metrics"]["utilization_80d"]
         if u80d < 100:
-            limit_80d = 25000 # Standard
+            limit_80d = limits.sec_80d_self_below_60 # Standard
             missing = limit_80d - deductions["80D"]["allowed"]
             if missing > 0:
                 recs.append({
@@ -202,12 +440,12 @@ class TaxEngine:
             
         # NPS Check
         nps_allowed = deductions.get("80CCD_1B", {}).get("allowed", 0)
-        if nps_allowed < 50000:
-            gap_nps = 50000 - nps_allowed
+        if nps_allowed < limits.sec_80ccd_1b:
+            gap_nps = limits.sec_80ccd_1b - nps_allowed
             recs.append({
                 "month": "MONTH 4-6",
                 "title": "NPS Additional Benefit",
-                "description": "Utilize Section 80CCD(1B) for an extra ₹50,000 deduction on top of 80C. Best for retirement growth.",
+                "description": f"Utilize Section 80CCD(1B) for an extra ₹{limits.sec_80ccd_1b:,.0f} deduction on top of 80C. Best for retirement growth.",
                 "amount": f"₹{gap_nps/3:,.0f}/mo",
                 "icon": "Zap",
                 "color": "bg-brandBlue"
@@ -215,9 +453,19 @@ class TaxEngine:
             
         return recs
 
-    def analyze_profile(self, profile: UserProfile, transactions: List[Transaction]) -> Dict[str, Any]:
+    def analyze_profile(self, profile: UserProfile, transactions: Union[TransactionBatch, List[Transaction]]) -> Dict[str, Any]:
         """Orchestrates the entire comparison and returns a structured breakdown."""
-        deductions_breakdown = self.aggregate_deductions(transactions, profile)
+        return self.analyze_totals(profile, self.section_totals(transactions))
+
+    def analyze_totals(self, profile: UserProfile, raw_totals: Dict[str, float]) -> Dict[str, Any]:
+        """Same as analyze_profile, starting from per-section claimed totals (e.g. folded from a stream)."""
+        # Each profile is analyzed under the rules of its own financial year; years without rules
+        # use the default ones, and the result's rules_financial_year says which were applied
+        engine = self.for_year(profile.financial_year, fallback=True)
+        if engine is not self:
+            return engine.analyze_totals(profile, raw_totals)
+
+        deductions_breakdown = self.apply_limits(raw_totals, profile.age)
         
         total_allowed = sum(d["allowed"] for d in deductions_breakdown.values())
         
@@ -230,13 +478,14 @@ class TaxEngine:
         recommended = "Old Regime" if old_tax < new_tax else "New Regime"
         savings = abs(old_tax - new_tax)
 
-        u80c = (deductions_breakdown["80C"]["allowed"] / 150000) * 100
-        limit_80d = self.rules["limits"]["80D"]["self_family_above_60" if profile.age >= 60 else "self_family_below_60"]
+        u80c = (deductions_breakdown["80C"]["allowed"] / self.ruleset.limits.sec_80c) * 100
+        limit_80d = self.ruleset.limits.sec_80d(profile.age)
         u80d = (deductions_breakdown["80D"]["allowed"] / limit_80d) * 100
         
         health_score = int((u80c * 0.7) + (u80d * 0.3))
         
         analysis = {
+            "rules_financial_year": self.ruleset.financial_year,
             "income": profile.salary,
             "deductions": deductions_breakdown,
             "old_regime": {
@@ -261,4 +510,27 @@ class TaxEngine:
         
         return analysis
 
+    def compare_years(self, profile: UserProfile, transactions: Union[TransactionBatch, List[Transaction], Dict[str, float]],
+                      financial_years: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Evaluates one profile under several financial years' rules (all available years by default).
+        Section totals are aggregated once and reused for every year.
+        """
+        raw_totals = transactions if isinstance(transactions, dict) else self.section_totals(transactions)
+        comparison = {}
+        for financial_year in financial_years or self.available_years():
+            engine = self.for_year(financial_year)
+            deductions = engine.apply_limits(raw_totals, profile.age)
+            total_allowed = sum(d["allowed"] for d in deductions.values())
+            old_regime = engine.calculate_regime(profile.salary, total_allowed, "old_regime")
+            new_regime = engine.calculate_regime(profile.salary, 0, "new_regime")
+            comparison[engine.ruleset.financial_year] = {
+                "deductions_allowed": total_allowed,
+                "old_regime": {"taxable_income": old_regime["taxable_income"], "tax": old_regime["final_tax"]},
+                "new_regime": {"taxable_income": new_regime["taxable_income"], "tax": new_regime["final_tax"]},
+                "recommended": "Old Regime" if old_regime["final_tax"] < new_regime["final_tax"] else "New Regime",
+                "savings": abs(old_regime["final_tax"] - new_regime["final_tax"])
+            }
+        return comparison
+
 tax_engine = TaxEngine()
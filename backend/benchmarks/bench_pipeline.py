@@ -0,0 +1,195 @@
+"""
+In-process timing of every /analyze pipeline stage on seeded synthetic statements.
+
+Run from the backend directory (``python benchmarks/bench_pipeline.py`` also works; it puts the
+backend directory on sys.path so ``app`` imports):
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --save baseline.json
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 100000 --compare baseline.json --threshold 0.2
+
+Classification uses a deterministic hashing encoder unless --encoder model is given, so runs
+need no network and measure the pipeline rather than the transformer. --compare exits with
+status 1 when any case's best time is slower than its baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Run as a script: only benchmarks/ is on sys.path, not the backend directory holding app/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import config
+from app.ml.hashing_encoder import HashingEncoder
+
+CASES = ("parse_bank_statement", "parse_statement_batch", "classify", "analyze_profile",
+         "get_monthly_aggregates", "run_simulation", "run_simulation_batch", "advisor_get_response")
+# Cases whose cost does not depend on the statement size run a fixed number of calls instead
+FIXED_CALLS = {"run_simulation": 1000, "advisor_get_response": 1000}
+# Slowdowns smaller than this (seconds) are timer noise, whatever the ratio
+NOISE_FLOOR_S = 0.001
+
+EVERYDAY_SPEND = ["SWIGGY ORDER", "AMAZON PAY", "UBER TRIP", "ZOMATO", "BIGBASKET", "IRCTC TICKET",
+                  "ELECTRICITY BILL", "NETFLIX", "ATM CASH WITHDRAWAL", "PAYMENT TO RAMESH KUMAR",
+                  "CAFE COFFEE DAY", "RENT TRANSFER", "PETROL PUMP", "FLIPKART"]
+ADVISOR_QUERIES = ["What is the lock-in period of ELSS?", "PPF returns", "How much premium for term insurance?",
+                   "Tell me about NPS tax benefit", "hello"]
+
+def synthetic_statement(rows: int, seed: int, tax_share: float = 0.1) -> pd.DataFrame:
+    """
+    A seeded bank export: about ``tax_share`` of the debits pay a KB instrument (with a reference
+    suffix, as banks print them), the rest is everyday spend with a long tail of unique payees.
+    """
+    rng = np.random.default_rng(seed)
+    instruments = pd.read_csv(config.TAX_INSTRUMENTS_PATH)["instrument_name"].str.upper().to_numpy(dtype=object)
+    is_tax = rng.random(rows) < tax_share
+    names = np.where(is_tax, instruments[rng.integers(0, len(instruments), rows)],
+                     np.asarray(EVERYDAY_SPEND, dtype=object)[rng.integers(0, len(EVERYDAY_SPEND), rows)])
+    refs = rng.integers(0, max(10, rows // 20), rows).astype(str)
+    dates = pd.Timestamp("2024-04-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    return pd.DataFrame({
+        "Txn Date": dates.strftime("%d/%m/%Y"),
+        "Narration": "UPI/" + names + "/" + refs,
+        "Withdrawal Amount (INR)": np.round(rng.lognormal(7.5, 1.2, rows), 2)
+    })
+
+def timed(fn: Callable[..., object], repeat: int, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    """Wall times of ``repeat`` calls; ``setup`` (untimed) builds a fresh argument for each call."""
+    times = []
+    for _ in range(repeat):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+def use_encoder(kind: str):
+    """Points the global classifier at the requested encoder, with a cold in-memory result cache."""
+    from app.ml.transaction_classifier import classifier
+
+    if kind == "stub":
+        # Stub vectors must never land in the persisted embedding cache of the real model
+        config.EMBEDDING_CACHE_DIR = ""
+        classifier.model = HashingEncoder()
+        classifier.kb_view = None
+    config.CLASSIFICATION_CACHE_PATH = ""
+    classifier.result_cache = None
+    classifier.ensure_loaded()
+    return classifier
+
+def run(sizes: List[int], cases: List[str], repeat: int, seed: int, encoder: str) -> List[Dict[str, object]]:
+    from app.ml.classification_cache import ClassificationCache
+    from app.models.schemas import UserProfile
+    from app.services.data_processing import get_monthly_aggregates, parse_bank_statement, parse_statement_batch
+    from app.services.local_advisor import local_advisor
+    from app.services.tax_engine import tax_engine
+
+    classifier = use_encoder(encoder)
+    profile = UserProfile(name="Bench", salary=1800000, age=35, risk_appetite="moderate", financial_year="2024-2025")
+    rows_out = []
+
+    def record(case: str, size: Optional[int], calls: int, times: List[float]):
+        median = statistics.median(times)
+        rows_out.append({"case": case, "size": size, "calls": calls, "min_s": min(times), "median_s": median,
+                         "per_second": calls / median if median else None})
+
+    for case in cases:
+        if case in FIXED_CALLS:
+            calls = FIXED_CALLS[case]
+            if case == "run_simulation":
+                fn = lambda: [tax_engine.run_simulation(1200000 + i, 35, 100000, 25000, 50000) for i in range(calls)]
+            else:
+                fn = lambda: [local_advisor.get_response(ADVISOR_QUERIES[i % len(ADVISOR_QUERIES)]) for i in range(calls)]
+            record(case, None, calls, timed(fn, repeat))
+            continue
+
+        for size in sizes:
+            df = synthetic_statement(size, seed)
+            batch = parse_statement_batch(df)
+            assert len(batch) == size, "synthetic statement columns no longer match the parser's mapping"
+            setup = None
+            if case == "parse_bank_statement":
+                fn = lambda: parse_bank_statement(df)
+            elif case == "parse_statement_batch":
+                fn = lambda: parse_statement_batch(df)
+            elif case == "classify":
+                def setup():
+                    # Classification fills the batch in place, and a warm cache would skip the encoder
+                    classifier.result_cache = ClassificationCache(config.CLASSIFICATION_CACHE_SIZE)
+                    return parse_statement_batch(df)
+                fn = classifier.process_batch
+            elif case == "analyze_profile":
+                classifier.process_batch(batch)
+                fn = lambda: tax_engine.analyze_profile(profile, batch)
+            elif case == "get_monthly_aggregates":
+                fn = lambda: get_monthly_aggregates(batch)
+            elif case == "run_simulation_batch":
+                salaries = np.linspace(300000, 5000000, size)
+                fn = lambda: tax_engine.run_simulation_batch(salaries, 35, 100000, 25000, 50000)
+            else:
+                raise ValueError(f"Unknown case: {case}")
+            record(case, size, size, timed(fn, repeat, setup))
+    return rows_out
+
+def compare(rows: List[Dict[str, object]], baseline: Dict[str, object], threshold: float) -> List[Dict[str, object]]:
+    """
+    Adds the baseline and the ratio to ``rows`` and returns the rows slower than 1 + threshold.
+    Best-of-repeat times are compared (the least noisy statistic), and differences below
+    NOISE_FLOOR_S are never flagged, so sub-millisecond cases do not flap.
+    """
+    previous = {(r["case"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for row in rows:
+        base = previous.get((row["case"], row["size"]))
+        if base is None or not base["min_s"]:
+            continue
+        row["baseline_min_s"] = base["min_s"]
+        row["ratio"] = row["min_s"] / base["min_s"]
+        if row["ratio"] > 1 + threshold and row["min_s"] - base["min_s"] > NOISE_FLOOR_S:
+            regressions.append(row)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Statement rows per case (up to 1000000)")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--encoder", choices=["stub", "model"], default="stub")
+    parser.add_argument("--save", help="Write the results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before a case is flagged")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.cases, args.repeat, args.seed, args.encoder)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(rows, json.load(f), args.threshold)
+
+    print(f"{'case':>24} {'size':>8} {'median s':>10} {'min s':>10} {'per s':>12} {'vs base':>8}")
+    for r in rows:
+        ratio = f"{r['ratio']:.2f}x" if r.get("ratio") else "-"
+        flag = "  REGRESSION" if r in regressions else ""
+        print(f"{r['case']:>24} {str(r['size'] or '-'):>8} {r['median_s']:>10.4f} {r['min_s']:>10.4f} "
+              f"{r['per_second'] or 0:>12.0f} {ratio:>8}{flag}")
+
+    if args.save:
+        meta = {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                "machine": platform.machine(), "seed": args.seed, "encoder": args.encoder, "repeat": args.repeat}
+        with open(args.save, 'w') as f:
+            json.dump({"meta": meta, "results": rows}, f, indent=2)
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
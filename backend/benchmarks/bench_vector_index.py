@@ -0,0 +1,71 @@
+"""
+Build and query benchmark for the KB vector indexes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_vector_index --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.ml.transaction_classifier import normalize_rows
+from app.ml.vector_index import ExactIndex, ClusteredIndex
+
+def synthetic_catalogue(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered unit vectors, roughly how scheme names of the same AMC/insurer group together."""
+    centres = rng.standard_normal((max(1, n // 50), dim)).astype(np.float32)
+    members = centres[rng.integers(0, centres.shape[0], n)]
+    return normalize_rows(members + 0.35 * rng.standard_normal((n, dim)).astype(np.float32))
+
+def queries_near(vectors: np.ndarray, n_queries: int, rng: np.random.Generator) -> np.ndarray:
+    picks = vectors[rng.integers(0, vectors.shape[0], n_queries)]
+    return normalize_rows(picks + 0.1 * rng.standard_normal(picks.shape).astype(np.float32))
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(sizes, dim: int, n_queries: int, probes, seed: int):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for n in sizes:
+        vectors = synthetic_catalogue(n, dim, rng)
+        queries = queries_near(vectors, n_queries, rng)
+
+        exact, exact_build = timed(lambda: ExactIndex(vectors))
+        (truth, _), exact_query = timed(lambda: exact.search(queries, k=1))
+        rows.append({"size": n, "index": "exact", "n_probe": None, "build_s": exact_build,
+                     "query_ms_per_1k": exact_query / n_queries * 1e6, "recall_at_1": 1.0})
+
+        ivf, ivf_build = timed(lambda: ClusteredIndex(vectors, seed=seed))
+        for n_probe in probes:
+            (found, _), ivf_query = timed(lambda: ivf.search(queries, k=1, n_probe=n_probe))
+            rows.append({"size": n, "index": f"ivf[{ivf.n_clusters}]", "n_probe": n_probe, "build_s": ivf_build,
+                         "query_ms_per_1k": ivf_query / n_queries * 1e6,
+                         "recall_at_1": float((found[:, 0] == truth[:, 0]).mean())})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=384, help="Embedding width (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the rows to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.dim, args.queries, args.probes, args.seed)
+    print(f"{'size':>8} {'index':>10} {'n_probe':>8} {'build s':>9} {'ms/1k q':>9} {'recall@1':>9}")
+    for r in rows:
+        print(f"{r['size']:>8} {r['index']:>10} {str(r['n_probe'] or '-'):>8} {r['build_s']:>9.3f} "
+              f"{r['query_ms_per_1k']:>9.1f} {r['recall_at_1']:>9.3f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
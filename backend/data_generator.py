@@ -1,7 +1,17 @@
-import pandas as pd
-import numpy as np
+"""
+Synthetic bank statements (several bank export layouts) for load tests and benchmarks.
+
+Run from the backend directory, since it reads the tax instrument list via app.core.config:
+    python -m data_generator --users 1000 --layout hdfc --format parquet --out statements.parquet
+"""
+import argparse
 import random
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import TAX_INSTRUMENTS_PATH
 
 def generate_user_profile():
     """Generates a synthetic user profile dictionary."""
@@ -13,80 +23,227 @@ def generate_user_profile():
         "risk_level": random.choice(["Low", "Medium", "High"])
     }
 
-def generate_transactions(num_transactions=100, save_path="transactions.csv"):
+SALARIES = np.array([800000, 1200000, 1800000, 2500000, 3500000], dtype=np.float64)
+RISK_APPETITES = np.array(["conservative", "moderate", "aggressive"], dtype=object)
+EMPLOYERS = np.array(["ACME TECHNOLOGIES PVT LTD", "GLOBEX INDIA LTD", "INITECH SOLUTIONS", "UMBRELLA HEALTHCARE"],
+                     dtype=object)
+
+# Everyday spend: (payee, category, low, high); low/high bound the uniform debit amount
+SPEND = [
+    ("SWIGGY", "Dining", 150, 1500), ("ZOMATO", "Dining", 150, 1500), ("AMAZON", "Shopping", 200, 8000),
+    ("FLIPKART", "Shopping", 200, 8000), ("BIGBASKET", "Groceries", 300, 5000), ("DMART", "Groceries", 300, 5000),
+    ("UBER", "Travel", 100, 1200), ("IRCTC", "Travel", 300, 4000), ("BESCOM ELECTRICITY", "Utilities", 500, 4000),
+    ("AIRTEL RECHARGE", "Utilities", 199, 999), ("NETFLIX", "Entertainment", 199, 649),
+    ("RENT TRANSFER", "Rent", 15000, 40000), ("INDIAN OIL PETROL", "Travel", 500, 4000), ("ATM CASH", "Misc", 500, 10000)
+]
+# Share of tax-saving debits per section; sections missing from tax_instruments.csv are ignored
+DEFAULT_SECTION_MIX = {"80C": 0.55, "80D": 0.30, "80CCD(1B)": 0.15}
+# Median debit per tax-saving payment (lognormal around it)
+SECTION_AMOUNTS = {"80C": 12000.0, "80D": 15000.0, "80CCD(1B)": 5000.0}
+
+# Column order per bank export. Header names are the ones the statement parser's COLUMN_MAPPING
+# maps to date/description/debit_amount/credit_amount; date formats are the ones it charts.
+LAYOUTS = {
+    "generic": ["Date", "Description", "Debit", "Credit", "Balance", "Category"],
+    "hdfc": ["Date", "Narration", "Chq./Ref.No.", "Value Date", "Withdrawal Amount (INR)", "Deposit Amount (INR)",
+             "Closing Balance"],
+    "sbi": ["Txn Date", "Value Date", "Description", "Ref No./Cheque No.", "Debit", "Credit", "Balance"],
+    "icici": ["S No.", "Value Date", "Transaction Date", "Cheque Number", "Remarks", "Withdrawal Amount (INR)",
+              "Deposit Amount (INR)", "Balance (INR)"]
+}
+DATE_FORMATS = {"generic": "%Y-%m-%d", "hdfc": "%d/%m/%y", "sbi": "%d-%m-%Y", "icici": "%d/%m/%Y"}
+
+def load_instruments(section_mix: Optional[Dict[str, float]] = None):
+    """Instrument names, categories and per-row sampling weights realizing ``section_mix``."""
+    kb = pd.read_csv(TAX_INSTRUMENTS_PATH)
+    mix = {s: w for s, w in (section_mix or DEFAULT_SECTION_MIX).items() if w > 0 and (kb["section"] == s).any()}
+    if not mix:
+        raise ValueError("None of the requested sections appear in tax_instruments.csv")
+    kb = kb[kb["section"].isin(list(mix))].reset_index(drop=True)
+    # Each section's weight is split evenly over its instruments
+    per_row = kb["section"].map(mix) / kb["section"].map(kb["section"].value_counts())
+    return (kb["instrument_name"].str.upper().to_numpy(dtype=object), kb["category"].to_numpy(dtype=object),
+            kb["section"].to_numpy(dtype=object), (per_row / per_row.sum()).to_numpy())
+
+def generate_users(num_users: int, rng: np.random.Generator, financial_year: str = "2024-2025",
+                   first_id: int = 0) -> pd.DataFrame:
+    """Seeded profiles in the /analyze UserProfile schema, plus a user_id joining them to their rows."""
+    ids = np.arange(first_id, first_id + num_users)
+    return pd.DataFrame({
+        "user_id": pd.Series(ids).map("U{:07d}".format),
+        "name": pd.Series(ids).map("Synthetic User {}".format),
+        "salary": SALARIES[rng.integers(0, len(SALARIES), num_users)],
+        "age": rng.integers(23, 70, num_users),
+        "risk_appetite": RISK_APPETITES[rng.integers(0, len(RISK_APPETITES), num_users)],
+        "financial_year": financial_year
+    })
+
+def generate_statements(users: pd.DataFrame, rows_per_user: int, rng: np.random.Generator, layout: str = "generic",
+                        tax_share: float = 0.08, section_mix: Optional[Dict[str, float]] = None,
+                        start_date: str = "2024-04-01", include_user_id: bool = True) -> pd.DataFrame:
+    """
+    One year of transactions for every user in ``users``, built column-wise with no per-row Python.
+    Each user gets up to 12 monthly salary credits; of the remaining debits about ``tax_share``
+    pay a tax instrument (sections drawn by ``section_mix``), the rest is everyday spend.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'; expected one of {sorted(LAYOUTS)}")
+    names, categories, sections, weights = load_instruments(section_mix)
+    n_users, total = len(users), len(users) * rows_per_user
+
+    user = np.repeat(np.arange(n_users), rows_per_user)
+    position = np.tile(np.arange(rows_per_user), n_users)
+    is_salary = position < min(12, rows_per_user // 4)
+    is_tax = ~is_salary & (rng.random(total) < tax_share)
+    is_spend = ~is_salary & ~is_tax
+
+    # Salaries land on the 1st of consecutive months, everything else on a uniform day of the year
+    start = pd.Timestamp(start_date)
+    month_starts = np.array([(start + pd.DateOffset(months=m) - start).days for m in range(12)])
+    day = rng.integers(0, 365, total)
+    day[is_salary] = month_starts[position[is_salary]]
+    order = np.lexsort((day, user))  # Rows stay grouped by user, in date order within each
+    user, day, is_salary, is_tax, is_spend = user[order], day[order], is_salary[order], is_tax[order], is_spend[order]
+
+    instrument = rng.choice(len(names), size=total, p=weights)
+    spend = rng.integers(0, len(SPEND), total)
+    spend_payee = np.array([s[0] for s in SPEND], dtype=object)[spend]
+    spend_low = np.array([s[2] for s in SPEND], dtype=np.float64)[spend]
+    spend_high = np.array([s[3] for s in SPEND], dtype=np.float64)[spend]
+    section_median = pd.Series(sections[instrument]).map(SECTION_AMOUNTS).fillna(10000.0).to_numpy()
+    employer = EMPLOYERS[rng.integers(0, len(EMPLOYERS), n_users)][user]
+
+    monthly_salary = users["salary"].to_numpy(dtype=np.float64)[user] / 12
+    credit = np.where(is_salary, np.round(monthly_salary * rng.uniform(0.97, 1.03, total), 2), np.nan)
+    debit = np.where(is_tax, np.round(section_median * rng.lognormal(0.0, 0.4, total), 2),
+                     np.round(rng.uniform(spend_low, spend_high), 2))
+    debit[is_salary] = np.nan
+
+    # Running balance per user: one global cumulative sum, re-based at each user's first row
+    delta = np.nan_to_num(credit) - np.nan_to_num(debit)
+    running = np.cumsum(delta)
+    first_row = np.arange(n_users) * rows_per_user
+    opening = rng.uniform(50000, 200000, n_users) - (running[first_row] - delta[first_row])
+    balance = np.round(opening[user] + running, 2)
+
+    payee = np.where(is_tax, names[instrument], spend_payee)
+    ref = rng.integers(10 ** 11, 10 ** 12, total).astype(str).astype(object)
+    handle = pd.Series(payee).str.lower().str.replace(" ", "", regex=False).to_numpy(dtype=object)
+    narration = _narrations(layout, is_salary, is_tax, payee, employer, ref, handle)
+    # Only 365 distinct dates: format those once and gather, instead of strftime on every row
+    calendar = (start + pd.to_timedelta(np.arange(365), unit="D")).strftime(DATE_FORMATS[layout])
+    dates = calendar.to_numpy(dtype=object)[day]
+
+    columns = {
+        "generic": lambda: {"Date": dates, "Description": narration, "Debit": np.nan_to_num(debit),
+                            "Credit": np.nan_to_num(credit), "Balance": balance,
+                            "Category": np.where(is_salary, "Salary", np.where(
+                                is_tax, categories[instrument],
+                                np.array([s[1] for s in SPEND], dtype=object)[spend]))},
+        "hdfc": lambda: {"Date": dates, "Narration": narration, "Chq./Ref.No.": ref, "Value Date": dates,
+                         "Withdrawal Amount (INR)": debit, "Deposit Amount (INR)": credit, "Closing Balance": balance},
+        "sbi": lambda: {"Txn Date": dates, "Value Date": dates, "Description": narration, "Ref No./Cheque No.": ref,
+                        "Debit": debit, "Credit": credit, "Balance": balance},
+        "icici": lambda: {"S No.": position + 1, "Value Date": dates, "Transaction Date": dates, "Cheque Number": ref,
+                          "Remarks": narration, "Withdrawal Amount (INR)": debit, "Deposit Amount (INR)": credit,
+                          "Balance (INR)": balance}
+    }[layout]()
+    df = pd.DataFrame(columns, columns=LAYOUTS[layout])
+    if include_user_id:
+        df.insert(0, "User ID", users["user_id"].to_numpy(dtype=object)[user])
+    return df
+
+def _narrations(layout: str, is_salary: np.ndarray, is_tax: np.ndarray, payee: np.ndarray, employer: np.ndarray,
+                ref: np.ndarray, handle: np.ndarray) -> np.ndarray:
+    """Bank-specific narration text: UPI for everyday spend, NACH/ACH auto-debits for instruments."""
+    if layout == "hdfc":
+        salary = "NEFT CR-" + employer + "-SALARY"
+        tax = "ACH D- " + payee + "-" + ref
+        spend = "UPI-" + payee + "-" + handle + "@okhdfcbank-" + ref + "-UPI"
+    elif layout == "sbi":
+        salary = "BY TRANSFER-NEFT*" + employer + "*SALARY"
+        tax = "TO TRANSFER-NACH/" + payee + "/" + ref
+        spend = "TO TRANSFER-UPI/DR/" + ref + "/" + payee + "/YESB/" + handle + "@ybl/"
+    elif layout == "icici":
+        salary = "NEFT-" + employer + "-SALARY"
+        tax = "BIL/ONL/" + ref + "/" + payee
+        spend = "UPI/" + ref + "/" + payee + "/" + handle + "@icici/ICICI Bank"
+    else:
+        salary = "EMPLOYER SALARY NEFT"
+        tax = spend = "PAYMENT TO " + payee
+    return np.where(is_salary, salary, np.where(is_tax, tax, spend))
+
+def write_dataset(path: str, num_users: int, rows_per_user: int, layout: str = "generic", fmt: str = "csv",
+                  seed: int = 0, chunk_users: int = 1000, profiles_path: Optional[str] = None, **options) -> int:
     """
-    Generates a synthetic dataframe of bank transactions over the last year.
-    Matches the schema: Date, Description, Debit, Credit, Balance, Category.
+    Streams statements for ``num_users`` users to ``path`` (CSV or Parquet), ``chunk_users`` users
+    at a time so memory stays bounded. Each chunk draws from its own seeded generator, so a given
+    seed and chunk size always produce the same file. Returns the number of rows written.
     """
-    
-    categories = [
-        "Salary", "Groceries", "Rent", "Utilities", "Dining", 
-        "Entertainment", "Health Insurance", "Life Insurance", 
-        "Mutual Fund (ELSS)", "PPF", "NPS", "Travel", "Misc"
-    ]
-    
-    # Weights for random category selection (excluding Salary which is fixed)
-    expense_categories = categories[1:]
-    weights = [0.2, 0.2, 0.1, 0.15, 0.1, 0.05, 0.05, 0.05, 0.05, 0.02, 0.02, 0.01]
-    
-    data = []
-    base_date = datetime.now() - timedelta(days=365)
-    current_balance = random.uniform(50000, 200000)
-    
-    for i in range(num_transactions):
-        # Transaction date
-        days_offset = sorted(random.sample(range(365), num_transactions))[i]
-        t_date = base_date + timedelta(days=days_offset)
-        
-        # Determine if it's a salary deposit or an expense
-        # Let's say every ~30 days is salary
-        if (i % (num_transactions // 12 + 1)) == 0:
-            category = "Salary"
-            description = "EMPLOYER SALARY NEFT"
-            credit = round(random.uniform(60000, 250000), 2)
-            debit = 0.0
-        else:
-            category = random.choices(expense_categories, weights=weights)[0]
-            description = f"PAYMENT TO {category.upper()}"
-            
-            # Special amounts for specific categories
-            if category == "Rent":
-                debit = round(random.uniform(15000, 40000), 2)
-            elif category in ["Health Insurance", "Life Insurance"]:
-                debit = round(random.uniform(5000, 25000), 2)
-            elif category in ["Mutual Fund (ELSS)", "PPF", "NPS"]:
-                debit = round(random.uniform(5000, 50000), 2)
+    writer = None
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+    elif fmt != "csv":
+        raise ValueError(f"Unknown format '{fmt}'; expected csv or parquet")
+
+    written = 0
+    try:
+        for chunk_index, first in enumerate(range(0, num_users, chunk_users)):
+            rng = np.random.default_rng([seed, chunk_index])
+            users = generate_users(min(chunk_users, num_users - first), rng, first_id=first)
+            df = generate_statements(users, rows_per_user, rng, layout, **options)
+            if fmt == "csv":
+                df.to_csv(path, mode="w" if first == 0 else "a", header=first == 0, index=False)
             else:
-                debit = round(random.uniform(100, 5000), 2)
-            
-            credit = 0.0
-            
-        # Update balance
-        current_balance += credit - debit
-        
-        data.append({
-            "Date": t_date.strftime("%Y-%m-%d"),
-            "Description": description,
-            "Debit": debit,
-            "Credit": credit,
-            "Balance": round(current_balance, 2),
-            "Category": category
-        })
-        
-    df = pd.DataFrame(data)
-    
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            if profiles_path:
+                users.to_csv(profiles_path, mode="w" if first == 0 else "a", header=first == 0, index=False)
+            written += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+def generate_transactions(num_transactions=100, save_path="transactions.csv", layout="generic", seed=None):
+    """
+    Generates one synthetic user's bank statement over a financial year (``layout`` picks the bank
+    export format). Matches the schema: Date, Description, Debit, Credit, Balance, Category.
+    """
+    rng = np.random.default_rng(seed)
+    df = generate_statements(generate_users(1, rng), num_transactions, rng, layout, include_user_id=False)
+
     if save_path:
         df.to_csv(save_path, index=False)
         print(f"Generated {num_transactions} transactions and saved to {save_path}")
-        
+
     return df
 
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Synthetic bank statements for load tests and benchmarks.")
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--rows-per-user", type=int, default=150)
+    parser.add_argument("--layout", choices=sorted(LAYOUTS), default="generic")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--tax-share", type=float, default=0.08, help="Share of debits paying a tax instrument")
+    parser.add_argument("--mix", nargs="*", default=[], metavar="SECTION=WEIGHT",
+                        help="Section mix of tax-saving debits, e.g. 80C=0.7 80D=0.3")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-users", type=int, default=1000)
+    parser.add_argument("--profiles", help="Also write the users' profiles (CSV) here")
+    parser.add_argument("--out", default="transactions.csv")
+    args = parser.parse_args(argv)
+
+    section_mix = {k: float(v) for k, v in (item.split("=", 1) for item in args.mix)} or None
+    rows = write_dataset(args.out, args.users, args.rows_per_user, args.layout, args.format, args.seed,
+                         args.chunk_users, args.profiles, tax_share=args.tax_share, section_mix=section_mix)
+    print(f"Generated {rows} transactions for {args.users} users and saved to {args.out}")
+
 if __name__ == "__main__":
-    profile = generate_user_profile()
-    print("Generated User Profile:")
-    print(profile)
-    
-    print("\nGenerating Transactions...")
-    df = generate_transactions(num_transactions=150, save_path="c:\\Users\\dwara\\Downloads\\b_czZzU9wmRLk-1772190024275\\backend\\transactions.csv")
-    print("\nSample Data:")
-    print(df.head())
+    main()
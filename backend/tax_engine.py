@@ -1,6 +1,9 @@
 import pandas as pd
+import numpy as np
 import json
 import os
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Optional: LLM imports (google-generativeai or openai)
@@ -8,39 +11,59 @@ import google.generativeai as genai
 
 load_dotenv()
 
-def analyze_financials(df: pd.DataFrame) -> dict:
+# Debit description keywords per deduction bucket (case-insensitive substrings). Each debit
+# lands in at most one bucket: when a description matches keywords of several buckets, the
+# bucket listed first here wins ("LIC health plan" is 80C), so no amount is counted twice.
+INVESTMENT_KEYWORDS = {
+    "80C_eligible": ["ppf", "elss", "mutual fund", "lic", "life insurance"],
+    "80D_eligible": ["health", "mediclaim"],
+    "80CCD_eligible": ["nps", "national pension"]
+}
+
+@lru_cache(maxsize=8)
+def _compile_keywords(table: tuple) -> re.Pattern:
+    """One pattern with an optional lookahead group per bucket, so a single match reports every bucket hit."""
+    lookaheads = "".join(f"(?:(?=.*?({'|'.join(re.escape(k) for k in keywords)})))?" for _, keywords in table)
+    return re.compile(lookaheads, re.IGNORECASE | re.DOTALL)
+
+def categorize_descriptions(descriptions: pd.Series, keywords: dict = INVESTMENT_KEYWORDS) -> pd.Series:
+    """
+    Maps each description to its bucket in ``keywords`` (None when nothing matches), taking the
+    first matching bucket in table order. The compiled matcher runs once per distinct
+    description, since descriptions repeat heavily across multi-year statements.
+    """
+    buckets = np.array(list(keywords), dtype=object)
+    pattern = _compile_keywords(tuple((bucket, tuple(k)) for bucket, k in keywords.items()))
+    codes, uniques = pd.factorize(descriptions)
+    hits = pd.Series(uniques, dtype=object).str.extract(pattern, expand=True).notna().to_numpy(dtype=bool)
+    matched = np.where(hits.any(axis=1), buckets[hits.argmax(axis=1)], None) if len(buckets) else \
+        np.full(len(uniques), None, dtype=object)
+    return pd.Series(np.where(codes >= 0, matched[codes], None), index=descriptions.index, dtype=object)
+
+def analyze_financials(df: pd.DataFrame, keywords: dict = INVESTMENT_KEYWORDS) -> dict:
     """
     Analyzes transactions to compute total income, expenses, monthly surplus, 
     and detects insurance/investments based on description keywords.
+    The input frame is not modified.
     """
     
     # The new schema: Date, Description, Amount, Type (CREDIT/DEBIT)
-    # Convert amounts to float/abs just in case they are negative as in the sample
-    df['Amount'] = df['Amount'].abs()
+    # Amounts are taken as absolute values in case they are negative as in the sample
+    amounts = df['Amount'].abs()
+    types = df['Type'].str.upper()
     
-    total_income = df[df['Type'].str.upper() == 'CREDIT']['Amount'].sum()
-    total_expenses = df[df['Type'].str.upper() == 'DEBIT']['Amount'].sum()
+    totals = amounts.groupby(types).sum()
+    total_income = totals.get('CREDIT', 0.0)
+    total_expenses = totals.get('DEBIT', 0.0)
     monthly_surplus = (total_income - total_expenses) / 12 if total_income > total_expenses else 0
     
-    # Categorize detected investments by string matching on Description
-    # Convert descriptions to lowercase for easier matching
-    df['desc_lower'] = df['Description'].str.lower()
-    
-    # Filter only DEBIT transactions for investments
-    debits = df[df['Type'].str.upper() == 'DEBIT']
+    # Only DEBIT transactions count as investments; each is bucketed once and summed per bucket
+    is_debit = (types == 'DEBIT').to_numpy(dtype=bool, na_value=False)
+    buckets = categorize_descriptions(df['Description'][is_debit], keywords)
+    invested = amounts[is_debit].groupby(buckets).sum()
     
-    # Check for keywords and cast to float for JSON serialization
-    ppf_sum = float(debits[debits['desc_lower'].str.contains('ppf')]['Amount'].sum())
-    elss_sum = float(debits[debits['desc_lower'].str.contains('elss|mutual fund')]['Amount'].sum())
-    lic_sum = float(debits[debits['desc_lower'].str.contains('lic|life insurance')]['Amount'].sum())
-    health_sum = float(debits[debits['desc_lower'].str.contains('health|mediclaim')]['Amount'].sum())
-    nps_sum = float(debits[debits['desc_lower'].str.contains('nps|national pension')]['Amount'].sum())
-    
-    investments = {
-        "80C_eligible": ppf_sum + elss_sum + lic_sum,
-        "80D_eligible": health_sum,
-        "80CCD_eligible": nps_sum
-    }
+    # Cast to float for JSON serialization
+    investments = {bucket: float(invested.get(bucket, 0.0)) for bucket in keywords}
     
     return {
         "total_income": float(round(total_income, 2)),
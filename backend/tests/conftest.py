@@ -0,0 +1,22 @@
+import pytest
+
+from app.core import config
+from app.ml.hashing_encoder import HashingEncoder
+from app.ml.transaction_classifier import classifier
+from app.services.result_cache import result_cache
+
+
+@pytest.fixture
+def stub_classifier(tmp_path, monkeypatch):
+    """The global classifier wired to a HashingEncoder, with its KB state restored afterwards."""
+    # Summaries cached under another test's classifier must not answer this one
+    result_cache.clear()
+    monkeypatch.setattr(config, "EMBEDDING_CACHE_DIR", str(tmp_path / "embeddings"))
+    monkeypatch.setattr(config, "CLASSIFICATION_CACHE_PATH", str(tmp_path / "classifications.sqlite3"))
+    saved = dict(classifier.__dict__)
+    classifier.model = HashingEncoder(dim=64)
+    classifier.kb_view = None
+    classifier.result_cache = None
+    yield classifier
+    classifier.__dict__.clear()
+    classifier.__dict__.update(saved)
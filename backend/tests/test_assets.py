@@ -0,0 +1,91 @@
+import json
+import threading
+
+import pytest
+
+from app.core import config
+from app.core.assets import AssetWatcher
+from app.services import tax_engine as tax_engine_module
+from app.services.tax_engine import TaxEngine
+
+
+def test_watcher_reloads_only_on_content_change(tmp_path):
+    asset = tmp_path / "rules.json"
+    asset.write_text('{"v": 1}')
+    reloads = []
+    watcher = AssetWatcher(interval=0)
+    watcher.register("rules", [str(asset)], lambda: reloads.append(asset.read_text()))
+    first = watcher.versions()["rules"]
+
+    assert watcher.check() == []
+    asset.write_text('{"v": 1}')  # Same bytes: signature moves, content does not
+    assert watcher.check() == [] and reloads == []
+
+    asset.write_text('{"v": 2}')
+    assert watcher.check() == ["rules"]
+    assert reloads == ['{"v": 2}'] and watcher.versions()["rules"] != first
+
+
+def test_failed_reload_keeps_previous_version(tmp_path):
+    asset = tmp_path / "rules.json"
+    asset.write_text("a")
+    watcher = AssetWatcher(interval=0)
+
+    def broken():
+        raise ValueError("bad rules")
+
+    watcher.register("rules", [str(asset)], broken)
+    version = watcher.versions()["rules"]
+    asset.write_text("bb")
+    assert watcher.check() == []
+    assert watcher.versions()["rules"] == version
+    assert "bad rules" in watcher.status()["rules"]["error"]
+
+
+def test_tax_rules_reload_swaps_engines_atomically(tmp_path, monkeypatch):
+    engine = TaxEngine()
+    before = engine.for_year(None)
+    old_tax = before.calculate_regime(1500000, 0, "new_regime")["final_tax"]
+
+    rules = dict(engine.rules, cess_percent=10.0)
+    path = tmp_path / "tax_rules.json"
+    path.write_text(json.dumps(rules))
+    monkeypatch.setattr(tax_engine_module, "TAX_RULES_PATH", str(path))
+    engine.reload()
+
+    after = engine.for_year(None)
+    assert after is not before
+    # Calls that already resolved an engine finish on the old rules
+    assert before.calculate_regime(1500000, 0, "new_regime")["final_tax"] == old_tax
+    assert after.calculate_regime(1500000, 0, "new_regime")["final_tax"] > old_tax
+
+
+def test_classifier_reload_picks_up_new_instruments(stub_classifier, tmp_path, monkeypatch):
+    stub_classifier._init_model()
+    old_view = stub_classifier.kb_view
+    assert not stub_classifier.classify_transaction("qqxzz jjvwk")["is_match"]
+
+    csv_path = tmp_path / "tax_instruments.csv"
+    csv_path.write_text(open(config.TAX_INSTRUMENTS_PATH).read().rstrip("\n") +
+                        "\nQqxzz Jjvwk,80CCD_1B,Pension,Qqxzz,Medium\n")
+    monkeypatch.setattr(config, "TAX_INSTRUMENTS_PATH", str(csv_path))
+    assert stub_classifier.reload_knowledge_base()
+
+    assert stub_classifier.kb_view is not old_view
+    assert stub_classifier.classify_transaction("qqxzz jjvwk")["section"] == "80CCD_1B"
+
+
+def test_classifier_kb_state_is_one_view_swapped_under_the_init_lock(stub_classifier):
+    stub_classifier._init_model()
+    old_view = stub_classifier.kb_view
+    assert stub_classifier.kb_sections is old_view.sections and stub_classifier.kb_version == old_view.version
+    with pytest.raises(AttributeError):
+        stub_classifier.kb_sections = None  # Read through the view only; no second copy to tear
+
+    with stub_classifier._init_lock:
+        reload = threading.Thread(target=stub_classifier.reload_knowledge_base)
+        reload.start()
+        reload.join(timeout=0.2)
+        assert reload.is_alive() and stub_classifier.kb_view is old_view
+    reload.join()
+    assert stub_classifier.kb_view is not old_view
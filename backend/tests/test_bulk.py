@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.assets import register_default_assets
+from app.main import app
+from app.services.bulk import shutdown_bulk_executor
+from tests.test_endpoints import PROFILE, STATEMENT, analyze
+
+PROFILES = [dict(json.loads(PROFILE), salary=salary) for salary in (800000, 1200000, 2500000)]
+
+
+@pytest.fixture(params=["process", "thread"])
+def bulk_pool(request, monkeypatch):
+    monkeypatch.setattr(config, "BULK_EXECUTOR", request.param)
+    monkeypatch.setattr(config, "BULK_MAX_WORKERS", 2)
+    monkeypatch.setattr(config, "BULK_IN_FLIGHT_PER_WORKER", 1)
+    yield
+    shutdown_bulk_executor()
+
+
+def read_lines(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return sorted(lines[:-1], key=lambda r: r["index"]), lines[-1]["summary"]
+
+
+def test_bulk_ndjson_matches_single_analyze(stub_classifier, bulk_pool):
+    client = TestClient(app)
+    records = [{"id": f"emp{i}", "profile": p, "statement_csv": STATEMENT} for i, p in enumerate(PROFILES)]
+    records.append({"id": "broken", "profile": PROFILES[0], "transactions": []})
+    body = "\n".join(json.dumps(r) for r in records) + "\n\nnot json\n"
+
+    response = client.post("/api/v1/analyze/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+    results, summary = read_lines(response)
+    assert summary == {"records": 5, "success": 3, "error": 2}
+    assert [r["status"] for r in results] == ["success"] * 3 + ["error"] * 2
+
+    single = analyze(client).json()
+    emp1 = results[1]
+    assert emp1["id"] == "emp1"
+    assert emp1["tax_analysis"] == single["tax_analysis"]
+    assert emp1["discovered_investments"] == single["discovered_investments"]
+
+
+def test_bulk_archive_pairs_statements_with_manifest(stub_classifier, bulk_pool):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("profiles.ndjson", "\n".join(json.dumps({"id": f"emp{i}", "profile": p})
+                                                      for i, p in enumerate(PROFILES[:2])))
+        archive.writestr("statements/emp0.csv", STATEMENT)
+        archive.writestr("statements/emp1.csv", STATEMENT)
+        archive.writestr("statements/emp9.csv", STATEMENT)
+
+    response = TestClient(app).post("/api/v1/analyze/bulk",
+                                    files={"file": ("payroll.zip", buffer.getvalue(), "application/zip")})
+    results, summary = read_lines(response)
+    assert summary == {"records": 3, "success": 2, "error": 1}
+    assert {r["id"]: r["status"] for r in results} == {"emp0": "success", "emp1": "success", "emp9": "error"}
+
+
+def test_bulk_rejects_unreadable_archives(stub_classifier):
+    response = TestClient(app).post("/api/v1/analyze/bulk", files={"file": ("x.zip", b"not a zip", "application/zip")})
+    assert response.status_code == 400
+
+
+def test_bulk_workers_pick_up_hot_reloaded_rules(stub_classifier, bulk_pool, monkeypatch):
+    monkeypatch.setattr(config, "BULK_MAX_WORKERS", 1)  # Every request lands on the same worker
+    client = TestClient(app)
+    profile = dict(PROFILES[1], financial_year="2031-2032")
+    body = json.dumps({"id": "emp", "profile": profile, "statement_csv": STATEMENT}) + "\n"
+    watcher = register_default_assets()
+    with open(os.path.join(config.TAX_RULES_DIR, "2025-2026.json")) as f:
+        rules = dict(json.load(f), financial_year="2031-2032")
+    path = os.path.join(config.TAX_RULES_DIR, "2031-2032.json")
+
+    def publish(cess_percent):
+        with open(path, "w") as f:
+            json.dump(dict(rules, cess_percent=cess_percent), f)
+        watcher.check()
+
+    def bulk_old_regime_tax():
+        response = client.post("/api/v1/analyze/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+        analysis = read_lines(response)[0][0]["tax_analysis"]
+        assert analysis["rules_financial_year"] == "2031-2032"
+        return analysis["old_regime"]["tax"]
+
+    try:
+        publish(4.0)
+        before = bulk_old_regime_tax()  # The worker now holds the compiled 4% rules
+        publish(10.0)
+        after = bulk_old_regime_tax()
+        single = client.post("/api/v1/analyze", data={"user_profile": json.dumps(profile)},
+                             files={"file": ("statement.csv", STATEMENT, "text/csv")}).json()
+        assert after > before and after == single["tax_analysis"]["old_regime"]["tax"]
+    finally:
+        os.remove(path)
+        watcher.check()
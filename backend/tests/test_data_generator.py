@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_processing import parse_bank_statement
+from data_generator import LAYOUTS, generate_statements, generate_users, write_dataset
+
+
+def statements(seed, layout="generic"):
+    rng = np.random.default_rng(seed)
+    return generate_statements(generate_users(3, rng), 40, rng, layout)
+
+
+def test_same_seed_gives_the_same_statements():
+    pd.testing.assert_frame_equal(statements(7), statements(7))
+    assert not statements(7).equals(statements(8))
+
+
+def test_write_dataset_is_deterministic_per_seed(tmp_path):
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    for path in paths:
+        assert write_dataset(str(path), num_users=5, rows_per_user=30, seed=3, chunk_users=2) == 150
+    assert paths[0].read_bytes() == paths[1].read_bytes()
+
+
+@pytest.mark.parametrize("layout", sorted(LAYOUTS))
+def test_every_layout_parses_as_a_bank_statement(layout):
+    df = statements(1, layout)
+    assert list(df.columns) == ["User ID"] + LAYOUTS[layout]
+
+    transactions = parse_bank_statement(df.drop(columns="User ID"))
+    assert transactions
+    assert all(t.amount > 0 and t.description and t.date for t in transactions)
@@ -0,0 +1,80 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_processing import parse_bank_statement, normalize_statement, coerce_amounts
+
+
+def read(text):
+    return pd.read_csv(io.StringIO(text))
+
+
+def test_debit_column_and_description_cleaning():
+    df = read("date,description,debit_amount\n"
+              "2024-04-10,LIC Premium XYZ,50000\n"
+              "2024-05-15,HDFC ELSS!! Tax  Saver SIP,60000\n"
+              "2024-07-01,   ,5000\n"
+              "2024-08-01,zero debit,0\n")
+    txns = parse_bank_statement(df)
+    assert [(t.date, t.description, t.amount) for t in txns] == [
+        ("2024-04-10", "lic premium xyz", 50000.0),
+        ("2024-05-15", "hdfc elss tax saver sip", 60000.0),
+    ]
+
+
+def test_single_amount_column_uses_absolute_value():
+    df = read("Date,Description,Amount,Type\n"
+              "2025-04-03,LIC Premium Payment,-15000,DEBIT\n"
+              "2025-04-08,Amazon Purchase,,DEBIT\n")
+    txns = parse_bank_statement(df)
+    assert [(t.description, t.amount) for t in txns] == [("lic premium payment", 15000.0)]
+
+
+def test_bank_layout_with_indian_formatting_and_dr_cr_suffixes():
+    df = read('Txn Date,Value Date,Narration,Withdrawal Amount (INR),Deposit Amount (INR)\n'
+              '01/04/24,02/04/24,ACH-LIC OF INDIA,"1,50,000.00",\n'
+              '03/04/24,03/04/24,SALARY,,"85,000.00"\n')
+    statement = normalize_statement(df)
+    assert statement.to_dict('records') == [
+        {"date": "01/04/24", "description": "ach lic of india", "amount": 150000.0}
+    ]
+
+    amounts, is_credit = coerce_amounts(pd.Series(["1,50,000.00 Dr", "₹2,500 Cr", "Rs. 300", "n/a", None]))
+    np.testing.assert_array_equal(amounts, [150000.0, 2500.0, 300.0, np.nan, np.nan])
+    assert is_credit.tolist() == [False, True, False, False, False]
+
+    df = read('date,particulars,amount\n2024-04-01,NPS CONTRIBUTION,"5,000 Dr"\n2024-04-02,REFUND,"900 Cr"\n')
+    assert [(t.description, t.amount) for t in parse_bank_statement(df)] == [("nps contribution", 5000.0)]
+
+
+def test_input_frame_is_not_modified():
+    df = read("Date,Description,Debit\n2024-04-10,LIC,100\n")
+    parse_bank_statement(df)
+    assert list(df.columns) == ["Date", "Description", "Debit"]
+
+
+def test_missing_columns_yield_no_transactions():
+    assert parse_bank_statement(read("foo,bar\n1,2\n")) == []
+
+
+def test_transaction_batch_reductions_match_model_path():
+    from app.models.transaction_batch import TransactionBatch
+    from app.services.data_processing import parse_statement_batch, get_monthly_aggregates
+    from app.services.tax_engine import tax_engine
+
+    df = read("date,description,debit_amount\n"
+              "2024-04-10,lic premium,50000\n"
+              "2024-05-15,elss sip,60000\n"
+              "2024-06-20,star health,20000\n"
+              "2024-13-01,groceries,5000\n")
+    batch = parse_statement_batch(df)
+    for row, section in [(0, "80C"), (1, "80C"), (2, "80D")]:
+        batch.set_classification(row, section, "Insurance")
+    txns = batch.to_transactions()
+
+    assert batch.tax_section().tolist() == ["80C", "80C", "80D", None]
+    assert tax_engine.section_totals(batch) == tax_engine.section_totals(txns)
+    assert get_monthly_aggregates(batch) == get_monthly_aggregates(txns)
+    assert [r["amount"] for r in batch.tax_saving_records()] == [50000.0, 60000.0, 20000.0]
+    assert TransactionBatch.from_transactions(txns).tax_section().tolist() == batch.tax_section().tolist()
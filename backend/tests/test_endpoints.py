@@ -0,0 +1,157 @@
+import asyncio
+import io
+import json
+import time
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.tax_engine import tax_engine
+
+PROFILE = json.dumps({"name": "Goutham", "salary": 1200000, "age": 28,
+                      "risk_appetite": "moderate", "financial_year": "2024-2025"})
+
+STATEMENT = """date,description,debit_amount
+2024-04-10,LIC Premium XYZ,50000
+2024-05-15,HDFC ELSS Tax Saver SIP,60000
+2024-06-20,Star Health Insurance Renewal,20000
+2024-07-01,Amazon Shopping,5000
+2024-08-01,LIC Premium Next Phase,40000
+"""
+
+SIMULATION = {"salary": 1200000, "age": 30, "investments_80c": 100000,
+              "investments_80d": 25000, "investments_nps": 0}
+
+
+def analyze(client, statement=STATEMENT, filename="statement.csv"):
+    return client.post("/api/v1/analyze", data={"user_profile": PROFILE},
+                       files={"file": (filename, statement, "text/csv")})
+
+
+def test_analyze_returns_classified_investments(stub_classifier):
+    response = analyze(TestClient(app))
+    assert response.status_code == 200
+    body = response.json()
+    sections = {t["description"]: t["section"] for t in body["discovered_investments"]}
+    assert sections["lic premium xyz"] == "80C"
+    assert "amazon shopping" not in sections
+    assert sum(body["classification_stats"].values()) == 5
+    assert body["tax_analysis"]["deductions"]["80C"]["allowed"] == 150000
+
+
+def test_simulate_is_not_blocked_by_a_slow_analysis(stub_classifier):
+    encode = stub_classifier.model.encode
+
+    def slow_encode(texts):
+        time.sleep(1.0)
+        return encode(texts)
+
+    stub_classifier._init_model()
+    stub_classifier.model.encode = slow_encode
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analysis = asyncio.create_task(client.post(
+                "/api/v1/analyze", data={"user_profile": PROFILE},
+                files={"file": ("s.csv", "date,description,debit_amount\n2024-04-01,payment to ramesh,10\n", "text/csv")}))
+            await asyncio.sleep(0.2)
+            start = time.perf_counter()
+            simulated = await client.post("/api/v1/simulate", json=SIMULATION)
+            elapsed = time.perf_counter() - start
+            return await analysis, simulated, elapsed
+
+    analysis, simulated, elapsed = asyncio.run(scenario())
+    assert analysis.status_code == 200 and simulated.status_code == 200
+    assert elapsed < 0.5
+
+
+def test_streaming_analysis_matches_in_memory(stub_classifier):
+    client = TestClient(app)
+    statement = STATEMENT + "".join(f"2024-{m:02d}-05,Swiggy order {m},{m * 100}\n" for m in range(1, 13))
+    full = analyze(client, statement).json()
+    streamed = client.post("/api/v1/analyze",
+                           data={"user_profile": PROFILE, "stream": "true", "chunk_size": "4"},
+                           files={"file": ("statement.csv", statement, "text/csv")}).json()
+
+    for key in ("discovered_investments", "tax_analysis", "chart_data", "classification_stats"):
+        assert streamed[key] == full[key]
+
+
+def test_analyze_falls_back_to_default_rules_for_unknown_years(stub_classifier):
+    client = TestClient(app)
+    default_year = tax_engine.ruleset.financial_year
+    expected = analyze(client).json()["tax_analysis"]
+    for year in ("2022-23", "FY 1990", "next year"):
+        profile = dict(json.loads(PROFILE), financial_year=year)
+        response = client.post("/api/v1/analyze", data={"user_profile": json.dumps(profile)},
+                               files={"file": ("statement.csv", STATEMENT, "text/csv")})
+        assert response.status_code == 200, year
+        assert response.json()["tax_analysis"]["rules_financial_year"] == default_year
+        assert response.json()["tax_analysis"]["old_regime"] == expected["old_regime"]
+
+
+def test_parquet_and_arrow_uploads_match_csv(stub_classifier):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    client = TestClient(app)
+    full = analyze(client).json()
+    df = pd.read_csv(io.StringIO(STATEMENT))
+    # Typed columns as an aggregator would write them: real dates, integer amounts, an extra column
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["balance"] = 1.0
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    parquet, arrow = io.BytesIO(), io.BytesIO()
+    pq.write_table(table, parquet)
+    with pa.ipc.new_file(arrow, table.schema) as writer:
+        writer.write_table(table)
+
+    for filename, payload, stream in (("s.parquet", parquet, "false"), ("s.parquet", parquet, "true"),
+                                      ("s.arrow", arrow, "false"), ("s.arrow", arrow, "true")):
+        response = client.post("/api/v1/analyze", data={"user_profile": PROFILE, "stream": stream, "chunk_size": "2"},
+                               files={"file": (filename, payload.getvalue(), "application/octet-stream")})
+        assert response.status_code == 200, (filename, stream)
+        for key in ("discovered_investments", "tax_analysis", "chart_data", "classification_stats"):
+            assert response.json()[key] == full[key]
+
+    assert analyze(client, filename="statement.xlsx").status_code == 400
+    assert analyze(client, filename="statement.parquet").status_code == 400  # CSV bytes are not Parquet
+
+
+def test_simulate_batch_grid_matches_single_simulations():
+    client = TestClient(app)
+    grid = {"salary": [600000, 1200000, 2400000], "investments_80c": [0, 150000], "investments_nps": [0, 50000]}
+    body = client.post("/api/v1/simulate/batch", json={"age": 30, "grid": grid}).json()
+    assert body["shape"] == [3, 2, 1, 2]
+
+    for i, salary in enumerate(grid["salary"]):
+        for j, inv_80c in enumerate(grid["investments_80c"]):
+            for k, inv_nps in enumerate(grid["investments_nps"]):
+                single = client.post("/api/v1/simulate", json={
+                    "salary": salary, "age": 30, "investments_80c": inv_80c,
+                    "investments_80d": 0, "investments_nps": inv_nps}).json()["simulation"]
+                assert body["old_tax"][i][j][0][k] == single["old_tax"]
+                assert body["new_tax"][i][j][0][k] == single["new_tax"]
+                assert body["regimes"][body["recommended"][i][j][0][k]] == single["recommended"]
+
+
+def test_simulate_batch_rejects_ambiguous_or_oversized_requests():
+    client = TestClient(app)
+    assert client.post("/api/v1/simulate/batch", json={"age": 30}).status_code == 400
+    scenarios = [{"salary": 1000000}]
+    assert client.post("/api/v1/simulate/batch", json={"age": 30, "scenarios": scenarios}).json()["shape"] == [1]
+    huge = {"salary": list(range(1000)), "investments_80c": list(range(1000))}
+    assert client.post("/api/v1/simulate/batch", json={"age": 30, "grid": huge}).status_code == 400
+
+
+def test_simulate_uses_the_requested_financial_year():
+    client = TestClient(app)
+    request = dict(SIMULATION, salary=1275000)
+    default = client.post("/api/v1/simulate", json=request).json()["simulation"]
+    fy26 = client.post("/api/v1/simulate", json=dict(request, financial_year="2025-26")).json()["simulation"]
+    assert fy26["new_tax"] == 0 < default["new_tax"]
+    assert client.post("/api/v1/simulate", json=dict(request, financial_year="1990-91")).status_code == 400
@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+import pytest
+
+from app.services.ingestion import statement_chunks
+
+pa = pytest.importorskip("pyarrow")
+
+
+def arrow_payload(batch_sizes, layout):
+    """An Arrow IPC file/stream whose record batches have the given row counts."""
+    total = sum(batch_sizes)
+    table = pa.table({"date": ["2024-04-01"] * total, "description": [f"TXN {i}" for i in range(total)],
+                      "debit_amount": [float(i) for i in range(total)]})
+    sink, offset = io.BytesIO(), 0
+    new = pa.ipc.new_file if layout == "file" else pa.ipc.new_stream
+    with new(sink, table.schema) as writer:
+        for size in batch_sizes:
+            writer.write_table(table.slice(offset, size))
+            offset += size
+    sink.seek(0)
+    return sink, total
+
+
+@pytest.mark.parametrize("layout", ["file", "stream"])
+@pytest.mark.parametrize("batch_sizes", [[11], [1, 2, 5, 3], [4, 4], [1] * 9])
+def test_arrow_chunks_are_regrouped_to_the_requested_size(layout, batch_sizes):
+    payload, total = arrow_payload(batch_sizes, layout)
+    with statement_chunks(payload, "arrow", 4) as chunks:
+        frames = list(chunks)
+
+    sizes = [len(frame) for frame in frames]
+    assert sizes == [4] * (total // 4) + ([total % 4] if total % 4 else [])
+    combined = pd.concat(frames, ignore_index=True)
+    assert combined["description"].tolist() == [f"TXN {i}" for i in range(total)]
+    assert combined["debit_amount"].tolist() == [float(i) for i in range(total)]
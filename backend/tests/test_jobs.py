@@ -0,0 +1,91 @@
+import io
+import json
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.main import app
+from app.services.jobs import JobStore
+from tests.test_endpoints import PROFILE, STATEMENT, analyze
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(config, "WARMUP_ON_STARTUP", False)
+    return tmp_path / "jobs"
+
+
+def submit(client, statement=STATEMENT):
+    return client.post("/api/v1/analyze", data={"user_profile": PROFILE, "mode": "job"},
+                       files={"file": ("statement.csv", statement, "text/csv")})
+
+
+def test_job_mode_matches_sync_analyze(stub_classifier, job_dir):
+    with TestClient(app) as client:
+        response = submit(client)
+        assert response.status_code == 202
+        status_url = response.json()["status_url"]
+
+        job = client.get(status_url, params={"wait": 30}).json()
+        assert job["status"] == "done" and job["attempts"] == 1
+        assert job["result"]["tax_analysis"] == analyze(client).json()["tax_analysis"]
+
+        failed = client.get(submit(client, "date,description\n").json()["status_url"], params={"wait": 30}).json()
+        assert failed["status"] == "failed" and failed["error"]["status_code"] == 400
+
+        stats = client.get("/api/v1/jobs").json()["queue"]
+        assert stats["depth"] == 0 and stats["done"] == 1 and stats["failed"] == 1
+        assert client.get("/api/v1/jobs/missing").status_code == 404
+    # Uploads are removed once their job has an outcome
+    assert list((job_dir / "payloads").iterdir()) == []
+
+
+def test_jobs_survive_a_restart(job_dir):
+    store = JobStore(str(job_dir))
+    job_id = store.submit(io.BytesIO(STATEMENT.encode()), json.loads(PROFILE), {})
+    claimed = store.claim(lease_seconds=0.05, max_attempts=2)
+    assert claimed["id"] == job_id and store.claim(0.05, 2) is None
+    store.close()  # The process dies mid-job and never renews its lease
+
+    time.sleep(0.1)
+    store = JobStore(str(job_dir))
+    assert store.get(job_id)["status"] == "running"
+    reclaimed = store.claim(lease_seconds=0.05, max_attempts=2)
+    assert reclaimed["id"] == job_id and reclaimed["attempts"] == 2
+
+    # Out of attempts: the next claim fails it instead of running it a third time
+    time.sleep(0.1)
+    assert store.claim(0.05, 2) is None
+    job = store.get(job_id)
+    assert job["status"] == "failed" and "abandoned" in job["error"]["detail"]
+    assert store.stats()["failed"] == 1
+    store.close()
+
+
+def test_worker_survives_a_store_error(stub_classifier, job_dir, monkeypatch):
+    from app.services.jobs import job_runner
+
+    complete = JobStore.complete
+    calls = []
+
+    def flaky_complete(self, job_id, result):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return complete(self, job_id, result)
+
+    monkeypatch.setattr(config, "JOB_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(JobStore, "complete", flaky_complete)
+    with TestClient(app) as client:
+        first = submit(client).json()["job_id"]
+        deadline = time.time() + 30
+        while not calls and time.time() < deadline:
+            time.sleep(0.05)
+        # The only worker keeps going after the failed write and finishes the next job
+        second = client.get(submit(client).json()["status_url"], params={"wait": 30}).json()
+        assert second["status"] == "done" and calls[0] == first
+        assert not any(task.done() for task in job_runner._tasks)
@@ -0,0 +1,51 @@
+import importlib
+import sys
+import types
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    """The root-level tax_engine module, imported with google.generativeai stubbed out."""
+    google = types.ModuleType("google")
+    google.generativeai = types.ModuleType("google.generativeai")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "google", google)
+        mp.setitem(sys.modules, "google.generativeai", google.generativeai)
+        mp.delitem(sys.modules, "tax_engine", raising=False)
+        yield importlib.import_module("tax_engine")
+
+
+def test_overlapping_keywords_land_in_the_first_bucket_only(legacy):
+    descriptions = pd.Series(["LIC health shield", "Star Health NPS", "NPS mutual fund top-up"])
+    assert legacy.categorize_descriptions(descriptions).tolist() == \
+        ["80C_eligible", "80D_eligible", "80C_eligible"]
+
+    df = pd.DataFrame({"Description": descriptions, "Amount": [1000.0, 200.0, 30.0],
+                       "Type": ["Debit", "debit", "DEBIT"]})
+    investments = legacy.analyze_financials(df)["detected_investments"]
+    assert investments == {"80C_eligible": 1030.0, "80D_eligible": 200.0, "80CCD_eligible": 0.0}
+
+
+def test_unmatched_and_missing_descriptions_have_no_bucket(legacy):
+    descriptions = pd.Series(["Swiggy order", None, "Salary credit"], index=[5, 7, 9])
+    categories = legacy.categorize_descriptions(descriptions)
+    assert categories.tolist() == [None, None, None]
+    assert categories.index.tolist() == [5, 7, 9]
+
+
+def test_matching_ignores_case(legacy):
+    descriptions = pd.Series(["PpF DEPOSIT", "national PENSION scheme", "MEDICLAIM renewal"])
+    assert legacy.categorize_descriptions(descriptions).tolist() == \
+        ["80C_eligible", "80CCD_eligible", "80D_eligible"]
+
+
+def test_credits_are_not_investments_and_input_is_untouched(legacy):
+    df = pd.DataFrame({"Description": ["PPF interest", "ELSS SIP"], "Amount": [-500.0, -2000.0],
+                       "Type": ["credit", "debit"]})
+    before = df.copy()
+    result = legacy.analyze_financials(df)
+    assert result["detected_investments"]["80C_eligible"] == 2000.0
+    pd.testing.assert_frame_equal(df, before)
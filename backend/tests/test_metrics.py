@@ -0,0 +1,60 @@
+import asyncio
+import re
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram
+from app.main import app
+from app.services.jobs import job_runner
+from tests.test_endpoints import STATEMENT, analyze
+
+
+def sample(text, line_prefix):
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_cover_every_stage_of_an_analysis(stub_classifier):
+    client = TestClient(app)
+    before = client.get("/metrics").text
+    # The unknown payee is settled by the embedding search, not the lexical gate
+    assert analyze(client, STATEMENT + "2024-09-01,Qqxzz Jjvwk Services,1200\n").status_code == 200
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    for stage in ("read", "parse", "classify", "aggregate", "analyze"):
+        key = f'opax_stage_seconds_count{{stage="{stage}"}}'
+        assert sample(text, key) == sample(before, key) + 1
+    assert sample(text, 'opax_classified_rows_total{path="embedding"}') > \
+        sample(before, 'opax_classified_rows_total{path="embedding"}')
+    assert sample(text, "opax_embedding_batch_size_count") > sample(before, "opax_embedding_batch_size_count")
+    assert 'opax_result_cache_lookups_total{outcome="miss"}' in text
+    assert re.search(r'^opax_asset_info\{asset="tax_rules",version="\w+"\} 1\.0$', text, re.M)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h_seconds", "test", buckets=(0.1, 1.0), labelnames=("stage",))
+    histogram.observe(0.1, "a")  # On a bound: counted in that bucket
+    histogram.observe_many([0.05, 0.5, 4.0], "a")
+    lines = histogram.render()
+    assert 'h_seconds_bucket{stage="a",le="0.1"} 2' in lines
+    assert 'h_seconds_bucket{stage="a",le="1.0"} 3' in lines
+    assert 'h_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 'h_seconds_count{stage="a"} 4' in lines
+    assert sample("\n".join(lines), 'h_seconds_sum{stage="a"}') == pytest.approx(4.65)
+
+
+def test_queue_metrics_are_read_off_the_event_loop(monkeypatch):
+    def stats():
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()  # Only raises outside the event loop thread
+        return {"depth": 3, "running": 1, "done": 0, "failed": 0, "oldest_queued_seconds": 2.5}
+
+    monkeypatch.setattr(job_runner, "store", types.SimpleNamespace(stats=stats))
+    monkeypatch.setattr(job_runner, "_tasks", [object()])
+    text = TestClient(app).get("/metrics").text
+    assert sample(text, 'opax_jobs{status="queued"}') == 3
+    assert sample(text, "opax_job_oldest_queued_seconds") == 2.5
@@ -0,0 +1,114 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from app.core import compression, responses
+from app.main import app
+from tests.test_endpoints import PROFILE, STATEMENT
+
+
+def post_analyze(client, **data):
+    return client.post("/api/v1/analyze", data={"user_profile": PROFILE, **data},
+                       files={"file": ("statement.csv", STATEMENT, "text/csv")})
+
+
+def test_fields_projection_keeps_only_requested_sections(stub_classifier):
+    client = TestClient(app)
+    full = post_analyze(client).json()
+    body = post_analyze(client, fields="tax_analysis.old_regime, chart_data").json()
+    assert body == {"tax_analysis": {"old_regime": full["tax_analysis"]["old_regime"]},
+                    "chart_data": full["chart_data"]}
+    assert post_analyze(client, fields="tax_analysis.nope").status_code == 400
+
+
+def test_large_responses_are_compressed_when_accepted(stub_classifier):
+    client = TestClient(app)
+    response = client.post("/api/v1/analyze", data={"user_profile": PROFILE}, headers={"Accept-Encoding": "gzip"},
+                           files={"file": ("statement.csv", STATEMENT, "text/csv")})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["status"] == "success"
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_encoding_negotiation(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.negotiate_encoding("gzip, deflate, br") == "br"
+    assert compression.negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert compression.negotiate_encoding("*") == "br"
+    assert compression.negotiate_encoding("identity, gzip;q=0") == "identity"
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.negotiate_encoding("br, gzip;q=0.1") == "gzip"
+
+
+def test_standard_library_fallback_encodes_the_same_values(monkeypatch):
+    content = {"amount": np.float64(1.5), "months": np.arange(3), "rows": [{"section": "80C", "n": np.int64(2)}]}
+    fast = json.loads(responses.dumps(content))
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(responses.dumps(content)) == fast == {"amount": 1.5, "months": [0, 1, 2],
+                                                            "rows": [{"section": "80C", "n": 2}]}
+
+
+def run_responder(make_encoder, start, *bodies):
+    """Sends ``start`` and the body chunks through a CompressionResponder; returns what reached the client."""
+    sent = []
+
+    async def app(scope, receive, send):
+        await send(start)
+        for i, body in enumerate(bodies):
+            await send({"type": "http.response.body", "body": body, "more_body": i < len(bodies) - 1})
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(compression.CompressionResponder(app, make_encoder, 100)({"type": "http"}, None, send))
+    return Headers(raw=sent[0]["headers"]), [m["body"] for m in sent[1:]]
+
+
+def start_message(content_type="application/json", **headers):
+    raw = [(b"content-type", content_type.encode())] + [(k.encode(), v.encode()) for k, v in headers.items()]
+    return {"type": "http.response.start", "status": 200, "headers": raw}
+
+
+def gzip_encoder():
+    return compression.GzipEncoder(6)
+
+
+def test_streamed_chunks_are_each_decodable():
+    lines = [json.dumps({"index": i, "pad": "x" * 200}).encode() + b"\n" for i in range(3)]
+    headers, chunks = run_responder(gzip_encoder, start_message("application/x-ndjson"), *lines)
+    assert headers["content-encoding"] == "gzip" and "content-length" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # Sync-flushed: every line can be decoded as soon as its chunk arrives
+    assert [decoder.decompress(chunk) for chunk in chunks] == lines
+
+
+def test_small_encoded_and_excluded_responses_pass_through():
+    body = b"x" * 500
+    headers, chunks = run_responder(gzip_encoder, start_message(), b"{}")
+    assert "content-encoding" not in headers and chunks == [b"{}"]
+    headers, chunks = run_responder(gzip_encoder, start_message(**{"content-encoding": "br"}), body)
+    assert headers["content-encoding"] == "br" and chunks == [body]
+    headers, chunks = run_responder(gzip_encoder, start_message("application/zip"), body)
+    assert "content-encoding" not in headers and chunks == [body]
+
+    headers, chunks = run_responder(gzip_encoder, start_message(**{"content-length": "500"}), body)
+    assert gzip.decompress(chunks[0]) == body and headers["content-length"] == str(len(chunks[0]))
+    headers, chunks = run_responder(None, start_message(), body)
+    assert "content-encoding" not in headers and headers["vary"] == "Accept-Encoding" and chunks == [body]
+
+
+def test_brotli_streams_decode_chunk_by_chunk():
+    brotli = pytest.importorskip("brotli")
+    lines = [json.dumps({"index": i, "pad": "x" * 200}).encode() + b"\n" for i in range(3)]
+    headers, chunks = run_responder(lambda: compression.BrotliEncoder(5), start_message(), *lines)
+    assert headers["content-encoding"] == "br"
+    decoder = brotli.Decompressor()
+    assert [decoder.process(chunk) for chunk in chunks] == lines
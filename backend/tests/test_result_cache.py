@@ -0,0 +1,60 @@
+import asyncio
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.result_cache import ResultCache, statement_digest
+from tests.test_endpoints import PROFILE, STATEMENT, analyze
+
+
+def test_digest_ignores_line_endings_bom_and_trailing_blank_lines():
+    digest = statement_digest(io.BytesIO(STATEMENT.encode()))
+    variant = b"\xef\xbb\xbf" + STATEMENT.replace("\n", "\r\n").encode() + b"\r\n\r\n  "
+    assert statement_digest(io.BytesIO(variant), block_size=7) == digest
+    assert statement_digest(io.BytesIO(STATEMENT.replace("50000", "50001").encode())) != digest
+
+
+def test_reupload_with_tweaked_profile_hits_the_cache(stub_classifier):
+    client = TestClient(app)
+    first = analyze(client).json()
+    encoded = stub_classifier.model.encoded
+    assert first["cache"] == "miss"
+
+    profile = dict(json.loads(PROFILE), salary=2500000, age=65)
+    second = client.post("/api/v1/analyze", data={"user_profile": json.dumps(profile)},
+                         files={"file": ("statement.csv", STATEMENT.replace("\n", "\r\n"), "text/csv")}).json()
+    assert second["cache"] == "hit" and stub_classifier.model.encoded == encoded
+    assert second["discovered_investments"] == first["discovered_investments"]
+    assert second["profile"]["salary"] == 2500000
+    assert second["tax_analysis"]["old_regime"] != first["tax_analysis"]["old_regime"]
+
+
+def test_concurrent_identical_requests_compute_once():
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+    assert all(value == {"value": 1} for value, _ in results)
+
+    async def failing():
+        raise ValueError("bad statement")
+
+    async def failure():
+        return await asyncio.gather(cache.get_or_compute("bad", failing), return_exceptions=True)
+
+    assert isinstance(asyncio.run(failure())[0], ValueError) and cache.get("bad") is None
+    cache.put("a", 1)
+    cache.put("b", 2)  # Evicts "k", the least recently used
+    assert cache.get("k") is None and cache.get("a") == 1
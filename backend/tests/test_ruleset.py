@@ -0,0 +1,105 @@
+import copy
+
+import numpy as np
+import pytest
+
+from app.core.config import TAX_RULES_DIR
+from app.models.schemas import UserProfile
+from app.services.ruleset import RulesetError, RulesetRegistry, compile_ruleset, normalize_financial_year
+from app.services.tax_engine import TaxEngine, tax_engine
+
+
+def slab_walk(slabs, taxable_income):
+    """The original slab-by-slab loop, kept as the reference for the compiled lookup."""
+    tax = 0.0
+    for slab in slabs:
+        min_val = slab["min"]
+        max_val = slab["max"] if slab["max"] else float('inf')
+        rate = slab["rate"]
+        if taxable_income > min_val:
+            taxable_amount = min(taxable_income, max_val) - min_val
+            tax += taxable_amount * rate
+    return tax
+
+
+def test_compiled_tax_matches_slab_walk():
+    rng = np.random.default_rng(7)
+    incomes = [0, 1, 250000, 300000, 300001, 700000, 1500000] + rng.uniform(0, 5e7, 2000).tolist()
+    for regime, slabs in tax_engine.rules["slabs"].items():
+        compiled = tax_engine.ruleset.regime(regime)
+        for income in incomes:
+            assert compiled.tax(income) == slab_walk(slabs, income), (regime, income)
+
+
+def test_limits_are_read_from_rules():
+    limits = tax_engine.ruleset.limits
+    raw = tax_engine.rules["limits"]
+    assert limits.sec_80c == raw["80C"]
+    assert limits.sec_80d(30) == raw["80D"]["self_family_below_60"]
+    assert limits.sec_80d(60) == raw["80D"]["self_family_above_60"]
+    assert limits.sec_80ccd_1b == raw["80CCD_1B"]
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda r: r["slabs"]["old_regime"].reverse(), "open-ended"),
+    (lambda r: r["slabs"]["new_regime"][1].update(min=0), "overlap"),
+    (lambda r: r["slabs"]["old_regime"][0].update(rate=5), "fraction"),
+    (lambda r: r["limits"].update({"80C": -1}), "non-negative"),
+    (lambda r: r.pop("cess_percent"), "cess_percent"),
+    (lambda r: r["slabs"].pop("new_regime"), "new_regime"),
+])
+def test_invalid_rules_are_rejected(mutate, message):
+    raw = copy.deepcopy(tax_engine.rules)
+    mutate(raw)
+    with pytest.raises(RulesetError, match=message):
+        compile_ruleset(raw)
+
+
+@pytest.mark.parametrize("spelling", ["2024-25", "2024-2025", "FY 2024/25", " 2024_25 "])
+def test_financial_year_spellings_share_one_key(spelling):
+    assert normalize_financial_year(spelling) == "2024-2025"
+    assert tax_engine.for_year(spelling) is tax_engine.for_year(None)
+
+
+def test_registry_compiles_each_year_once():
+    registry = RulesetRegistry(TAX_RULES_DIR, tax_engine.ruleset)
+    assert {"2023-2024", "2024-2025", "2025-2026"} <= set(registry.available())
+    first = registry.get("2025-26")
+    assert registry.get("2025-2026") is first
+    assert first.regime("new_regime").rebate_max_income == 1200000
+    with pytest.raises(RulesetError):
+        registry.get("1990-91")
+
+
+def test_compare_years_applies_each_years_rules():
+    profile = UserProfile(name="x", salary=1275000, age=30, risk_appetite="moderate", financial_year="2024-25")
+    totals = {"80C": 150000.0, "80D": 25000.0, "80CCD_1B": 0.0, "24B": 0.0}
+    comparison = tax_engine.compare_years(profile, totals, ["2023-24", "2024-25", "2025-26"])
+    assert list(comparison) == ["2023-2024", "2024-2025", "2025-2026"]
+    # FY 2025-26 raised the new-regime rebate limit to 12L taxable income (12.75L with standard deduction)
+    assert comparison["2025-2026"]["new_regime"]["tax"] == 0
+    assert comparison["2024-2025"]["new_regime"]["tax"] > 0
+    for year, result in comparison.items():
+        analysis = tax_engine.analyze_totals(profile.model_copy(update={"financial_year": year}), totals)
+        assert result["old_regime"]["tax"] == analysis["old_regime"]["tax"]
+        assert result["new_regime"]["tax"] == analysis["new_regime"]["tax"]
+
+
+def test_reload_publishes_rules_and_registry_together():
+    engine = TaxEngine()
+    before = engine.for_year("2025-26")
+    engine.reload()
+    assert engine.registry.default is engine.ruleset and engine.rules is engine.ruleset.raw
+    # Engines resolved before the reload keep their rules; new lookups compile from the new registry
+    assert engine.for_year("2025-26") is not before
+    assert before.ruleset.financial_year == "2025-2026"
+
+
+def test_nps_recommendation_quotes_the_rulesets_limit():
+    raw = copy.deepcopy(tax_engine.rules)
+    raw["limits"]["80CCD_1B"] = 75000
+    engine = TaxEngine(compile_ruleset(raw))
+    profile = UserProfile(name="x", salary=1500000, age=30, risk_appetite="moderate",
+                          financial_year=engine.ruleset.financial_year)
+    nps = [r for r in engine.analyze_profile(profile, [])["recommendations"] if "80CCD(1B)" in r["description"]]
+    assert nps and "₹75,000" in nps[0]["description"] and "₹50,000" not in nps[0]["description"]
@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.services.tax_engine import tax_engine
+
+REGIMES = ("old_regime", "new_regime")
+
+
+def sample_incomes():
+    rng = np.random.default_rng(42)
+    boundaries = []
+    for regime in REGIMES:
+        for slab in tax_engine.rules["slabs"][regime]:
+            for edge in (slab["min"], slab["max"]):
+                if edge is not None:
+                    boundaries += [edge - 1, edge - 0.5, edge, edge + 0.5, edge + 1]
+    for regime in REGIMES:
+        limit = tax_engine.rules["rebate_87A"][regime]["max_income"]
+        boundaries += [limit - 1, limit, limit + 1]
+    return np.concatenate([[-1000.0, 0.0], boundaries, rng.uniform(0, 5e7, 5000), rng.integers(0, 3e6, 5000)])
+
+
+def test_compute_tax_batch_matches_scalar_exactly():
+    incomes = sample_incomes()
+    for regime in REGIMES:
+        batch = tax_engine.compute_tax_batch(incomes, regime)
+        scalar = [tax_engine.compute_tax(float(x), regime) for x in incomes]
+        assert batch.tolist() == scalar
+
+
+def test_calculate_regime_batch_matches_scalar_exactly():
+    incomes = sample_incomes()
+    deductions = np.random.default_rng(0).uniform(0, 300000, len(incomes))
+    for regime in REGIMES:
+        batch = tax_engine.calculate_regime_batch(incomes, deductions, regime)
+        for i, (income, deduction) in enumerate(zip(incomes, deductions)):
+            scalar = tax_engine.calculate_regime(float(income), float(deduction), regime)
+            for key, value in scalar.items():
+                assert batch[key][i] == value, (regime, key, income, deduction)
+
+
+def test_batch_broadcasts_a_scalar_deduction():
+    result = tax_engine.calculate_regime_batch(np.array([600000.0, 1200000.0]), 200000.0, "old_regime")
+    assert result["final_tax"].shape == (2,)
+
+
+def test_run_simulation_batch_matches_scalar_exactly():
+    rng = np.random.default_rng(1)
+    salary = np.concatenate([[0.0, 500000.0, 775000.0, 1275000.0], rng.uniform(0, 4e6, 300)])
+    inv_80c, inv_80d, inv_nps = (rng.uniform(0, 250000, len(salary)) for _ in range(3))
+    for age in (30, 65):
+        batch = tax_engine.run_simulation_batch(salary, age, inv_80c, inv_80d, inv_nps)
+        for i in range(len(salary)):
+            scalar = tax_engine.run_simulation(float(salary[i]), age, float(inv_80c[i]), float(inv_80d[i]), float(inv_nps[i]))
+            assert batch["old_tax"][i] == scalar["old_tax"]
+            assert batch["new_tax"][i] == scalar["new_tax"]
+            assert batch["tax_saved"][i] == scalar["tax_saved"]
+            assert batch["savings_gap"][i] == scalar["savings_gap"]
+            assert batch["health_score"][i] == scalar["health_score"]
+            assert (scalar["recommended"] == "Old Regime") == batch["old_recommended"][i]
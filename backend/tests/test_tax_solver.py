@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from app.services.tax_engine import tax_engine
+
+
+def old_tax_with(salary, age, inv_80c, inv_80d, inv_nps):
+    return tax_engine.run_simulation(salary, age, inv_80c, inv_80d, inv_nps)["old_tax"]
+
+
+@pytest.mark.parametrize("salary", [800000, 1000000, 1200000, 1750000, 2500000, 6000000])
+def test_breakeven_is_where_old_regime_starts_winning(salary):
+    result = tax_engine.solve(salary, 30)
+    breakeven = result["breakeven"]["deduction"]
+    standard = tax_engine.ruleset.regime("old_regime").standard_deduction
+
+    def old_tax(deduction):
+        return tax_engine.calculate_regime(salary, deduction + standard, "old_regime")["final_tax"]
+
+    assert old_tax(breakeven) == pytest.approx(result["new_tax"], abs=1e-6)
+    assert old_tax(breakeven + 1) < result["new_tax"]
+    assert old_tax(max(breakeven - 1, 0)) >= result["new_tax"]
+    assert result["breakeven"]["achievable"] == (breakeven < 150000 + 25000 + 50000)
+
+
+def test_allocation_minimizes_tax_within_budget():
+    rng = np.random.default_rng(3)
+    for salary, budget in zip(rng.uniform(4e5, 3e6, 200), rng.uniform(0, 300000, 200)):
+        result = tax_engine.solve(salary, 30, budget, inv_80c=20000)
+        alloc = result["allocation"]
+        assert sum(alloc.values()) <= budget + 1e-6
+        assert result["optimized_old_tax"] == old_tax_with(salary, 30, 20000 + alloc["80C"], alloc["80D"], alloc["80CCD_1B"])
+
+        # No split of the same budget does better
+        for split in rng.dirichlet([1, 1, 1], 20):
+            c, d, n = split * budget
+            assert result["optimized_old_tax"] <= old_tax_with(salary, 30, 20000 + c, d, n) + 1e-6
+
+
+@pytest.mark.parametrize("salary, inv_80c", [(650000, 73893.43), (700000, 81219.18), (741356, 35905.42),
+                                             (756949, 50686.68), (765794.73, 120000.07)])
+def test_allocation_onto_the_rebate_limit_keeps_the_rebate(salary, inv_80c):
+    # Non-round investments put the optimal taxable income exactly on the 87A limit; float addition
+    # of the deductions must not lift it a few ulps above the limit and lose the rebate
+    result = tax_engine.solve(salary, 30, 172233, inv_80c=inv_80c)
+    assert result["optimized_old_tax"] == 0.0
+
+
+def test_allocations_reaching_the_rebate_limit_pay_no_tax():
+    standard = tax_engine.ruleset.regime("old_regime").standard_deduction
+    rng = np.random.default_rng(11)
+    for salary, inv_80c in zip(rng.uniform(6e5, 8e5, 1000), rng.uniform(0, 150000, 1000).round(2)):
+        result = tax_engine.solve(salary, 30, inv_80c=inv_80c)
+        if salary - standard - inv_80c - sum(result["allocation"].values()) <= 500000:
+            assert result["optimized_old_tax"] == 0.0
+
+
+def test_marginal_benefit_matches_one_rupee_difference():
+    result = tax_engine.solve(1500000, 30, inv_80c=150000)
+    benefit = result["marginal_benefit"]
+    assert benefit["80C"] == 0.0
+    saved = old_tax_with(1500000, 30, 150000, 0, 0) - old_tax_with(1500000, 30, 150000, 1, 0)
+    assert benefit["80D"] == pytest.approx(saved)
+    assert benefit["80CCD_1B"] == pytest.approx(saved)
+
+
+def test_solve_batch_matches_single_solves():
+    salaries = np.array([500000.0, 900000.0, 1300000.0, 4000000.0])
+    batch = tax_engine.solve_batch(salaries, np.array([30, 65, 30, 70]), 100000.0)
+    for i, (salary, age) in enumerate(zip(salaries, [30, 65, 30, 70])):
+        single = tax_engine.solve(float(salary), age, 100000.0)
+        assert batch["breakeven_deduction"][i] == single["breakeven"]["deduction"]
+        assert batch["optimized_old_tax"][i] == single["optimized_old_tax"]
+        assert batch["alloc_80D"][i] == single["allocation"]["80D"]
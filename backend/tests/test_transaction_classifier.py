@@ -0,0 +1,166 @@
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.core.config import SIMILARITY_THRESHOLD
+from app.models.schemas import Transaction
+
+DESCRIPTIONS = [
+    "lic premium xyz",
+    "hdfc elss tax saver sip",
+    "star health insurance renewal",
+    "amazon shopping",
+    "lic premium xyz",
+    "upi nps tier 1 contribution",
+    "",
+]
+
+
+def per_row_reference(clf, description):
+    """The original row-at-a-time classification, kept here as the reference output."""
+    clean_desc = description.replace("upi", "").replace("netbanking", "").replace("ecs", "")
+    similarities = cosine_similarity(clf.model.encode([clean_desc]), clf.kb_embeddings)[0]
+    best_idx = np.argmax(similarities)
+    best_score = similarities[best_idx]
+    if best_score >= SIMILARITY_THRESHOLD:
+        match = clf.knowledge_base.iloc[best_idx]
+        return {
+            "is_match": True,
+            "score": float(best_score),
+            "section": match['section'],
+            "category": match['category'],
+            "instrument": match['instrument_name']
+        }
+    return {"is_match": False, "score": float(best_score)}
+
+
+def test_batch_matches_per_row(stub_classifier, monkeypatch):
+    from app.core import config
+    monkeypatch.setattr(config, "LEXICAL_GATE_ENABLED", False)
+    results = stub_classifier.classify_batch(DESCRIPTIONS)
+    assert len(results) == len(DESCRIPTIONS)
+    for desc, result in zip(DESCRIPTIONS, results):
+        expected = per_row_reference(stub_classifier, desc)
+        assert result["is_match"] == expected["is_match"]
+        assert abs(result["score"] - expected["score"]) < 1e-6
+        for key in ("section", "category", "instrument"):
+            assert result.get(key) == expected.get(key)
+
+
+def test_batch_encodes_unique_descriptions_once(stub_classifier, monkeypatch):
+    from app.core import config
+    monkeypatch.setattr(config, "LEXICAL_GATE_ENABLED", False)
+    stub_classifier._init_model()
+    encoder = stub_classifier.model
+    calls, encoded = encoder.calls, encoder.encoded
+    stub_classifier.classify_batch(DESCRIPTIONS)
+    assert encoder.calls == calls + 1
+    assert encoder.encoded == encoded + len(set(DESCRIPTIONS))
+
+
+def test_process_transactions_flags_matches(stub_classifier, monkeypatch):
+    from app.core import config
+    monkeypatch.setattr(config, "LEXICAL_GATE_ENABLED", False)
+    txns = [Transaction(date="2024-04-10", description=d, amount=1000.0) for d in DESCRIPTIONS]
+    stub_classifier.process_transactions(txns)
+    for txn, desc in zip(txns, DESCRIPTIONS):
+        expected = per_row_reference(stub_classifier, desc)
+        assert txn.is_tax_saving == expected["is_match"]
+        assert txn.tax_section == expected.get("section")
+
+
+def test_kb_embeddings_are_cached_on_disk(stub_classifier, tmp_path, monkeypatch):
+    from app.core import config
+    from app.ml.embedding_cache import EmbeddingCache
+
+    stub_classifier._init_model()
+    first = np.array(stub_classifier.kb_embeddings)
+    assert isinstance(stub_classifier.kb_embeddings, np.memmap)
+
+    # A fresh start maps the file instead of encoding
+    stub_classifier.kb_view = None
+    encoded = stub_classifier.model.encoded
+    stub_classifier._init_model()
+    assert stub_classifier.model.encoded == encoded
+    np.testing.assert_array_equal(first, stub_classifier.kb_embeddings)
+
+    # An edited CSV only re-encodes the changed rows
+    csv_path = tmp_path / "tax_instruments.csv"
+    lines = open(config.TAX_INSTRUMENTS_PATH).read().splitlines()
+    lines[1] = "LIC Jeevan Anand,80C,Insurance,LIC,Low"
+    csv_path.write_text("\n".join(lines) + "\n")
+    monkeypatch.setattr(config, "TAX_INSTRUMENTS_PATH", str(csv_path))
+
+    stub_classifier.kb_view = None
+    stub_classifier._init_model()
+    assert stub_classifier.model.encoded == encoded + 1
+    np.testing.assert_array_equal(first[1:], stub_classifier.kb_embeddings[1:])
+
+    cache = EmbeddingCache(config.EMBEDDING_CACHE_DIR, config.EMBEDDING_MODEL_NAME)
+    assert len(cache._entries()) == 2
+
+
+def test_repeat_descriptions_are_served_from_cache(stub_classifier, monkeypatch):
+    from app.core import config
+    monkeypatch.setattr(config, "LEXICAL_GATE_ENABLED", False)
+    from app.ml.classification_cache import ClassificationCache
+
+    first = stub_classifier.classify_batch(DESCRIPTIONS)
+    encoded = stub_classifier.model.encoded
+    assert stub_classifier.classify_batch(DESCRIPTIONS) == first
+    assert stub_classifier.model.encoded == encoded
+    assert stub_classifier.cache_stats()["hits"] == len(set(DESCRIPTIONS))
+
+    # Another worker on the same host reads the shared SQLite store
+    stub_classifier.result_cache = ClassificationCache(10, config.CLASSIFICATION_CACHE_PATH)
+    assert stub_classifier.classify_batch(DESCRIPTIONS) == first
+    assert stub_classifier.model.encoded == encoded
+    assert stub_classifier.cache_stats()["disk_hits"] == len(set(DESCRIPTIONS))
+
+    # A new threshold changes the cache version, so everything is scored again
+    monkeypatch.setattr(config, "SIMILARITY_THRESHOLD", 0.99)
+    stub_classifier.classify_batch(DESCRIPTIONS)
+    assert stub_classifier.model.encoded == encoded + len(set(DESCRIPTIONS))
+
+
+def test_classification_cache_evicts_least_recently_used():
+    from app.ml.classification_cache import ClassificationCache
+
+    cache = ClassificationCache(2)
+    cache.put_many("v1", {"a": {"is_match": False}, "b": {"is_match": False}})
+    cache.get_many("v1", ["a"])
+    cache.put_many("v1", {"c": {"is_match": False}})
+    assert set(cache.get_many("v1", ["a", "b", "c"])) == {"a", "c"}
+    assert cache.get_many("v2", ["a"]) == {}
+
+
+def test_classification_cache_versions_do_not_evict_each_other(tmp_path):
+    from app.ml.classification_cache import ClassificationCache
+
+    # Batches on the old and new KB interleave during a reload; each reads and writes only its own version
+    cache = ClassificationCache(10, str(tmp_path / "cache.sqlite3"))
+    cache.put_many("new", {"ppf": {"is_match": True, "section": "80C"}})
+    cache.put_many("old", {"ppf": {"is_match": False}})
+    assert cache.get_many("new", ["ppf"]) == {"ppf": {"is_match": True, "section": "80C"}}
+    assert cache.get_many("old", ["ppf"]) == {"ppf": {"is_match": False}}
+
+    reopened = ClassificationCache(10, str(tmp_path / "cache.sqlite3"))
+    assert reopened.get_many("new", ["ppf"])["ppf"]["is_match"] is True
+
+
+def test_lexical_gate_settles_obvious_rows(stub_classifier):
+    descriptions = [
+        "lic premium",                  # exact instrument name
+        "ach d hdfc elss tax saver",    # exact instrument name inside bank noise
+        "swiggy order 1234",            # everyday spend
+        "rent for april",               # everyday spend
+        "amazon pay star health",       # provider present, so not skipped
+        "payment to ramesh",            # nothing known, ambiguous
+    ]
+    stats = {}
+    results = stub_classifier.classify_batch(descriptions, stats)
+
+    assert results[0]["instrument"] == "LIC Premium" and results[0]["score"] == 1.0
+    assert results[1]["instrument"] == "HDFC ELSS Tax Saver"
+    assert not results[2]["is_match"] and not results[3]["is_match"]
+    assert stats == {"lexical_match": 2, "lexical_skip": 2, "embedding": 2}
+    assert stub_classifier.model.encoded == len(stub_classifier.knowledge_base) + 2
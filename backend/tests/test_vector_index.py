@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.ml.transaction_classifier import normalize_rows
+from app.ml.vector_index import ExactIndex, ClusteredIndex, build_index
+
+
+def random_unit(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((n, dim)).astype(np.float32))
+
+
+def test_exact_index_matches_brute_force():
+    vectors, queries = random_unit(500), random_unit(20, seed=1)
+    idx, scores = ExactIndex(vectors).search(queries, k=3)
+    brute = queries @ vectors.T
+    np.testing.assert_array_equal(idx[:, 0], brute.argmax(axis=1))
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_full_probe_ivf_equals_exact():
+    vectors, queries = random_unit(2000), random_unit(50, seed=1)
+    ivf = ClusteredIndex(vectors, n_clusters=16)
+    exact_idx, exact_scores = ExactIndex(vectors).search(queries, k=5)
+    ivf_idx, ivf_scores = ivf.search(queries, k=5, n_probe=16)
+    np.testing.assert_array_equal(exact_idx, ivf_idx)
+    np.testing.assert_allclose(exact_scores, ivf_scores, rtol=1e-6)
+
+
+def test_partial_probe_finds_near_duplicates():
+    vectors = random_unit(3000)
+    queries = normalize_rows(vectors[:100] + 0.01 * random_unit(100, seed=2))
+    idx, _ = ClusteredIndex(vectors).search(queries, k=1, n_probe=2)
+    assert (idx[:, 0] == np.arange(100)).mean() > 0.95
+
+
+def test_auto_index_keeps_exact_search_for_small_kbs():
+    assert isinstance(build_index(random_unit(100)), ExactIndex)
+    assert isinstance(build_index(random_unit(100), kind="ivf"), ClusteredIndex)
@@ -0,0 +1,44 @@
+import sys
+import threading
+import time
+import types
+
+from fastapi.testclient import TestClient
+
+from app.core import config
+from app.core.warmup import warmup_state
+from app.main import app
+from app.ml.hashing_encoder import HashingEncoder
+
+
+def test_concurrent_first_calls_load_the_model_once(stub_classifier, monkeypatch):
+    loads = []
+
+    def slow_model(name):
+        loads.append(name)
+        time.sleep(0.2)
+        return HashingEncoder(dim=64)
+
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=slow_model))
+    stub_classifier.model = None
+    threads = [threading.Thread(target=stub_classifier._init_model) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1 and stub_classifier.is_loaded()
+
+
+def test_readyz_turns_ready_after_startup_warmup(stub_classifier, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(warmup_state, "ready", False)
+    monkeypatch.setattr(warmup_state, "timings", {})
+    with TestClient(app) as client:
+        assert client.get("/healthz").json() == {"status": "ok"}
+        deadline = time.time() + 10
+        while (response := client.get("/readyz")).status_code == 503 and time.time() < deadline:
+            time.sleep(0.02)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "ready"
+        assert {"app_import", "knowledge_base", "first_inference", "tax_rules"} <= set(body["timings"])